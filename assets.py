@@ -0,0 +1,113 @@
+import hashlib
+import json
+import logging
+import os
+import arcade
+from PIL import Image
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.join(".cache", "assets")
+# versión del formato de la caché en disco; cambiarla invalida lo anterior
+CACHE_VERSION = 1
+
+# (imagen, escala) que usa el juego; se precargan al crear la simulación
+ASSET_SPECS: Tuple[Tuple[str, float], ...] = (
+    ("assets/img/pig_failed.png", 0.1),
+    ("assets/img/column.png", 1.0),
+    ("assets/img/beam.png", 1.0),
+    ("assets/img/red-bird3.png", 1.0),
+    ("assets/img/yellow.png", 0.1),
+    ("assets/img/blue.png", 0.3),
+)
+
+
+def file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def texture_hash(path: str, scale: float) -> str:
+    """Nombre único de la textura en el atlas de arcade."""
+    return f"{path}|{scale:g}"
+
+
+class AssetManager:
+    """
+    Texturas pre-escaladas con su hit box, cargadas una sola vez por
+    (imagen, escala) y compartidas por todos los sprites. Si existe la caché
+    en disco (ver build_cache) se usa la imagen ya escalada y el hit box
+    serializado, sin decodificar la imagen original.
+    """
+    def __init__(self, cache_dir: Optional[str] = CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._textures: Dict[Tuple[str, float], arcade.Texture] = {}
+
+    def texture(self, path: str, scale: float = 1.0) -> arcade.Texture:
+        key = (path, float(scale))
+        texture = self._textures.get(key)
+        if texture is None:
+            texture = self._load(path, float(scale))
+            self._textures[key] = texture
+        return texture
+
+    def preload(self, specs: Iterable[Tuple[str, float]] = ASSET_SPECS):
+        for path, scale in specs:
+            self.texture(path, scale)
+
+    def build_cache(self, specs: Iterable[Tuple[str, float]] = ASSET_SPECS) -> int:
+        """Escribe en disco las texturas escaladas y sus hit boxes. Devuelve cuántas."""
+        count = 0
+        for path, scale in specs:
+            self._load(path, float(scale), write=True)
+            count += 1
+        return count
+
+    def _cache_paths(self, path: str, scale: float) -> Tuple[str, str]:
+        name = f"{file_hash(path)}-{scale:g}-v{CACHE_VERSION}"
+        base = os.path.join(self.cache_dir, name)
+        return base + ".png", base + ".json"
+
+    def _load(self, path: str, scale: float, write: bool = False) -> arcade.Texture:
+        if self.cache_dir is None:
+            return self._decode(path, scale)
+        image_path, meta_path = self._cache_paths(path, scale)
+        if not write and os.path.exists(image_path) and os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            image = Image.open(image_path).convert("RGBA")
+            points = tuple(tuple(p) for p in meta["hit_box"])
+            return arcade.Texture(image, hit_box_points=points, hash=texture_hash(path, scale))
+
+        texture = self._decode(path, scale)
+        if write:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            texture.image.save(image_path)
+            with open(meta_path, "w") as f:
+                json.dump({"source": path, "scale": scale,
+                           "hit_box": [list(p) for p in texture.hit_box_points]}, f)
+        return texture
+
+    def _decode(self, path: str, scale: float) -> arcade.Texture:
+        image = Image.open(path).convert("RGBA")
+        if scale != 1.0:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(size, Image.LANCZOS)
+        logger.debug(f"Decoded {path} at scale {scale} -> {image.size}")
+        return arcade.Texture(image, hash=texture_hash(path, scale))
+
+
+ASSETS = AssetManager()
+
+
+# ------------------------
+# main: paso offline que genera la caché
+# ------------------------
+def main():
+    count = AssetManager().build_cache()
+    print(f"{count} texturas escritas en {CACHE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
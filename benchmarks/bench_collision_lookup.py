@@ -0,0 +1,75 @@
+"""
+Benchmark: costo por contacto de resolver las entidades de un arbiter.
+
+Compara el escaneo lineal de ``world`` (implementación anterior de
+``App.collision_handler``) con el ShapeRegistry, para mundos de distinto
+tamaño. Con el registro, el costo por contacto debe mantenerse plano.
+
+    python benchmarks/bench_collision_lookup.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import arcade  # noqa: E402
+import pymunk  # noqa: E402
+
+from game_object import Column, get_registry  # noqa: E402
+
+SIZES = (10, 100, 1000, 5000)
+CONTACTS = 2000
+
+
+def build_world(n: int):
+    space = pymunk.Space()
+    world = arcade.SpriteList()
+    for i in range(n):
+        column = Column(100 + (i % 100) * 20, 50 + (i // 100) * 120, space)
+        world.append(column)
+    return space, world
+
+
+def scan_lookup(world, shapes):
+    found = []
+    for obj in list(world):
+        if obj.shape in shapes:
+            found.append(obj)
+    return found
+
+
+def registry_lookup(registry, world, shapes):
+    found = []
+    for shape in shapes:
+        obj = registry.get(shape)
+        if obj is not None and world in obj.sprite_lists:
+            found.append(obj)
+    return found
+
+
+def time_per_contact(fn, contacts) -> float:
+    start = time.perf_counter()
+    for shapes in contacts:
+        fn(shapes)
+    return (time.perf_counter() - start) / len(contacts) * 1e6
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'world':>8} {'scan us/contact':>16} {'registry us/contact':>20}")
+    for n in SIZES:
+        space, world = build_world(n)
+        registry = get_registry(space)
+        contacts = [(rng.choice(world).shape, rng.choice(world).shape) for _ in range(CONTACTS)]
+        # el escaneo es O(n): limitar contactos en mundos grandes
+        scan_contacts = contacts[: max(20, CONTACTS * 10 // n)]
+        scan_us = time_per_contact(lambda s, world=world: scan_lookup(world, s), scan_contacts)
+        reg_us = time_per_contact(lambda s, registry=registry, world=world: registry_lookup(registry, world, s), contacts)
+        print(f"{n:>8} {scan_us:>16.2f} {reg_us:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: llamadas de dibujo y tiempo de CPU por frame de App.on_draw con
+la preview y la pista de auto-aim visibles, contra el dibujo inmediato
+anterior (un draw_circle_filled por punto y draw_text por frame).
+
+Corre sin GPU ni display: ventana headless (ARCADE_HEADLESS=1) sobre el
+OpenGL por software de Mesa (llvmpipe). Cuenta las glDraw* que llegan a
+OpenGL y mide on_draw solo (envío de comandos) y con ctx.finish()
+(incluye el rasterizado de llvmpipe). Dos casos:
+
+- hold: el jugador mantiene el arrastre quieto (la trayectoria no cambia).
+- drag: el arrastre se mueve todos los frames (hay que rearmar la preview).
+
+    python benchmarks/bench_draw.py
+"""
+import logging
+import math
+import os
+import sys
+import time
+import warnings
+
+os.environ.setdefault("ARCADE_HEADLESS", "1")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import arcade  # noqa: E402
+import numpy as np  # noqa: E402
+import pyglet.gl  # noqa: E402
+import pyglet.graphics.vertexdomain  # noqa: E402
+
+from game_logic import Point2D  # noqa: E402
+from main import App  # noqa: E402
+from simulation import HEIGHT, SLINGSHOT_X, SLINGSHOT_Y, WIDTH  # noqa: E402
+from solver import ShotResult, Solution  # noqa: E402
+
+logging.getLogger().setLevel(logging.WARNING)
+# el aviso de draw_text lento es justamente lo que se compara
+warnings.filterwarnings("ignore", category=arcade.exceptions.PerformanceWarning)
+
+FRAMES = 300
+WARMUP = 30
+DRAW_FUNCTIONS = ("glDrawArrays", "glDrawArraysInstanced", "glDrawElements", "glDrawElementsInstanced",
+                  "glMultiDrawArrays", "glMultiDrawElements")
+
+
+class DrawCallCounter:
+    """Envuelve las glDraw* de pyglet.gl (arcade) y de los vertex domains de pyglet (texto)."""
+    def __init__(self):
+        self.calls = 0
+        for module in (pyglet.gl, pyglet.graphics.vertexdomain):
+            for name in DRAW_FUNCTIONS:
+                original = getattr(module, name, None)
+                if original is not None:
+                    setattr(module, name, self._wrap(original))
+
+    def _wrap(self, fn):
+        def counted(*args):
+            self.calls += 1
+            return fn(*args)
+        return counted
+
+
+def legacy_draw(app: App):
+    """on_draw como era antes: dibujo inmediato de puntos y textos."""
+    app.clear()
+    arcade.draw_texture_rect(app.background, arcade.LRBT(0, WIDTH, 0, HEIGHT))
+    app.sim.sprites.draw()
+    if app.draw_line:
+        arcade.draw_line(app.start_point.x, app.start_point.y, app.end_point.x, app.end_point.y,
+                         arcade.color.BLACK, 3)
+        app.refresh_preview()
+        for i, (px, py) in enumerate(app.preview_points):
+            arcade.draw_circle_filled(px, py, max(2, 6 - (i // 10)), arcade.color.ASH_GREY)
+    for px, py in app.hint_points:
+        arcade.draw_circle_filled(px, py, 3, arcade.color.GREEN)
+    best = app.hint.best
+    arcade.draw_text(f"Hint: {best.bird} {math.degrees(best.angle):.0f}° impulso {best.impulse:.0f}"
+                     + f" ({best.pigs}/{app.hint.pigs_total} cerdos)", 10, HEIGHT - 120, arcade.color.WHITE, 14)
+    arcade.draw_text(f"Score: {app.sim.score}", 10, HEIGHT - 30, arcade.color.WHITE, 20)
+    arcade.draw_text(f"Level: {app.sim.level_manager.current_level}", 10, HEIGHT - 60, arcade.color.WHITE, 16)
+    arcade.draw_text(f"Bird select: {app.forced_bird_type or 'auto'}", 10, HEIGHT - 90, arcade.color.WHITE, 14)
+
+
+def aim(app: App, frame: int, moving: bool):
+    t = frame * 0.05 if moving else 0.0
+    app.end_point = Point2D(SLINGSHOT_X - 90 * math.cos(0.5 + 0.3 * math.sin(t)),
+                            SLINGSHOT_Y - 90 * math.sin(0.5 + 0.3 * math.sin(t)))
+    app.preview_dirty = True
+
+
+def run(window: arcade.Window, app: App, draw, moving: bool, counter: DrawCallCounter):
+    submit = np.empty(FRAMES)
+    total = np.empty(FRAMES)
+    calls = 0
+    for frame in range(-WARMUP, FRAMES):
+        aim(app, frame, moving)
+        before = counter.calls
+        start = time.perf_counter()
+        draw(app)
+        submitted = time.perf_counter()
+        window.ctx.finish()
+        done = time.perf_counter()
+        if frame >= 0:
+            submit[frame] = submitted - start
+            total[frame] = done - start
+            calls += counter.calls - before
+    return calls / FRAMES, np.median(submit) * 1e3, np.median(total) * 1e3
+
+
+def main():
+    window = arcade.Window(WIDTH, HEIGHT, "bench", visible=False)
+    print(f"renderer: {window.ctx.info.RENDERER}")
+    app = App()
+    window.show_view(app)
+    counter = DrawCallCounter()
+
+    app.start_point = Point2D(SLINGSHOT_X, SLINGSHOT_Y)
+    app.draw_line = True
+    best = ShotResult("red", math.radians(20), 90.0, None, 1, 200)
+    app.show_hint(Solution(best, 1, 1, 0, 0.0, 0.0))
+
+    print(f"{'case':>6} {'draw':>10} {'calls/frame':>12} {'on_draw ms':>11} {'+finish ms':>11}")
+    for moving, case in ((False, "hold"), (True, "drag")):
+        for name, draw in (("immediate", legacy_draw), ("batched", App.on_draw)):
+            calls, submit, total = run(window, app, draw, moving, counter)
+            print(f"{case:>6} {name:>10} {calls:>12.1f} {submit:>11.3f} {total:>11.3f}")
+    print(f"preview rebuilds: {app.preview_batch.rebuilds}, score label layouts: {app.score_label.layouts}")
+    app.sim.close()
+    window.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark: estado de entidades en atributos sueltos vs. el EntityStore, y
+la matemática de game_logic de a un punto vs. por lotes, con N entidades.
+
+- value types: memoria de N Point2D / ImpulseVector con y sin __slots__.
+- estado: memoria de tipo, flags, masa, radio y vida como atributos de
+  instancia (como estaban en Bird: _mass, _radius, launched...) vs. como
+  los guarda hoy PhysicsSprite: los mismos atributos (menos la vida) en su
+  __dict__ más la fila del EntityStore, que los copia. Cuentan las dos
+  copias: el store no ahorra memoria, está para los recorridos en bloque.
+- lectura y escritura: flags de las N entidades con getattr(e, "launched",
+  False) (como hacía Simulation.snapshot), con el atributo de la entidad
+  (copiado al store al escribirlo) y por lotes sobre la columna.
+- matemática: get_impulse_vector por par vs. get_impulse_vectors.
+- snapshot: Simulation.snapshot con N columnas en el mundo.
+
+    python benchmarks/bench_entity_store.py [N]
+"""
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from entity_store import ENTITIES, LAUNCHED, EntityStore, slots_of  # noqa: E402
+from game_logic import ImpulseVector, Point2D, get_impulse_vector, get_impulse_vectors  # noqa: E402
+from game_object import Column  # noqa: E402
+from simulation import Simulation  # noqa: E402
+
+N = 10_000
+REPEAT = 20
+
+
+@dataclass
+class DictPoint2D:
+    x: float = 0
+    y: float = 0
+
+
+@dataclass
+class DictImpulseVector:
+    angle: float
+    impulse: float
+
+
+class AttributeState:
+    """El estado tal como lo guardaba cada entidad antes del store."""
+    def __init__(self, kind: str, mass: float, radius: float):
+        self.kind = kind
+        self._mass = mass
+        self._radius = radius
+        self.health = 1.0
+        self.launched = False
+        self.used_ability = False
+
+
+class MirroredState:
+    """El estado como lo guarda PhysicsSprite: atributos en el __dict__ (la vida no) más una fila del store."""
+    def __init__(self, store: EntityStore, kind: str, mass: float, radius: float):
+        self.slot = store.allocate(kind, mass, radius)
+        self.__dict__.update(kind=kind, mass=mass, radius=radius, launched=False, used_ability=False)
+
+
+def allocated(build) -> float:
+    """Bytes por elemento que asigna build() (la lista en sí no cuenta)."""
+    tracemalloc.start()
+    items = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (current - sys.getsizeof(items)) / N
+
+
+def per_call(fn) -> float:
+    """us por llamada de fn (la mejor de REPEAT)."""
+    best = math.inf
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def main():
+    global N
+    if len(sys.argv) > 1:
+        N = int(sys.argv[1])
+    rng = random.Random(0)
+    coords = [(rng.uniform(0, 400), rng.uniform(0, 400)) for _ in range(N)]
+
+    print(f"N = {N}")
+    print(f"{'value types (B/elem)':<34} {'dict':>10} {'slots':>10}")
+    print(f"{'  Point2D':<34} {allocated(lambda: [DictPoint2D(x, y) for x, y in coords]):>10.0f} "
+          f"{allocated(lambda: [Point2D(x, y) for x, y in coords]):>10.0f}")
+    print(f"{'  ImpulseVector':<34} {allocated(lambda: [DictImpulseVector(x, y) for x, y in coords]):>10.0f} "
+          f"{allocated(lambda: [ImpulseVector(x, y) for x, y in coords]):>10.0f}")
+
+    # el store se crea lleno: sus columnas ya están asignadas y cada fila cuesta store.nbytes / N
+    store = EntityStore(N)
+    attr_bytes = allocated(lambda: [AttributeState("passive", 2.0, 12.0) for _ in range(N)])
+    mirrored_bytes = allocated(lambda: [MirroredState(store, "passive", 2.0, 12.0) for _ in range(N)])
+    row_bytes = store.nbytes / N
+    print(f"{'entity state (B/entity)':<34} {'attrs':>10} {'dict+row':>10} {'(row)':>10}")
+    print(f"{'  kind, flags, mass, radius, health':<34} {attr_bytes:>10.0f} {mirrored_bytes + row_bytes:>10.0f} "
+          f"{row_bytes:>10.0f}")
+
+    sim = Simulation(track_poses=False, pool_warmup={})
+    columns = [Column(100 + (i % 100) * 20, 50 + (i // 100) * 120, sim.space) for i in range(N)]
+    for column in columns:
+        sim.sprites.append(column)
+        sim.world.append(column)
+    old = [AttributeState("passive", 2.0, 0.0) for _ in range(N)]
+    slots = slots_of(columns)
+    print(f"{'flags de N entidades (us)':<34} {'getattr':>10} {'entity':>10} {'batch':>10}")
+    print(f"{'':<34} {per_call(lambda: [getattr(e, 'launched', False) for e in old]):>10.0f} "
+          f"{per_call(lambda: [e.launched for e in columns]):>10.0f} "
+          f"{per_call(lambda: ENTITIES.flags[slots] & LAUNCHED):>10.0f}")
+    print(f"{'  (con slots_of en cada lectura)':<34} {'':>10} {'':>10} "
+          f"{per_call(lambda: ENTITIES.flags[slots_of(columns)] & LAUNCHED):>10.0f}")
+
+    def write_old():
+        for e in old:
+            e.launched = True
+
+    def write_entity():
+        for e in columns:
+            e.launched = True
+
+    def write_batch():
+        ENTITIES.flags[slots] |= LAUNCHED
+
+    print(f"{'escritura de N flags (us)':<34} {'attr':>10} {'entity':>10} {'batch':>10}")
+    print(f"{'':<34} {per_call(write_old):>10.0f} {per_call(write_entity):>10.0f} {per_call(write_batch):>10.0f}")
+
+    starts = [Point2D(180, 160)] * N
+    ends = [Point2D(x, y) for x, y in coords]
+    start_array = np.array([(p.x, p.y) for p in starts])
+    end_array = np.array(coords)
+    print(f"{'impulse vectors de N pares (us)':<34} {'scalar':>10} {'batch':>10}")
+    print(f"{'':<34} {per_call(lambda: [get_impulse_vector(a, b) for a, b in zip(starts, ends)]):>10.0f} "
+          f"{per_call(lambda: get_impulse_vectors(start_array, end_array)):>10.0f}")
+
+    start = time.perf_counter()
+    for _ in range(5):
+        sim.snapshot()
+    print(f"snapshot con {len(sim.sprites)} entidades: {(time.perf_counter() - start) / 5 * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
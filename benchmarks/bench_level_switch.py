@@ -0,0 +1,70 @@
+"""
+Benchmark: cuánto bloquea el hilo principal el cambio a un nivel de N
+columnas cuando su precarga ya terminó (ver LevelManager.prefetch y
+Simulation.prepare_level).
+
+El nivel 0 es un cerdo suelto; el nivel 1, N columnas en filas sobre el
+piso, en una pantalla o repartidas en un mundo ancho (con streaming, solo
+las del rango vivo entran al space). Por caso se reporta el tiempo de la
+precarga en el worker y el que bloqueó el cambio de nivel (commit al space
+y a las sprite lists, más el snapshot de inicio del nivel).
+
+    python benchmarks/bench_level_switch.py [N ...]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation import WIDTH, Simulation  # noqa: E402
+
+SIZES = (500, 1000, 3000)
+WIDTHS = (WIDTH, 12 * WIDTH)
+COLUMN_PITCH = 28
+
+
+def write_levels(levels_dir: str, n: int, width: float):
+    pig = {"type": "pig", "x": 60, "y": 30}
+    with open(os.path.join(levels_dir, "level_0.json"), "w") as f:
+        json.dump({"name": "inicio", "threshold": 0, "clear": True, "entities": [pig]}, f)
+    per_row = int((width - 400) // COLUMN_PITCH)
+    columns = [{"type": "column", "x": 300 + (i % per_row) * COLUMN_PITCH, "y": 75 + (i // per_row) * 120}
+               for i in range(n)]
+    with open(os.path.join(levels_dir, "level_1.json"), "w") as f:
+        json.dump({"name": f"{n} columnas", "threshold": 100, "clear": True, "width": width,
+                   "entities": columns}, f)
+
+
+def measure(n: int, width: float):
+    with tempfile.TemporaryDirectory() as levels_dir:
+        write_levels(levels_dir, n, width)
+        sim = Simulation(track_poses=False, levels_dir=levels_dir)
+        manager = sim.level_manager
+        start = time.perf_counter()
+        for future in list(manager._futures.values()):
+            future.result()
+        preload = time.perf_counter() - start
+        sim.score = 100
+        sim.step()
+        _, blocked, waited = manager.transition_times[-1]
+        live, frozen = len(sim.sprites), len(sim.chunks)
+        sim.close()
+    return preload, blocked, waited, live, frozen
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or list(SIZES)
+    print(f"{'columns':>8} {'width':>7} {'live':>6} {'frozen':>7} {'preload ms':>11} {'blocked ms':>11} {'waited ms':>10}")
+    for n in sizes:
+        for width in WIDTHS:
+            preload, blocked, waited, live, frozen = measure(n, width)
+            print(f"{n:>8} {width:>7.0f} {live:>6} {frozen:>7} {preload * 1e3:>11.1f} {blocked * 1e3:>11.1f} "
+                  f"{waited * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
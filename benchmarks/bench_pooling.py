@@ -0,0 +1,60 @@
+"""
+Benchmark: asignaciones y GC en disparos rápidos con y sin EntityPool.
+
+Dispara SHOTS pájaros alternando rojo/amarillo/azul (los azules se dividen
+en vuelo) y compara entidades construidas, colecciones del GC y memoria
+asignada (tracemalloc) entre pooling=True y pooling=False.
+
+    python benchmarks/bench_pooling.py
+"""
+import gc
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic import ImpulseVector  # noqa: E402
+from simulation import Simulation  # noqa: E402
+
+SHOTS = 300
+TICKS_BEFORE_ABILITY = 15
+TICKS_AFTER_ABILITY = 45
+KINDS = ("red", "yellow", "blue")
+
+
+def run(pooling: bool):
+    sim = Simulation(track_poses=False, pooling=pooling)
+    gc.collect()
+    collections_before = sum(s["collections"] for s in gc.get_stats())
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(SHOTS):
+        # disparos altos: salen de la escena y vuelven al pool por los sensores
+        sim.launch_bird(KINDS[i % 3], ImpulseVector(math.radians(70), 200))
+        for _ in range(TICKS_BEFORE_ABILITY):
+            sim.step()
+        sim.activate_ability()
+        for _ in range(TICKS_AFTER_ABILITY):
+            sim.step()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot_size = sum(stat.size for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+    collections = sum(s["collections"] for s in gc.get_stats()) - collections_before
+    return sim.pool.created, collections, peak, snapshot_size, elapsed
+
+
+def main():
+    print(f"{'pooling':>8} {'created':>8} {'gc runs':>8} {'peak KiB':>9} {'live KiB':>9} {'ms/shot':>8}")
+    for pooling in (False, True):
+        created, collections, peak, live, elapsed = run(pooling)
+        print(f"{str(pooling):>8} {created:>8} {collections:>8} {peak / 1024:>9.0f} "
+              f"{live / 1024:>9.0f} {elapsed / SHOTS * 1e3:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
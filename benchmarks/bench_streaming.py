@@ -0,0 +1,118 @@
+"""
+Benchmark: costo de niveles de N pantallas de ancho con y sin streaming por
+chunks (ver chunks.py y Simulation.stream_chunks).
+
+Cada nivel repite el mismo patrón (una torre de dos columnas, viga y cerdo
+cada 600 px), así que la cantidad de entidades crece con el ancho. Por
+ancho y modo, en un proceso nuevo:
+
+- carga: tiempo de construir el nivel (Simulation + nivel 0).
+- bodies: bodies en el space y entidades congeladas tras la carga.
+- idle: p50 del tick con el nivel asentado.
+- vuelo: p50/p95 del tick con un YellowBird cruzando el nivel (boost a
+  los 30 ticks), que va descongelando y congelando chunks a su paso.
+- memoria: bloques de Python vivos (tracemalloc, tras un gc.collect) al
+  terminar la carga y RSS máximo.
+
+    python benchmarks/bench_streaming.py [pantallas ...]
+"""
+import gc
+import json
+import math
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from game_logic import ImpulseVector  # noqa: E402
+from simulation import WIDTH, Simulation  # noqa: E402
+
+SCREENS = (1, 4, 16, 64)
+TOWER_PITCH = 600
+SETTLE_TICKS = 120
+IDLE_TICKS = 120
+FLIGHT_TICKS = 400
+
+
+def write_level(levels_dir: str, screens: int):
+    """Nivel de screens pantallas con una torre cada TOWER_PITCH px."""
+    entities = []
+    for x in range(900, screens * WIDTH - 200, TOWER_PITCH):
+        entities += [
+            {"type": "column", "x": x - 30, "y": 60},
+            {"type": "column", "x": x + 30, "y": 60},
+            {"type": "beam", "x": x, "y": 115.5},
+            {"type": "pig", "x": x, "y": 142.4},
+        ]
+    level = {"name": f"{screens} pantallas", "threshold": 0, "clear": True, "width": screens * WIDTH,
+             "entities": entities}
+    with open(os.path.join(levels_dir, "level_0.json"), "w") as f:
+        json.dump(level, f)
+
+
+def ticks_ms(sim: Simulation, n: int, ability: int = -1) -> np.ndarray:
+    times = np.empty(n)
+    for i in range(n):
+        if i == ability:
+            sim.activate_ability()
+        start = time.perf_counter()
+        sim.step()
+        times[i] = time.perf_counter() - start
+    return times * 1e3
+
+
+def measure(screens: int, streaming: bool) -> dict:
+    with tempfile.TemporaryDirectory() as levels_dir:
+        write_level(levels_dir, screens)
+        tracemalloc.start()
+        start = time.perf_counter()
+        sim = Simulation(track_poses=False, pool_warmup={}, levels_dir=levels_dir, streaming=streaming)
+        load = time.perf_counter() - start
+        gc.collect()
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        entities = len(sim.sprites) + len(sim.chunks)
+        bodies = len(sim.space.bodies)
+        frozen = len(sim.chunks)
+        ticks_ms(sim, SETTLE_TICKS)
+        idle = ticks_ms(sim, IDLE_TICKS)
+        sim.launch_bird("yellow", ImpulseVector(math.radians(30), 240))
+        flight = ticks_ms(sim, FLIGHT_TICKS, ability=30)
+        sim.close()
+    return {
+        "entities": entities,
+        "bodies": bodies,
+        "frozen": frozen,
+        "load_ms": load * 1e3,
+        "idle_p50": float(np.percentile(idle, 50)),
+        "flight_p50": float(np.percentile(flight, 50)),
+        "flight_p95": float(np.percentile(flight, 95)),
+        "traced_kib": traced / 1024,
+        "max_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    screens = [int(a) for a in sys.argv[1:]] or list(SCREENS)
+    print(f"{'screens':>7} {'mode':>9} {'entities':>8} {'bodies':>7} {'frozen':>7} {'load ms':>8} "
+          f"{'idle p50':>9} {'fly p50':>8} {'fly p95':>8} {'py KiB':>8} {'RSS MiB':>8}")
+    ctx = multiprocessing.get_context("spawn")
+    for n in screens:
+        for streaming in (False, True):
+            with ctx.Pool(1) as pool:
+                r = pool.apply(measure, (n, streaming))
+            print(f"{n:>7} {'chunks' if streaming else 'all-live':>9} {r['entities']:>8} {r['bodies']:>7} "
+                  f"{r['frozen']:>7} {r['load_ms']:>8.0f} {r['idle_p50']:>9.3f} {r['flight_p50']:>8.3f} "
+                  f"{r['flight_p95']:>8.3f} {r['traced_kib']:>8.0f} {r['max_rss_mib']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
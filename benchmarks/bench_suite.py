@@ -0,0 +1,378 @@
+"""
+Suite de benchmarks headless: escenarios que ejercitan la física del juego
+(Simulation, game_object) sin ventana y guardan los resultados en JSON.
+
+Escenarios (ver SCENARIOS):
+
+- idle: el nivel 0 ya asentado, sin disparos.
+- tower_100 / tower_1k / tower_5k: paredes de N Column sobre el piso (las
+  de 1k y 5k son tan altas que se derrumban: es el peor caso de contactos).
+- pig_destruction: columnas que caen sobre una grilla de cerdos; cada
+  contacto pasa por Simulation.apply_damage y la mayoría destruye.
+- blue_split: BlueBird lanzados en ráfaga que se dividen en vuelo, con los
+  hijos de varios disparos vivos a la vez.
+- yellow_boost: YellowBird lanzados en ráfaga con boost apenas salen.
+- preview_aim: apuntado con la preview analítica (la de
+  App.compute_predicted_path) recalculada por varios movimientos del mouse
+  por frame, con caché fría, mientras la física sigue corriendo.
+
+Cada iteración es un frame del juego (step + sync_sprites). Por escenario
+se reporta el tiempo por frame (p50/p95/p99/max), callbacks de colisión
+que llegan a Python, arbiters leídos en bloque,
+colecciones del GC, bloques asignados y pico de memoria de Python
+(tracemalloc, en una segunda corrida para no ensuciar los tiempos) y el
+RSS máximo del proceso. Cada escenario corre en un proceso nuevo.
+
+    python benchmarks/bench_suite.py                      # todo -> benchmarks/results/
+    python benchmarks/bench_suite.py -s tower_1k -s idle
+    python benchmarks/bench_suite.py --compare base.json head.json
+
+--compare marca los escenarios cuyo p50/p95 o pico de memoria empeoró más
+de --threshold (relativo) y sale con código 1 si hay alguno.
+"""
+import gc
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from game_logic import ImpulseVector, Point2D  # noqa: E402
+from game_object import Column  # noqa: E402
+from preview import _cached_path, predict_path  # noqa: E402
+from simulation import SLINGSHOT_X, SLINGSHOT_Y, WIDTH, Simulation  # noqa: E402
+
+RESULTS_DIR = "benchmarks/results"
+# versión del formato del JSON; --compare rechaza las que no coinciden
+RESULTS_VERSION = 1
+PERCENTILES = (50, 95, 99)
+# un escenario empeoró si p50/p95/pico de memoria crecen más que esto...
+THRESHOLD = 0.10
+# ...y además por más de estos valores absolutos (ruido de medición)
+MIN_DELTA_MS = 0.05
+MIN_DELTA_KIB = 256
+
+# paredes de columnas: COLUMN_PITCH px entre columnas, filas separadas por su alto
+COLUMN_PITCH = 28
+WALL_LEFT = 300
+WALL_RIGHT = WIDTH - 50
+FLOOR_Y = 15
+
+# Frame = Callable[[Simulation, int], None]: lo que hace el escenario en el frame i
+Frame = Callable[[Simulation, int], None]
+
+
+@dataclass
+class Scenario:
+    description: str
+    setup: Callable[[], Tuple[Simulation, Frame]]
+    # frames medidos y frames previos sin medir (asentar, calentar cachés)
+    frames: int
+    warmup: int = 0
+
+
+# ------------------------
+# Escenarios
+# ------------------------
+def arena() -> Simulation:
+    """Simulation vacía (solo piso y sensores) que no cambia de nivel."""
+    sim = Simulation()
+    sim.clear_world()
+    manager = sim.level_manager
+    # se queda en el último nivel: destruir cerdos no carga el siguiente
+    del manager.levels[manager.current_level + 1:]
+    manager.close()
+    return sim
+
+
+def _physics(sim: Simulation, i: int):
+    sim.step()
+    sim.sync_sprites()
+
+
+def add_wall(sim: Simulation, n: int, left: float = WALL_LEFT, right: float = WALL_RIGHT, bottom: float = FLOOR_Y):
+    """n columnas en filas de izquierda a derecha, apoyadas sobre bottom."""
+    per_row = int((right - left) // COLUMN_PITCH) + 1
+    for i in range(n):
+        row, col = divmod(i, per_row)
+        column = Column(left + col * COLUMN_PITCH, 0, sim.space)
+        column.body.position = (column.body.position.x, bottom + column.height * (row + 0.5))
+        sim.sprites.append(column)
+        sim.world.append(column)
+
+
+def setup_idle() -> Tuple[Simulation, Frame]:
+    return Simulation(), _physics
+
+
+def setup_tower(n: int) -> Callable[[], Tuple[Simulation, Frame]]:
+    def setup():
+        sim = arena()
+        add_wall(sim, n)
+        return sim, _physics
+    return setup
+
+
+PIG_ROWS, PIG_COLUMNS = 4, 40
+
+
+def setup_pig_destruction() -> Tuple[Simulation, Frame]:
+    sim = arena()
+    for row in range(PIG_ROWS):
+        for col in range(PIG_COLUMNS):
+            sim.spawn_pig(WALL_LEFT + col * 35, FLOOR_Y + 20 + row * 40)
+    # una capa de columnas bien arriba: caen sobre los cerdos
+    add_wall(sim, PIG_COLUMNS, right=WALL_LEFT + (PIG_COLUMNS - 1) * 35, bottom=FLOOR_Y + 600)
+    return sim, _physics
+
+
+def _burst(kind: str, every: int, ability_after: int, angle_deg: float, impulse: float) -> Frame:
+    """Un disparo cada `every` frames y la habilidad `ability_after` frames después."""
+    def frame(sim: Simulation, i: int):
+        if i % every == 0:
+            sim.launch_bird(kind, ImpulseVector(math.radians(angle_deg), impulse))
+        elif i % every == ability_after:
+            sim.activate_ability()
+        _physics(sim, i)
+    return frame
+
+
+def setup_blue_split() -> Tuple[Simulation, Frame]:
+    # frente a una pared de columnas para que los hijos choquen
+    sim = arena()
+    add_wall(sim, 200, left=1000)
+    return sim, _burst("blue", every=8, ability_after=6, angle_deg=25, impulse=150)
+
+
+def setup_yellow_boost() -> Tuple[Simulation, Frame]:
+    sim = arena()
+    add_wall(sim, 200, left=1000)
+    return sim, _burst("yellow", every=6, ability_after=2, angle_deg=15, impulse=180)
+
+
+# movimientos del mouse por frame mientras se arrastra
+PREVIEW_MOVES = 8
+
+
+def setup_preview_aim() -> Tuple[Simulation, Frame]:
+    sim = Simulation()
+    _cached_path.cache_clear()
+    start = Point2D(SLINGSHOT_X, SLINGSHOT_Y)
+    kinds = ("red", "yellow", "blue")
+
+    def frame(sim: Simulation, i: int):
+        # el arrastre recorre un arco hacia atrás del slingshot (con idas y
+        # vueltas: parte de los puntos repite celdas de la caché)
+        for m in range(PREVIEW_MOVES):
+            t = (i * PREVIEW_MOVES + m) * 0.013
+            r = 60 + 50 * math.sin(t * 0.7)
+            end = Point2D(SLINGSHOT_X - r * math.cos(math.sin(t)), SLINGSHOT_Y - r * math.sin(math.sin(t)))
+            predict_path(start, end, kinds[(i // 60) % 3], sim.space.gravity, params=sim.bird_params)
+        _physics(sim, i)
+
+    return sim, frame
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "idle": Scenario("nivel 0 asentado, sin disparos", setup_idle, frames=600, warmup=240),
+    "tower_100": Scenario("pared de 100 columnas", setup_tower(100), frames=300, warmup=60),
+    "tower_1k": Scenario("pared de 1000 columnas", setup_tower(1000), frames=300, warmup=60),
+    "tower_5k": Scenario("pared de 5000 columnas", setup_tower(5000), frames=120, warmup=30),
+    "pig_destruction": Scenario(f"{PIG_ROWS * PIG_COLUMNS} cerdos aplastados por columnas",
+                                setup_pig_destruction, frames=240),
+    "blue_split": Scenario("ráfaga de BlueBird con split", setup_blue_split, frames=480),
+    "yellow_boost": Scenario("ráfaga de YellowBird con boost", setup_yellow_boost, frames=480),
+    "preview_aim": Scenario(f"preview analítica, {PREVIEW_MOVES} movimientos por frame, caché fría",
+                            setup_preview_aim, frames=600),
+}
+
+
+# ------------------------
+# Medición (en un proceso por escenario)
+# ------------------------
+def _prepare(scenario: Scenario) -> Tuple[Simulation, Frame]:
+    sim, frame = scenario.setup()
+    for i in range(scenario.warmup):
+        frame(sim, i)
+    gc.collect()
+    return sim, frame
+
+
+def measure(name: str) -> Dict:
+    scenario = SCENARIOS[name]
+
+    # 1) tiempos, sin tracemalloc
+    sim, frame = _prepare(scenario)
+    times = np.empty(scenario.frames, dtype=np.int64)
+    callbacks = sim.callback_events
+    contacts = sim.contact_events
+    score = sim.score
+    collections = [s["collections"] for s in gc.get_stats()]
+    blocks = sys.getallocatedblocks()
+    clock = time.perf_counter_ns
+    for i in range(scenario.warmup, scenario.warmup + scenario.frames):
+        start = clock()
+        frame(sim, i)
+        times[i - scenario.warmup] = clock() - start
+    blocks = sys.getallocatedblocks() - blocks
+    collections = [s["collections"] - c for s, c in zip(gc.get_stats(), collections)]
+    callbacks = sim.callback_events - callbacks
+    contacts = sim.contact_events - contacts
+    result = {
+        "description": scenario.description,
+        "frames": scenario.frames,
+        "entities": len(sim.sprites),
+        "ms": dict(zip((f"p{p}" for p in PERCENTILES), np.percentile(times / 1e6, PERCENTILES).tolist())),
+        "callbacks": callbacks,
+        "callbacks_per_frame": callbacks / scenario.frames,
+        "contacts_per_frame": contacts / scenario.frames,
+        "gc_collections": collections,
+        "net_blocks": blocks,
+        "pigs_destroyed": (sim.score - score) // 100,
+    }
+    result["ms"]["mean"] = float(times.mean() / 1e6)
+    result["ms"]["max"] = float(times.max() / 1e6)
+    sim.close()
+
+    # 2) memoria: la misma corrida con tracemalloc
+    sim, frame = _prepare(scenario)
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    for i in range(scenario.warmup, scenario.warmup + scenario.frames):
+        frame(sim, i)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    sim.close()
+    result["memory"] = {
+        "peak_kib": (peak - base) / 1024,
+        "retained_kib": (current - base) / 1024,
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    return result
+
+
+def run_isolated(name: str) -> Dict:
+    """Corre measure(name) en un proceso nuevo (RSS y GC sin lo de otros escenarios)."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(measure, (name,))
+
+
+def environment() -> Dict:
+    def git(*args) -> str:
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    import arcade
+    import pymunk
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "pymunk": pymunk.version,
+        "arcade": arcade.version.VERSION,
+        "numpy": np.__version__,
+    }
+
+
+def run(names: List[str], out: Optional[str] = None) -> str:
+    env = environment()
+    results = {"version": RESULTS_VERSION, "environment": env, "scenarios": {}}
+    print(f"{'scenario':>16} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'cb/frame':>9} {'ct/frame':>9} "
+          f"{'gc0':>5} {'peak KiB':>9} {'RSS MiB':>8}")
+    for name in names:
+        r = results["scenarios"][name] = run_isolated(name)
+        print(f"{name:>16} {r['ms']['p50']:>8.3f} {r['ms']['p95']:>8.3f} {r['ms']['p99']:>8.3f} "
+              f"{r['callbacks_per_frame']:>9.1f} {r['contacts_per_frame']:>9.1f} {r['gc_collections'][0]:>5} "
+              f"{r['memory']['peak_kib']:>9.0f} {r['memory']['max_rss_kib'] / 1024:>8.1f}")
+    if out is None:
+        out = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{env['commit'] or 'nogit'}.json")
+    if os.path.dirname(out):
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"-> {out}")
+    return out
+
+
+# ------------------------
+# Comparación
+# ------------------------
+def load(path: str) -> Dict:
+    with open(path) as f:
+        results = json.load(f)
+    if results.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: versión {results.get('version')}, se esperaba {RESULTS_VERSION}")
+    return results
+
+
+def compare(base: Dict, head: Dict, threshold: float = THRESHOLD) -> List[Tuple[str, str, float, float, bool]]:
+    """(escenario, métrica, base, head, empeoró) para los escenarios de ambos."""
+    rows = []
+    for name in base["scenarios"]:
+        if name not in head["scenarios"]:
+            continue
+        b, h = base["scenarios"][name], head["scenarios"][name]
+        for metric, old, new, floor in (
+            ("p50 ms", b["ms"]["p50"], h["ms"]["p50"], MIN_DELTA_MS),
+            ("p95 ms", b["ms"]["p95"], h["ms"]["p95"], MIN_DELTA_MS),
+            ("peak KiB", b["memory"]["peak_kib"], h["memory"]["peak_kib"], MIN_DELTA_KIB),
+            ("callbacks/frame", b["callbacks_per_frame"], h["callbacks_per_frame"], math.inf),
+        ):
+            worse = new > old * (1 + threshold) and new - old > floor
+            rows.append((name, metric, old, new, worse))
+    return rows
+
+
+def print_comparison(base: Dict, head: Dict, threshold: float) -> int:
+    rows = compare(base, head, threshold)
+    print(f"base {base['environment']['commit']} ({base['environment']['date']}) -> "
+          f"head {head['environment']['commit']} ({head['environment']['date']}), umbral {threshold:.0%}")
+    print(f"{'scenario':>16} {'metric':>16} {'base':>10} {'head':>10} {'change':>8}")
+    for name, metric, old, new, worse in rows:
+        change = (new - old) / old if old else 0.0
+        print(f"{name:>16} {metric:>16} {old:>10.3f} {new:>10.3f} {change:>+8.1%}" + ("  REGRESSION" if worse else ""))
+    regressions = sum(worse for *_, worse in rows)
+    if regressions:
+        print(f"{regressions} regresiones")
+        return 1
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmarks headless de la física por escenario.")
+    parser.add_argument("-s", "--scenario", action="append", choices=list(SCENARIOS),
+                        help="escenario a correr (repetible; por defecto todos)")
+    parser.add_argument("-o", "--out", help=f"archivo JSON (por defecto {RESULTS_DIR}/<fecha>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"),
+                        help="compara dos resultados en vez de correr")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return print_comparison(load(args.compare[0]), load(args.compare[1]), args.threshold)
+    run(args.scenario or list(SCENARIOS), args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,217 @@
+import math
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from snapshot import ENTITY_DTYPE
+
+# ancho (px) de un chunk: franja vertical del mundo con todo lo que cae en ella
+CHUNK_WIDTH = 600
+# un chunk congelado se descongela cuando algún foco (slingshot, vista o
+# pájaro en vuelo) queda a menos de THAW_DISTANCE de él, y uno vivo se
+# congela recién a FREEZE_DISTANCE (histéresis: un pájaro que ronda un borde
+# no lo congela y descongela en cada paso)
+THAW_DISTANCE = 1800
+FREEZE_DISTANCE = THAW_DISTANCE + CHUNK_WIDTH
+
+
+def chunk_of(x: float, chunk_width: float = CHUNK_WIDTH) -> int:
+    return math.floor(x / chunk_width)
+
+
+def chunks_near(foci: Iterable[float], distance: float, chunk_width: float = CHUNK_WIDTH) -> Set[int]:
+    """Chunks cuya franja está a menos de distance de algún foco."""
+    near: Set[int] = set()
+    for x in foci:
+        near.update(range(chunk_of(x - distance, chunk_width), chunk_of(x + distance, chunk_width) + 1))
+    return near
+
+
+def structure_labels(boxes: np.ndarray, margin: float) -> np.ndarray:
+    """
+    Estructuras de un conjunto de cajas (una fila left, bottom, right, top
+    por entidad): componentes conexas de las que quedan a menos de margin,
+    como las arma Simulation._structures pero sin space. Devuelve el id de
+    estructura de cada caja, numeradas en orden de primera aparición.
+    """
+    n = len(boxes)
+    if not n:
+        return np.empty(0, dtype=np.int64)
+    # barrido por left: las candidatas de i son las que empiezan antes de su right + margin
+    order = np.argsort(boxes[:, 0], kind="stable")
+    left, bottom, right, top = boxes[order].T
+    start = np.arange(1, n + 1)
+    counts = np.maximum(np.searchsorted(left, right + margin, side="right") - start, 0)
+    i = np.repeat(np.arange(n), counts)
+    j = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(start, counts)
+    touch = (bottom[j] <= top[i] + margin) & (top[j] >= bottom[i] - margin)
+    parent = list(range(n))
+
+    def find(k: int) -> int:
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    for a, b in zip(i[touch].tolist(), j[touch].tolist()):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    roots = np.empty(n, dtype=np.int64)
+    roots[order] = [find(k) for k in range(n)]
+    _, first, inverse = np.unique(roots, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[np.argsort(first)] = np.arange(len(first))
+    return rank[inverse]
+
+
+def merge_rows(parts: Sequence[Tuple[np.ndarray, Tuple[str, ...]]]) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """
+    Concatena filas de ENTITY_DTYPE que traen cada una su tabla de imágenes,
+    re-indexando "image" contra una tabla común.
+    """
+    images: Dict[str, int] = {}
+    merged = []
+    for rows, table in parts:
+        rows = rows.copy()
+        if len(table):
+            lut = np.array([images.setdefault(path, len(images)) for path in table], dtype=rows["image"].dtype)
+            rows["image"] = np.where(rows["image"] >= 0, lut[np.maximum(rows["image"], 0)], -1)
+        merged.append(rows)
+    entities = np.concatenate(merged) if merged else np.empty(0, dtype=ENTITY_DTYPE)
+    return entities, tuple(images)
+
+
+@dataclass
+class FrozenChunk:
+    """
+    Entidades de un chunk fuera del space: las mismas filas de ENTITY_DTYPE
+    que guarda WorldSnapshot (pose, velocidades, flags, vida y lo necesario
+    para reconstruirlas) con su tabla de imágenes. Guarda las estructuras
+    cuya x mínima cae en el chunk; last es el chunk más a la derecha que
+    alguna de ellas ocupa.
+    """
+    entities: np.ndarray
+    images: Tuple[str, ...]
+    last: int
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    @property
+    def nbytes(self) -> int:
+        return self.entities.nbytes
+
+
+class ChunkMap:
+    """
+    Estado congelado de los chunks lejanos. Un chunk sin entrada en frozen
+    está vivo (sus entidades, si tiene, están en el space). La unidad que se
+    congela es la estructura (entidades en contacto, ver
+    Simulation._structures), no el chunk: una torre sobre un borde no se
+    parte. No crea ni remueve entidades: eso lo hace Simulation (ver
+    Simulation.stream_chunks).
+    """
+    def __init__(self, chunk_width: float = CHUNK_WIDTH, thaw_distance: float = THAW_DISTANCE,
+                 freeze_distance: float = FREEZE_DISTANCE):
+        self.chunk_width = chunk_width
+        self.thaw_distance = thaw_distance
+        self.freeze_distance = max(freeze_distance, thaw_distance)
+        self.frozen: Dict[int, FrozenChunk] = {}
+        # próximo id libre para la columna "group" de las filas congeladas
+        self._next_group = 0
+        # chunks de más que ocupa la estructura más ancha (ver to_thaw)
+        self._span = 0
+
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self.frozen.values())
+
+    @property
+    def nbytes(self) -> int:
+        return sum(chunk.nbytes for chunk in self.frozen.values())
+
+    def chunk_of(self, x: float) -> int:
+        return chunk_of(x, self.chunk_width)
+
+    def count(self, code: int) -> int:
+        """Entidades congeladas con ese código de tipo (ver ENTITY_KINDS)."""
+        return sum(int(np.count_nonzero(chunk.entities["kind"] == code)) for chunk in self.frozen.values())
+
+    def to_thaw(self, foci: Sequence[float]) -> List[int]:
+        """Chunks congelados con alguna estructura en rango, los más cercanos a un foco primero."""
+        near = chunks_near(foci, self.thaw_distance, self.chunk_width)
+        # una estructura guardada en index ocupa a lo sumo hasta index + _span
+        found = [index for index in {i - d for i in near for d in range(self._span + 1)} & self.frozen.keys()
+                 if not near.isdisjoint(range(index, self.frozen[index].last + 1))]
+        width = self.chunk_width
+
+        def distance(index: int) -> float:
+            left, right = index * width, (self.frozen[index].last + 1) * width
+            return min(max(left - x, x - right, 0.0) for x in foci)
+
+        return sorted(found, key=lambda index: (distance(index), index))
+
+    def keep_live(self, foci: Iterable[float]) -> Set[int]:
+        """Chunks que no se congelan."""
+        return chunks_near(foci, self.freeze_distance, self.chunk_width)
+
+    def new_groups(self, count: int) -> int:
+        """Reserva count ids de estructura consecutivos; devuelve el primero."""
+        first = self._next_group
+        self._next_group += count
+        return first
+
+    def freeze(self, entities: np.ndarray, images: Tuple[str, ...]) -> Set[int]:
+        """
+        Guarda filas de entidades congeladas. Las filas con el mismo "group"
+        son una estructura: va entera al chunk de su x mínima y vuelve cuando
+        cualquiera de los chunks que ocupa entra en rango. Devuelve los
+        chunks tocados.
+        """
+        indices = np.floor(entities["x"] / self.chunk_width).astype(np.int64)
+        groups, inverse = np.unique(entities["group"], return_inverse=True)
+        first = np.full(len(groups), np.iinfo(np.int64).max)
+        last = np.full(len(groups), np.iinfo(np.int64).min)
+        np.minimum.at(first, inverse, indices)
+        np.maximum.at(last, inverse, indices)
+        keys = first[inverse]
+        touched = set(keys.tolist())
+        for index in touched:
+            mask = keys == index
+            rows = entities[mask]
+            span = int(last[inverse[mask]].max())
+            chunk = self.frozen.get(index)
+            if chunk is not None:
+                rows, table = merge_rows([(chunk.entities, chunk.images), (rows, images)])
+                span = max(span, chunk.last)
+            else:
+                table = images
+            self.frozen[index] = FrozenChunk(rows, table, span)
+            self._span = max(self._span, span - index)
+        if len(groups):
+            self._next_group = max(self._next_group, int(groups[-1]) + 1)
+        return touched
+
+    def thaw(self, index: int, limit: Optional[int] = None) -> FrozenChunk:
+        """
+        Saca filas del chunk: todas, o con limit solo estructuras enteras (en
+        su orden) hasta limit filas, al menos una; el resto queda congelado.
+        """
+        chunk = self.frozen[index]
+        if limit is None or len(chunk) <= limit:
+            return self.frozen.pop(index)
+        groups = chunk.entities["group"]
+        ids, first, sizes = np.unique(groups, return_index=True, return_counts=True)
+        order = np.argsort(first)
+        take = max(1, int(np.searchsorted(np.cumsum(sizes[order]), limit, side="right")))
+        chosen = np.isin(groups, ids[order[:take]])
+        self.frozen[index] = FrozenChunk(chunk.entities[~chosen], chunk.images, chunk.last)
+        return FrozenChunk(chunk.entities[chosen], chunk.images, chunk.last)
+
+    def items(self) -> Iterator[Tuple[int, FrozenChunk]]:
+        return iter(sorted(self.frozen.items()))
+
+    def clear(self):
+        self.frozen.clear()
+        self._next_group = 0
+        self._span = 0
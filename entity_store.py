@@ -0,0 +1,91 @@
+import threading
+import numpy as np
+from typing import Iterable, List
+
+# tipos de entidad (índice = código en la columna kind)
+ENTITY_KINDS = ("red", "yellow", "blue", "blue_child", "pig", "passive", "static")
+KIND_CODES = {kind: code for code, kind in enumerate(ENTITY_KINDS)}
+
+# bits de la columna flags que son estado de la entidad (los mismos que usa
+# WorldSnapshot, que agrega los suyos en los bits libres)
+LAUNCHED = 1 << 3
+USED_ABILITY = 1 << 4
+ENTITY_FLAGS = LAUNCHED | USED_ABILITY
+
+INITIAL_CAPACITY = 1024
+
+
+class EntityStore:
+    """
+    Estado escalar de las entidades en columnas contiguas (struct of arrays):
+    tipo, flags, masa, radio y vida, una fila por entidad. Cada PhysicsSprite
+    reserva una fila (su slot) al construirse y la libera al destruirse. La
+    lectura por entidad sigue siendo un atributo común (cada escritura se
+    copia a la fila); los recorridos sobre muchas entidades (snapshot,
+    restore, daño) indexan las columnas con un array de slots en vez de leer
+    atributo por atributo.
+    Las filas libres se reusan; al llenarse, las columnas duplican su tamaño
+    en el lugar (los arrays siguen siendo los mismos objetos). Reservar y
+    liberar filas es seguro entre hilos: el worker de precarga construye
+    entidades mientras el hilo principal juega.
+    """
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.kind = np.zeros(capacity, dtype=np.uint8)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        self.mass = np.zeros(capacity, dtype=np.float64)
+        self.radius = np.zeros(capacity, dtype=np.float64)
+        self.health = np.zeros(capacity, dtype=np.float32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        # filas libres; se toman del final (las más bajas primero)
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        # reentrante: el __del__ de una entidad puede liberar su fila desde
+        # una recolección que dispara allocate en el mismo hilo
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.kind) - len(self._free)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.kind)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in (self.kind, self.flags, self.mass, self.radius, self.health, self.alive))
+
+    def allocate(self, kind: str, mass: float = 0.0, radius: float = 0.0, health: float = 1.0) -> int:
+        with self._lock:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+        self.kind[slot] = KIND_CODES[kind]
+        self.flags[slot] = 0
+        self.mass[slot] = mass
+        self.radius[slot] = radius
+        self.health[slot] = health
+        self.alive[slot] = True
+        return slot
+
+    def free(self, slot: int):
+        with self._lock:
+            if self.alive[slot]:
+                self.alive[slot] = False
+                self._free.append(slot)
+
+    def _grow(self):
+        # resize en el lugar: quien tenga una columna (otro hilo a mitad de
+        # una escritura) sigue escribiendo en el array vigente; ninguna
+        # columna tiene vistas vivas (solo se indexan con escalares o slots)
+        old = len(self.kind)
+        for column in (self.kind, self.flags, self.mass, self.radius, self.health, self.alive):
+            column.resize(old * 2, refcheck=False)
+        self._free.extend(range(old * 2 - 1, old - 1, -1))
+
+
+def slots_of(entities: Iterable) -> np.ndarray:
+    """Array con el slot de cada entidad, en el mismo orden."""
+    return np.fromiter((e.slot for e in entities), dtype=np.intp)
+
+
+# store de todas las entidades del proceso (como ASSETS para las texturas)
+ENTITIES = EntityStore()
@@ -1,18 +1,20 @@
 import math
 import arcade
+import numpy as np
 from dataclasses import dataclass
 from logging import getLogger
+from typing import Tuple
 
 logger = getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ImpulseVector:
     angle: float
     impulse: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Point2D:
     x: float = 0
     y: float = 0
@@ -36,4 +38,22 @@ def get_distance(point_a: Point2D, point_b: Point2D) -> float:
 def get_impulse_vector(start_point: Point2D, end_point: Point2D) -> ImpulseVector:
     angle = get_angle_radians(start_point, end_point)
     impulse = get_distance(start_point, end_point)
-    return ImpulseVector(angle, impulse)
\ No newline at end of file
+    return ImpulseVector(angle, impulse)
+
+
+# ------------------------
+# Versiones por lotes: arrays de puntos de forma (n, 2), columnas x, y
+# ------------------------
+def get_angles_radians(points_a: np.ndarray, points_b: np.ndarray) -> np.ndarray:
+    delta = np.asarray(points_a, dtype=np.float64) - np.asarray(points_b, dtype=np.float64)
+    return np.arctan2(delta[..., 1], delta[..., 0])
+
+
+def get_distances(points_a: np.ndarray, points_b: np.ndarray) -> np.ndarray:
+    delta = np.asarray(points_b, dtype=np.float64) - np.asarray(points_a, dtype=np.float64)
+    return np.hypot(delta[..., 0], delta[..., 1])
+
+
+def get_impulse_vectors(start_points: np.ndarray, end_points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(ángulos, impulsos) de cada par start -> end, como get_impulse_vector."""
+    return get_angles_radians(start_points, end_points), get_distances(start_points, end_points)
@@ -1,19 +1,339 @@
+import itertools
+import logging
 import math
+import time
 import arcade
+import numpy as np
 import pymunk
-from typing import List, Optional, Callable, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Callable, Sequence, Tuple
 
+from assets import ASSETS
+from entity_store import ENTITIES, KIND_CODES, LAUNCHED, USED_ABILITY
 from game_logic import ImpulseVector
 
+logger = logging.getLogger(__name__)
 
+
+# -------------------------
+# Categorías de colisión (shape.collision_type): solo los sensores de borde
+# tienen handler; el resto de los shapes queda en 0 (ver collect_contacts)
 # -------------------------
-# Base classes`
+COLLISION_KILL = 1
+
 # -------------------------
-class Bird(arcade.Sprite):
+# Registro shape -> entidad
+# -------------------------
+class ShapeRegistry:
+    """
+    Índice shape -> entidad (y body id -> entidad) de un pymunk.Space. Lo
+    mantienen los constructores de las entidades y sus rutas de remoción, de
+    modo que los handlers de colisión y los contactos leídos en bloque
+    resuelven los objetos de un arbiter en O(1).
+    """
+    def __init__(self):
+        self._entities: Dict[pymunk.Shape, "PhysicsSprite"] = {}
+        # por pymunk.Body.id, el que dan los arbiters de pymunk.batch
+        self._bodies: Dict[int, "PhysicsSprite"] = {}
+        # entidades con body DYNAMIC (las únicas cuya pose hay que sincronizar)
+        self._dynamic: Dict["PhysicsSprite", None] = {}
+        # cambia con cada alta o baja (ver Simulation.step)
+        self.version = 0
+
+    def add(self, entity: "PhysicsSprite"):
+        self.version += 1
+        self._entities[entity.shape] = entity
+        self._bodies[entity.body.id] = entity
+        if entity.body.body_type == pymunk.Body.DYNAMIC:
+            self._dynamic[entity] = None
+
+    def discard(self, entity: "PhysicsSprite"):
+        self.version += 1
+        if self._entities.get(entity.shape) is entity:
+            del self._entities[entity.shape]
+        if self._bodies.get(entity.body.id) is entity:
+            del self._bodies[entity.body.id]
+        self._dynamic.pop(entity, None)
+
+    def dynamic_entities(self) -> Iterable["PhysicsSprite"]:
+        return self._dynamic.keys()
+
+    def get(self, shape: pymunk.Shape) -> Optional["PhysicsSprite"]:
+        return self._entities.get(shape)
+
+    def by_body(self, body_id: int) -> Optional["PhysicsSprite"]:
+        return self._bodies.get(body_id)
+
+    def __contains__(self, shape: pymunk.Shape) -> bool:
+        return shape in self._entities
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+
+def get_registry(space: pymunk.Space) -> ShapeRegistry:
+    """
+    Devuelve (creándolo si hace falta) el registro asociado a un space. Se
+    guarda en el propio space: las entidades registradas referencian al
+    space, así que un mapa global (aun con claves débiles) nunca lo liberaría.
+    """
+    registry = getattr(space, "_shape_registry", None)
+    if registry is None:
+        registry = ShapeRegistry()
+        space._shape_registry = registry
+    return registry
+
+
+def _gather_poses(entities: Sequence["PhysicsSprite"]) -> np.ndarray:
+    """Poses (x, y, ángulo) de los bodies en un array contiguo de (n, 3)."""
+    if not entities:
+        return np.empty((0, 3))
+    return np.array([(*e.body.position, e.body.angle) for e in entities], dtype=np.float64)
+
+
+class PoseBuffer:
+    """
+    Sincronización en bloque body -> sprite. Por tick junta en arrays las
+    poses de las entidades dinámicas despiertas (antes y después del paso);
+    por frame interpola ambos arrays de una vez y escribe los sprites.
+    Estáticos y dormidos no se tocan.
+    """
+    def __init__(self):
+        self.entities: List["PhysicsSprite"] = []
+        self.prev = np.empty((0, 3))
+        self.cur = np.empty((0, 3))
+        self._index: Dict["PhysicsSprite", int] = {}
+
+    def begin_tick(self, registry: ShapeRegistry):
+        awake = [e for e in registry.dynamic_entities() if not e.body.is_sleeping]
+        self._index = {e: i for i, e in enumerate(awake)}
+        self.prev = _gather_poses(awake)
+
+    def end_tick(self, registry: ShapeRegistry):
+        awake = [e for e in registry.dynamic_entities() if not e.body.is_sleeping]
+        cur = _gather_poses(awake)
+        prev = cur.copy()
+        before = self._index
+        for i, e in enumerate(awake):
+            row = before.pop(e, None)
+            if row is not None:
+                prev[i] = self.prev[row]
+            else:
+                # despertó (o nació) durante el tick: partir de lo que se ve
+                prev[i] = (e.center_x, e.center_y, e.radians)
+        # los que se durmieron en este tick quedan en su pose final
+        for e in before:
+            e.update(0)
+        self._index = {}
+        self.entities = awake
+        self.prev = prev
+        self.cur = cur
+
+    def reset(self):
+        """Olvida las poses guardadas (p. ej. tras restaurar un snapshot)."""
+        self.entities = []
+        self.prev = np.empty((0, 3))
+        self.cur = np.empty((0, 3))
+        self._index = {}
+
+    def apply(self, alpha: float = 1.0):
+        """Escribe a los sprites la pose interpolada (alpha=1: pose actual)."""
+        if not self.entities:
+            return
+        poses = self.prev + (self.cur - self.prev) * alpha
+        for e, (x, y, angle) in zip(self.entities, poses.tolist()):
+            e.position = (x, y)
+            e.radians = angle
+
+
+# -------------------------
+# Base classes
+# -------------------------
+_uids = itertools.count(1)
+
+
+def reseed_uids(start: int):
+    """
+    Los próximos uid empiezan en start. Un proceso hijo que restaura
+    snapshots del padre lo llama para no repetir uids que el padre crea
+    después del fork (restore identifica las entidades por uid).
+    """
+    global _uids
+    _uids = itertools.count(start)
+
+
+def reserve_uids(count: int) -> int:
+    """
+    Reserva count uids consecutivos para filas sin entidad (p. ej. las que
+    un nivel deja congeladas desde el arranque); devuelve el primero.
+    """
+    global _uids
+    first = next(_uids)
+    _uids = itertools.count(first + count)
+    return first
+
+
+class _Mirrored:
+    """
+    Atributo de instancia que se copia a una columna de ENTITIES al
+    escribirlo. Solo define __set__: sin __get__, Python resuelve la lectura
+    en el __dict__ de la instancia, así que leer e.launched cuesta lo mismo
+    que un atributo común.
+    """
+    def __init__(self, store: Callable[[int, Any], None]):
+        self.store = store
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __set__(self, entity: "PhysicsSprite", value):
+        entity.__dict__[self.name] = value
+        self.store(entity.slot, value)
+
+
+# escritura de cada atributo en su columna de ENTITIES
+def _store_kind(slot: int, kind: str):
+    ENTITIES.kind[slot] = KIND_CODES[kind]
+
+
+def _store_mass(slot: int, mass: float):
+    ENTITIES.mass[slot] = mass
+
+
+def _store_radius(slot: int, radius: float):
+    ENTITIES.radius[slot] = radius
+
+
+def _store_flag(slot: int, flag: int, value: bool):
+    if value:
+        ENTITIES.flags[slot] |= flag
+    else:
+        ENTITIES.flags[slot] &= ~flag & 0xFF
+
+
+def _store_launched(slot: int, value: bool):
+    _store_flag(slot, LAUNCHED, value)
+
+
+def _store_used_ability(slot: int, value: bool):
+    _store_flag(slot, USED_ABILITY, value)
+
+
+class PhysicsSprite(arcade.Sprite):
+    """
+    Sprite respaldado por un body/shape de pymunk. Agrega ambos al space y
+    registra la entidad en el ShapeRegistry del space.
+    Tipo, flags, masa y radio son atributos comunes que además se copian a
+    una fila de ENTITIES (ver entity_store.py) para los recorridos en bloque:
+    la copia cuesta memoria y hace más lenta cada escritura, a cambio de que
+    snapshot, restore y el daño no lean entidad por entidad. La vida vive
+    solo en la fila, porque apply_damage la escribe en bloque.
+    """
+    body: pymunk.Body
+    shape: pymunk.Shape
+    space: Optional[pymunk.Space] = None
+    # tipo con el que la entidad vuelve a un EntityPool (None = no se recicla)
+    pool_kind: Optional[str] = None
+    # identidad de la entidad en la escena; cambia con cada attach (un
+    # reciclado del pool es otra entidad) y la conservan los snapshots
+    uid: int = 0
+    # fila en ENTITIES (-1 hasta que el constructor la reserva)
+    slot: int = -1
+
+    kind = _Mirrored(_store_kind)
+    mass = _Mirrored(_store_mass)
+    radius = _Mirrored(_store_radius)
+    launched = _Mirrored(_store_launched)
+    used_ability = _Mirrored(_store_used_ability)
+
+    def __init__(self, texture: arcade.Texture, kind: str):
+        super().__init__(texture)
+        self.slot = ENTITIES.allocate(kind)
+        # la fila ya quedó inicializada: basta con los atributos
+        self.__dict__.update(kind=kind, mass=0.0, radius=0.0, launched=False, used_ability=False)
+
+    def __del__(self, _free=ENTITIES.free):
+        if self.slot >= 0:
+            _free(self.slot)
+
+    @property
+    def health(self) -> float:
+        return ENTITIES.health.item(self.slot)
+
+    @health.setter
+    def health(self, health: float):
+        ENTITIES.health[self.slot] = health
+
+    def attach(self, body: pymunk.Body, shape: pymunk.Shape, space: Optional[pymunk.Space]):
+        """
+        Asigna body y shape y los agrega a space. Con space=None la entidad
+        queda armada fuera de todo space (p. ej. en el worker de precarga)
+        hasta que alguien los agregue y llame a added_to.
+        """
+        self.body = body
+        self.shape = shape
+        if space is not None:
+            space.add(body, shape)
+            self.added_to(space)
+        self.update(0)
+
+    def added_to(self, space: pymunk.Space):
+        """Body y shape ya están en space: registra la entidad con un uid nuevo."""
+        self.space = space  # referencia al space para operaciones futuras
+        self.uid = next(_uids)
+        get_registry(space).add(self)
+
+    def reset_body(self, x: float, y: float):
+        """Deja el body (fuera del space) en reposo en (x, y)."""
+        body = self.body
+        body.position = (x, y)
+        body.angle = 0
+        body.velocity = (0, 0)
+        body.angular_velocity = 0
+        body.force = (0, 0)
+        body.torque = 0
+
+    def update(self, delta_time):
+        """
+        Sincroniza la posición y rotación del sprite con pymunk.
+        (La simulación usa PoseBuffer para hacerlo en bloque.)
+        """
+        self.position = self.body.position
+        self.radians = self.body.angle
+
+    def wake_neighbours(self):
+        """
+        Despierta los bodies que tocan a éste (p. ej. una torre dormida que se
+        apoya en un cerdo destruido) para que no queden flotando.
+        """
+        def activate(arbiter):
+            for shape in arbiter.shapes:
+                body = shape.body
+                if body is not self.body and body.body_type == pymunk.Body.DYNAMIC:
+                    body.activate()
+
+        self.body.each_arbiter(activate)
+
+    def remove_from_space_and_lists(self):
+        """
+        Quita body/shape del pymunk.Space, lo borra del registro y remueve el
+        sprite de cualquier SpriteList. Llamarlo dos veces no tiene efecto.
+        """
+        if self.space is not None:
+            get_registry(self.space).discard(self)
+            self.wake_neighbours()
+            self.space.remove(self.body, self.shape)
+            self.space = None
+        self.remove_from_sprite_lists()
+
+
+class Bird(PhysicsSprite):
     """
     Bird class. This represents an angry bird. All the physics is handled by Pymunk.
     El constructor aplica el impulso inicial (como ya tenías).
     """
+    KIND = "red"
+
     def __init__(
         self,
         image_path: str,
@@ -28,100 +348,85 @@ class Bird(arcade.Sprite):
         elasticity: float = 0.8,
         friction: float = 1,
         collision_layer: int = 0,
+        scale: float = 1.0,
     ):
-        super().__init__(image_path, 1)
+        # textura compartida y pre-escalada (no se decodifica la imagen por spawn)
+        super().__init__(ASSETS.texture(image_path, scale), self.KIND)
         # Guardar para reconstrucción/children
         self.image_path = image_path
 
         # body
         moment = pymunk.moment_for_circle(mass, 0, radius)
         body = pymunk.Body(mass, moment)
-        body.position = (x, y)
-
-        # Calculamos el impulso aplicado como en main.py: clamp(impulse) * power_multiplier
-        impulse_value = min(max_impulse, impulse_vector.impulse) * power_multiplier
-        impulse_pymunk = impulse_value * pymunk.Vec2d(1, 0)
-        body.apply_impulse_at_local_point(impulse_pymunk.rotated(impulse_vector.angle))
 
         # shape
         shape = pymunk.Circle(body, radius)
         shape.elasticity = elasticity
         shape.friction = friction
         shape.collision_type = collision_layer
-
-        space.add(body, shape)
-
         self.body = body
         self.shape = shape
-        self.space = space  # referencia al space para operaciones futuras
-
-        # estado de habilidad
-        self.launched = True
-        self.used_ability = False
 
         # parámetros para reconstrución
-        self._mass = mass
-        self._radius = radius
+        self.mass = mass
+        self.radius = radius
         self._max_impulse = max_impulse
         self._power_multiplier = power_multiplier
+        self._scale = scale
 
-    def update(self, delta_time):
-        """
-        Sincroniza la posición y rotación del sprite con pymunk.
-        """
-        self.center_x = self.shape.body.position.x
-        self.center_y = self.shape.body.position.y
-        self.radians = self.shape.body.angle
+        self.spawn(impulse_vector, x, y, space)
 
-    def remove_from_space_and_lists(self):
+    def spawn(self, impulse_vector: ImpulseVector, x: float, y: float, space: pymunk.Space):
         """
-        Quita body/shape del pymunk.Space y remueve el sprite de cualquier SpriteList.
+        (Re)lanza el pájaro desde (x, y): resetea el body, lo agrega al space y
+        aplica el impulso. Lo usa el constructor y el EntityPool al reciclarlo.
         """
-        try:
-            if self.space is not None:
-                self.space.remove(self.body, self.shape)
-        except Exception:
-            pass
-        try:
-            self.kill()
-        except Exception:
-            try:
-                self.remove_from_sprite_lists()
-            except Exception:
-                pass
-
-
-class Pig(arcade.Sprite):
+        self.reset_body(x, y)
+
+        # Calculamos el impulso aplicado como en main.py: clamp(impulse) * power_multiplier
+        impulse_value = min(self._max_impulse, impulse_vector.impulse) * self._power_multiplier
+        impulse_pymunk = impulse_value * pymunk.Vec2d(1, 0)
+        self.body.apply_impulse_at_local_point(impulse_pymunk.rotated(impulse_vector.angle))
+
+        self.attach(self.body, self.shape, space)
+
+        # estado de habilidad
+        self.launched = True
+        self.used_ability = False
+
+
+class Pig(PhysicsSprite):
     def __init__(
         self,
         x: float,
         y: float,
-        space: pymunk.Space,
+        space: Optional[pymunk.Space],
         mass: float = 2,
         elasticity: float = 0.8,
         friction: float = 0.4,
         collision_layer: int = 0,
     ):
-        super().__init__("assets/img/pig_failed.png", 0.1)
+        super().__init__(ASSETS.texture("assets/img/pig_failed.png", 0.1), "pig")
+        self.mass = mass
+        self.radius = self.width / 2 - 3
         moment = pymunk.moment_for_circle(mass, 0, self.width / 2 - 3)
         body = pymunk.Body(mass, moment)
-        body.position = (x, y)
         shape = pymunk.Circle(body, self.width / 2 - 3)
         shape.elasticity = elasticity
         shape.friction = friction
         shape.collision_type = collision_layer
-        space.add(body, shape)
         self.body = body
         self.shape = shape
-        self.space = space
+        self.spawn(x, y, space)
 
-    def update(self, delta_time):
-        self.center_x = self.shape.body.position.x
-        self.center_y = self.shape.body.position.y
-        self.radians = self.shape.body.angle
+    def spawn(self, x: float, y: float, space: Optional[pymunk.Space]):
+        """(Re)ubica el cerdo en reposo y con vida completa en (x, y) y lo agrega al space (si hay)."""
+        self.reset_body(x, y)
+        self.health = 1.0
+        self.attach(self.body, self.shape, space)
 
 
-class PassiveObject(arcade.Sprite):
+class PassiveObject(PhysicsSprite):
     """
     Passive object que puede colisionar y ser destruido.
     """
@@ -130,13 +435,15 @@ class PassiveObject(arcade.Sprite):
         image_path: str,
         x: float,
         y: float,
-        space: pymunk.Space,
+        space: Optional[pymunk.Space],
         mass: float = 2,
         elasticity: float = 0.8,
         friction: float = 1,
         collision_layer: int = 0,
     ):
-        super().__init__(image_path, 1)
+        super().__init__(ASSETS.texture(image_path), "passive")
+        self.image_path = image_path
+        self.mass = mass
 
         moment = pymunk.moment_for_box(mass, (self.width, self.height))
         body = pymunk.Body(mass, moment)
@@ -145,15 +452,7 @@ class PassiveObject(arcade.Sprite):
         shape.elasticity = elasticity
         shape.friction = friction
         shape.collision_type = collision_layer
-        space.add(body, shape)
-        self.body = body
-        self.shape = shape
-        self.space = space
-
-    def update(self, delta_time):
-        self.center_x = self.shape.body.position.x
-        self.center_y = self.shape.body.position.y
-        self.radians = self.shape.body.angle
+        self.attach(body, shape, space)
 
 
 class Column(PassiveObject):
@@ -161,7 +460,7 @@ class Column(PassiveObject):
         super().__init__("assets/img/column.png", x, y, space)
 
 
-class StaticObject(arcade.Sprite):
+class StaticObject(PhysicsSprite):
     """
     Objetos estáticos (no se mueven). Se usa pymunk.Body.STATIC.
     """
@@ -170,27 +469,20 @@ class StaticObject(arcade.Sprite):
             image_path: str,
             x: float,
             y: float,
-            space: pymunk.Space,
+            space: Optional[pymunk.Space],
             elasticity: float = 0.8,
             friction: float = 1,
             collision_layer: int = 0,
     ):
-        super().__init__(image_path, 1)
+        super().__init__(ASSETS.texture(image_path), "static")
+        self.image_path = image_path
         body = pymunk.Body(body_type=pymunk.Body.STATIC)
         body.position = (x, y)
         shape = pymunk.Poly.create_box(body, (self.width, self.height))
         shape.elasticity = elasticity
         shape.friction = friction
         shape.collision_type = collision_layer
-        space.add(body, shape)
-        self.body = body
-        self.shape = shape
-        self.space = space
-
-    def update(self, delta_time):
-        self.center_x = self.shape.body.position.x
-        self.center_y = self.shape.body.position.y
-        self.radians = self.shape.body.angle
+        self.attach(body, shape, space)
 
 
 # -------------------------
@@ -201,6 +493,8 @@ class YellowBird(Bird):
     Si el usuario hace clic izquierdo mientras está en vuelo, incrementa
     su velocidad multiplicando body.velocity por boost_multiplier.
     """
+    KIND = "yellow"
+
     def __init__(
         self,
         image_path: str,
@@ -212,14 +506,11 @@ class YellowBird(Bird):
         scale: float = 0.1,
         **kwargs
     ):
-        super().__init__(image_path, impulse_vector, x, y, space, **kwargs)
+        super().__init__(image_path, impulse_vector, x, y, space, scale=scale, **kwargs)
         self.boost_multiplier = boost_multiplier
-        self.scale = scale
 
     def on_click_ability(self) -> bool:
-        if not getattr(self, "launched", False):
-            return False
-        if getattr(self, "used_ability", False):
+        if not self.launched or self.used_ability:
             return False
 
         vx, vy = self.body.velocity.x, self.body.velocity.y
@@ -241,6 +532,8 @@ class BlueBird(Bird):
     Si el usuario hace clic mientras está en vuelo, se divide en 3 pájaros con
     separación angular (split_angle_deg). Conserva la magnitud de la velocidad.
     """
+    KIND = "blue"
+
     def __init__(
         self,
         image_path: str,
@@ -253,13 +546,14 @@ class BlueBird(Bird):
         scale: float = 0.3,
         **kwargs
     ):
-        super().__init__(image_path, impulse_vector, x, y, space, **kwargs)
+        super().__init__(image_path, impulse_vector, x, y, space, scale=scale, **kwargs)
         self.split_angle_deg = split_angle_deg
         self.child_class = child_class or Bird
-        self.scale = scale
+        # si se define (p. ej. un EntityPool), los hijos se piden acá en vez de construirse
+        self.child_factory: Optional[Callable[[], Bird]] = None
 
     def split(self, sprite_list: arcade.SpriteList) -> List[Bird]:
-        if not getattr(self, "launched", False) or getattr(self, "used_ability", False):
+        if not self.launched or self.used_ability:
             return []
 
         vx, vy = self.body.velocity.x, self.body.velocity.y
@@ -270,21 +564,28 @@ class BlueBird(Bird):
         base_angle_deg = math.degrees(math.atan2(vy, vx))
         angles = [base_angle_deg + self.split_angle_deg, base_angle_deg, base_angle_deg - self.split_angle_deg]
 
+        # los hijos nacen en la pose física, no en la del sprite (interpolada)
+        x, y = self.body.position
         children: List[Bird] = []
         for ang_deg in angles:
             ang_rad = math.radians(ang_deg)
             # crear impulsito nulo para no re-aplicar impulso
             zero_impulse = ImpulseVector(angle=0.0, impulse=0.0)
-            # crear instancia del child
-            child = self.child_class(
-                self.image_path,
-                zero_impulse,
-                self.center_x,
-                self.center_y,
-                self.space,
-                mass=getattr(self, "_mass", 5),
-                radius=getattr(self, "_radius", 12),
-            )
+            # crear (o reciclar) instancia del child
+            if self.child_factory is not None:
+                child = self.child_factory()
+                child.spawn(zero_impulse, x, y, self.space)
+            else:
+                child = self.child_class(
+                    self.image_path,
+                    zero_impulse,
+                    x,
+                    y,
+                    self.space,
+                    mass=self.mass,
+                    radius=self.radius,
+                    scale=self._scale,
+                )
             # setear velocidad manteniendo magnitud
             vx_child = math.cos(ang_rad) * speed
             vy_child = math.sin(ang_rad) * speed
@@ -296,10 +597,7 @@ class BlueBird(Bird):
 
         # remover el original del space y de listas
         self.used_ability = True
-        try:
-            self.remove_from_space_and_lists()
-        except Exception:
-            pass
+        self.remove_from_space_and_lists()
 
         return children
 
@@ -313,22 +611,36 @@ class BlueBird(Bird):
 class LevelManager:
     """
     Gestión simple de niveles basada en umbrales de puntaje.
+    Si un nivel tiene prepare_callback, apenas arranca el nivel anterior se
+    lo prepara en un hilo aparte (datos, texturas y entidades armadas fuera
+    del space); el setup lo recoge con prepared() y el cambio de nivel solo
+    hace el commit.
     """
     def __init__(self):
         self.levels: List[Tuple[int, Optional[Callable]]] = []
         self.current_level: int = -1
         self.score: int = 0
-
-    def add_level(self, threshold: int, setup_callback: Optional[Callable] = None):
+        self._preparers: Dict[int, Callable[[int], Any]] = {}
+        self._futures: Dict[int, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._waited = 0.0
+        # (nivel, segundos que bloqueó el cambio, segundos esperando la preparación)
+        self.transition_times: List[Tuple[int, float, float]] = []
+
+    def add_level(
+        self,
+        threshold: int,
+        setup_callback: Optional[Callable] = None,
+        prepare_callback: Optional[Callable[[int], Any]] = None,
+    ):
+        if prepare_callback is not None:
+            self._preparers[len(self.levels)] = prepare_callback
         self.levels.append((threshold, setup_callback))
 
     def start(self, game):
         if not self.levels:
             return
-        self.current_level = 0
-        thresh, setup = self.levels[0]
-        if setup:
-            setup(game, 0)
+        self._enter(game, 0)
 
     def update_score(self, new_score: int):
         self.score = new_score
@@ -339,15 +651,66 @@ class LevelManager:
         next_idx = self.current_level + 1
         thresh, setup = self.levels[next_idx]
         if self.score >= thresh:
-            self.current_level = next_idx
-            if setup:
-                setup(game, next_idx)
+            self._enter(game, next_idx)
             return True
         return False
 
     def is_last_level(self) -> bool:
         return self.current_level == len(self.levels) - 1
 
+    def prepared(self, level_idx: int) -> Any:
+        """
+        Resultado de la preparación del nivel. Si el worker no terminó se
+        espera; si nunca se pidió, se prepara ahora en este hilo.
+        """
+        future = self._futures.pop(level_idx, None)
+        start = time.perf_counter()
+        if future is not None:
+            result = future.result()
+        else:
+            result = self._preparers[level_idx](level_idx)
+        self._waited = time.perf_counter() - start
+        return result
+
+    def prefetch(self, level_idx: int):
+        """Empieza a preparar el nivel en el worker (si tiene preparación)."""
+        prepare = self._preparers.get(level_idx)
+        if prepare is None or level_idx in self._futures:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-preload")
+        self._futures[level_idx] = self._executor.submit(prepare, level_idx)
+
+    def close(self):
+        """Detiene el worker de precarga (lo pendiente se descarta)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._futures.clear()
+
+    def discard_workers(self):
+        """
+        Olvida el worker de precarga y lo que tenía pendiente (p. ej. en un
+        proceso hijo tras un fork, donde ese hilo no existe); lo que falte se
+        prepara de nuevo cuando haga falta.
+        """
+        self._executor = None
+        self._futures = {idx: f for idx, f in self._futures.items() if f.done()}
+
+    def _enter(self, game, level_idx: int):
+        thresh, setup = self.levels[level_idx]
+        self.current_level = level_idx
+        self._waited = 0.0
+        start = time.perf_counter()
+        if setup:
+            setup(game, level_idx)
+        blocked = time.perf_counter() - start
+        self.transition_times.append((level_idx, blocked, self._waited))
+        logger.debug(f"Level {level_idx} transition blocked {blocked * 1000:.2f} ms "
+                     f"({self._waited * 1000:.2f} ms waiting for preload)")
+        # preparar el siguiente mientras se juega éste
+        self.prefetch(level_idx + 1)
+
 
 # -------------------------
 # Helpers
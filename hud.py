@@ -0,0 +1,76 @@
+import arcade
+from arcade.shape_list import ShapeElementList, create_ellipse_filled, create_ellipse_outline
+from typing import Any, Callable, Sequence, Tuple, Union
+
+# segmentos por punto: alcanza para círculos de pocos píxeles
+POINT_SEGMENTS = 12
+
+_UNSET = object()
+
+
+class PointBatch:
+    """
+    Puntos de una trayectoria como un solo buffer de geometría
+    (ShapeElementList): se dibuja con una llamada y solo se rearma cuando
+    cambia la clave (p. ej. la tupla de puntos que devuelve predict_path,
+    que es la misma mientras el arrastre no cambie de celda).
+    """
+    def __init__(self, color: arcade.types.RGBA255, radius: Union[float, Callable[[int], float]] = 3.0,
+                 segments: int = POINT_SEGMENTS):
+        self.color = color
+        # radio fijo o función del índice del punto
+        self.radius = radius
+        self.segments = segments
+        self.shapes: ShapeElementList = ShapeElementList()
+        self.rebuilds = 0
+        self._key: Any = _UNSET
+
+    def update(self, key: Any, points: Sequence[Tuple[float, float]],
+               outlines: Sequence[Tuple[float, float, float, arcade.types.RGBA255, float]] = ()) -> bool:
+        """
+        Rearma el buffer si key cambió. outlines: círculos sin relleno
+        (x, y, radio, color, ancho). Devuelve si hubo que rearmar.
+        """
+        if key is self._key:
+            return False
+        self._key = key
+        shapes = ShapeElementList()
+        radius = self.radius
+        for i, (x, y) in enumerate(points):
+            r = radius(i) if callable(radius) else radius
+            shapes.append(create_ellipse_filled(x, y, r * 2, r * 2, self.color, num_segments=self.segments))
+        for x, y, r, color, width in outlines:
+            shapes.append(create_ellipse_outline(x, y, r * 2, r * 2, color, width, num_segments=self.segments * 2))
+        self.shapes = shapes
+        self.rebuilds += 1
+        return True
+
+    def clear(self):
+        self.update(None, ())
+
+    def draw(self):
+        if len(self.shapes):
+            self.shapes.draw()
+
+
+class Label:
+    """
+    Texto persistente del HUD: el arcade.Text se crea una vez y solo se
+    re-maqueta cuando cambia el valor que muestra (fmt.format(value)).
+    """
+    def __init__(self, fmt: str, x: float, y: float, color: arcade.types.RGBA255 = arcade.color.WHITE,
+                 font_size: float = 12, **kwargs):
+        self.fmt = fmt
+        self.text = arcade.Text("", x, y, color, font_size, **kwargs)
+        self.layouts = 0
+        self._value: Any = _UNSET
+
+    def set(self, value: Any):
+        if value == self._value:
+            return
+        self._value = value
+        self.text.text = self.fmt.format(value)
+        self.layouts += 1
+
+    def draw(self):
+        self.text.draw()
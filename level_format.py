@@ -0,0 +1,206 @@
+import glob
+import hashlib
+import json
+import logging
+import math
+import os
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from assets import ASSETS
+
+logger = logging.getLogger(__name__)
+
+LEVELS_DIR = "levels"
+# ancho por defecto de un nivel: una pantalla (simulation.WIDTH)
+SCREEN_WIDTH = 1800
+CACHE_DIR = os.path.join(".cache", "levels")
+# versión del formato compilado; cambiarla invalida la caché
+CACHE_VERSION = 3
+
+# tipos de entidad del formato (el índice es el código en el array compilado)
+ENTITY_TYPES: Tuple[str, ...] = ("pig", "column", "beam", "passive", "static")
+DEFAULT_IMAGES = {
+    "column": "assets/img/column.png",
+    "beam": "assets/img/beam.png",
+}
+# tipos (de ENTITY_KINDS) y campos que admite la sección "damage"
+DAMAGE_TYPES: Tuple[str, ...] = ("pig", "passive")
+DAMAGE_FIELDS: Tuple[str, ...] = ("armor", "health")
+PIG_IMAGE = "assets/img/pig_failed.png"
+PIG_SCALE = 0.1
+
+# una fila por entidad; NaN = usar el valor por defecto de la clase
+LEVEL_DTYPE = np.dtype([
+    ("type", "u1"),
+    ("image", "i2"),     # índice en CompiledLevel.images, -1 = imagen por defecto
+    ("x", "f8"),
+    ("y", "f8"),
+    ("mass", "f4"),
+    ("elasticity", "f4"),
+    ("friction", "f4"),
+])
+
+
+@dataclass
+class CompiledLevel:
+    """
+    Nivel listo para instanciar: metadatos + un array estructurado con una
+    fila por entidad (ver LEVEL_DTYPE). damage pisa, para este nivel, los
+    parámetros de daño por tipo de la simulación (ver DAMAGE_PARAMS); width
+    es el ancho del mundo en px (una pantalla si no se indica).
+    """
+    name: str
+    threshold: int
+    clear: bool
+    images: Tuple[str, ...]
+    entities: np.ndarray
+    damage: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    width: float = SCREEN_WIDTH
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+
+def compile_level(source: dict) -> CompiledLevel:
+    """
+    Convierte la fuente JSON de un nivel:
+    {"name", "threshold", "clear", "width"?, "entities": [{"type", "x", "y",
+    "mass"?, "elasticity"?, "friction"?, "image"?}, ...],
+    "damage"?: {"<tipo>": {"armor"?, "health"?}, ...}}
+    """
+    images: List[str] = []
+    rows = np.zeros(len(source.get("entities", [])), dtype=LEVEL_DTYPE)
+    for i, ent in enumerate(source.get("entities", [])):
+        kind = ent["type"]
+        if kind not in ENTITY_TYPES:
+            raise ValueError(f"Tipo de entidad desconocido: {kind!r}")
+        image = ent.get("image")
+        if image is None and kind in ("passive", "static"):
+            raise ValueError(f"La entidad {kind!r} necesita 'image'")
+        if image is not None and image not in images:
+            images.append(image)
+        rows[i] = (
+            ENTITY_TYPES.index(kind),
+            images.index(image) if image is not None else -1,
+            ent["x"],
+            ent["y"],
+            ent.get("mass", np.nan),
+            ent.get("elasticity", np.nan),
+            ent.get("friction", np.nan),
+        )
+    damage = source.get("damage", {})
+    for kind, params in damage.items():
+        if kind not in DAMAGE_TYPES:
+            raise ValueError(f"Tipo sin daño configurable: {kind!r}")
+        unknown = [k for k in params if k not in DAMAGE_FIELDS]
+        if unknown:
+            raise ValueError(f"Campos de daño desconocidos para {kind!r}: {unknown}")
+    return CompiledLevel(
+        name=source.get("name", ""),
+        threshold=int(source.get("threshold", 0)),
+        clear=bool(source.get("clear", True)),
+        images=tuple(images),
+        entities=rows,
+        damage={kind: {k: float(v) for k, v in params.items()} for kind, params in damage.items()},
+        width=float(source.get("width", SCREEN_WIDTH)),
+    )
+
+
+@dataclass
+class PreparedLevel:
+    """
+    Nivel resuelto fuera del hilo principal: datos decodificados, texturas ya
+    cargadas y un descriptor por entidad (tipo, imagen, x, y, kwargs).
+    """
+    level: CompiledLevel
+    specs: List[Tuple[str, Optional[str], float, float, Dict[str, float]]]
+
+
+def prepare_level(path: str, cache_dir: Optional[str] = CACHE_DIR) -> PreparedLevel:
+    """Carga el nivel, resuelve sus texturas y arma los descriptores."""
+    level = load_level_file(path, cache_dir)
+    specs = []
+    for code, image, x, y, mass, elasticity, friction in level.entities.tolist():
+        kind = ENTITY_TYPES[code]
+        # NaN = valor por defecto de la clase
+        kwargs = {k: v for k, v in (("mass", mass), ("elasticity", elasticity), ("friction", friction))
+                  if not math.isnan(v)}
+        if kind == "static":
+            kwargs.pop("mass", None)
+        image_path = level.images[image] if image >= 0 else DEFAULT_IMAGES.get(kind)
+        specs.append((kind, image_path, x, y, kwargs))
+    for image_path in {s[1] for s in specs if s[1] is not None}:
+        ASSETS.texture(image_path)
+    if any(s[0] == "pig" for s in specs):
+        ASSETS.texture(PIG_IMAGE, PIG_SCALE)
+    return PreparedLevel(level, specs)
+
+
+def _cache_path(path: str, cache_dir: str) -> str:
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}-{digest}-v{CACHE_VERSION}.npz")
+
+
+def save_compiled(level: CompiledLevel, path: str):
+    meta = {"name": level.name, "threshold": level.threshold, "clear": level.clear, "images": list(level.images),
+            "damage": level.damage, "width": level.width}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez(f, entities=level.entities, meta=np.array(json.dumps(meta)))
+
+
+def load_compiled(path: str) -> CompiledLevel:
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        entities = data["entities"]
+    return CompiledLevel(meta["name"], meta["threshold"], meta["clear"], tuple(meta["images"]), entities,
+                         meta["damage"], meta["width"])
+
+
+def load_level_file(path: str, cache_dir: Optional[str] = CACHE_DIR) -> CompiledLevel:
+    """
+    Carga un nivel desde su fuente JSON usando la versión compilada en caché
+    si está al día (la clave es el hash del archivo fuente).
+    """
+    if cache_dir is None:
+        with open(path) as f:
+            return compile_level(json.load(f))
+    cached = _cache_path(path, cache_dir)
+    if os.path.exists(cached):
+        return load_compiled(cached)
+    with open(path) as f:
+        level = compile_level(json.load(f))
+    try:
+        save_compiled(level, cached)
+    except OSError as e:
+        logger.warning(f"No se pudo escribir la caché de {path}: {e}")
+    return level
+
+
+def discover_levels(levels_dir: str = LEVELS_DIR) -> List[str]:
+    """Fuentes de niveles del directorio, en orden (level_0, level_1, ...)."""
+    def index(path):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        digits = "".join(c for c in stem if c.isdigit())
+        return (int(digits) if digits else 0, stem)
+
+    return sorted(glob.glob(os.path.join(levels_dir, "*.json")), key=index)
+
+
+# ------------------------
+# main: precompila todos los niveles
+# ------------------------
+def main():
+    for path in discover_levels():
+        with open(path) as f:
+            level = compile_level(json.load(f))
+        save_compiled(level, _cache_path(path, CACHE_DIR))
+        print(f"{path}: {len(level)} entidades")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from game_object import Bird
+
+logger = logging.getLogger(__name__)
+
+# segundos en reposo tras los cuales un pájaro se retira
+REST_SECONDS = 2.0
+# vida máxima de un pájaro en segundos, aunque siga moviéndose
+BIRD_TTL_SECONDS = 20.0
+# pájaros vivos a la vez; al pasarse se desalojan los más viejos
+MAX_LIVE_BIRDS = 8
+# velocidad (px/s) bajo la cual un pájaro se considera en reposo
+REST_SPEED = 20.0
+# cada cuántos ticks se revisan reposo y TTL
+CHECK_EVERY_TICKS = 15
+
+
+class BirdLifecycle:
+    """
+    Ciclo de vida acotado de los pájaros: retira los que llevan REST_SECONDS
+    quietos o superaron su TTL, limita cuántos hay vivos desalojando los más
+    viejos, y recuerda el único pájaro "activo" (el último lanzado, mientras
+    no haya usado su habilidad) para despachar la habilidad sin buscarlo.
+    La Simulation es la que remueve lo que este objeto le indica.
+    """
+    def __init__(
+        self,
+        time_step: float,
+        rest_seconds: float = REST_SECONDS,
+        ttl_seconds: float = BIRD_TTL_SECONDS,
+        max_live: int = MAX_LIVE_BIRDS,
+        rest_speed: float = REST_SPEED,
+        check_every: int = CHECK_EVERY_TICKS,
+    ):
+        self.rest_ticks = round(rest_seconds / time_step)
+        self.ttl_ticks = round(ttl_seconds / time_step)
+        self.max_live = max_live
+        self.rest_speed = rest_speed
+        self.check_every = max(1, check_every)
+        # pájaro -> tick de spawn, en orden de lanzamiento
+        self._spawned: Dict[Bird, int] = {}
+        # pájaro -> tick desde el que está en reposo
+        self._resting: Dict[Bird, int] = {}
+        self.active: Optional[Bird] = None
+
+    def __len__(self) -> int:
+        return len(self._spawned)
+
+    def track(self, bird: Bird, tick: int, active: bool = True) -> List[Bird]:
+        """
+        Empieza a seguir un pájaro. Devuelve los pájaros a desalojar para
+        respetar max_live (los más viejos primero, nunca el recién llegado).
+        """
+        self._spawned[bird] = tick
+        if active:
+            self.active = bird
+        overflow = len(self._spawned) - self.max_live
+        if overflow <= 0:
+            return []
+        evicted = [b for b in self._spawned if b is not bird][:overflow]
+        logger.debug(f"Evicting {len(evicted)} bird(s) over the cap of {self.max_live}")
+        return evicted
+
+    def forget(self, bird: Bird):
+        """El pájaro dejó la simulación (retirado, fuera de escena, split...)."""
+        self._spawned.pop(bird, None)
+        self._resting.pop(bird, None)
+        if self.active is bird:
+            self.active = None
+
+    def entries(self) -> List[Tuple[Bird, int, Optional[int]]]:
+        """(pájaro, tick de spawn, tick desde el que reposa o None), en orden."""
+        return [(bird, spawned, self._resting.get(bird)) for bird, spawned in self._spawned.items()]
+
+    def load(self, entries: Iterable[Tuple[Bird, int, Optional[int]]], active: Optional[Bird] = None):
+        """Reemplaza todo el estado (lo usa Simulation.restore)."""
+        entries = list(entries)
+        self._spawned = {bird: spawned for bird, spawned, _ in entries}
+        self._resting = {bird: since for bird, _, since in entries if since is not None}
+        self.active = active
+
+    def expired(self, tick: int) -> List[Bird]:
+        """Pájaros a retirar en este tick (solo revisa cada check_every ticks)."""
+        if tick % self.check_every:
+            return []
+        out = []
+        for bird, spawned in self._spawned.items():
+            if tick - spawned >= self.ttl_ticks:
+                out.append(bird)
+                continue
+            body = bird.body
+            if body.is_sleeping or body.velocity.length < self.rest_speed:
+                since = self._resting.setdefault(bird, tick)
+                if tick - since >= self.rest_ticks:
+                    out.append(bird)
+            else:
+                self._resting.pop(bird, None)
+        return out
@@ -1,11 +1,16 @@
-import math
 import logging
+import math
 import arcade
-import pymunk
-from typing import List
+from concurrent.futures import Future
+from typing import List, Optional, Sequence
 
-from game_object import Bird, Column, Pig, YellowBird, BlueBird, LevelManager
-from game_logic import get_impulse_vector, Point2D, get_distance, ImpulseVector
+from game_logic import get_impulse_vector, Point2D, get_distance
+from hud import Label, PointBatch
+from profiling import FrameProfiler
+from preview import predict_path, PreviewWorker, PREVIEW_STEPS, PREVIEW_DT
+from replay import default_replay_path, save_replay
+from solver import BIRDS, AimSolver, Solution
+from simulation import Simulation, WIDTH, HEIGHT, SLINGSHOT_X, SLINGSHOT_Y
 
 logging.basicConfig(level=logging.DEBUG)
 logging.getLogger("arcade").setLevel(logging.WARNING)
@@ -14,23 +19,13 @@ logging.getLogger("PIL").setLevel(logging.WARNING)
 
 logger = logging.getLogger("main")
 
-WIDTH = 1800
-HEIGHT = 800
 TITLE = "Angry birds"
-GRAVITY = -900  # coincide con space.gravity
-
-# -----------------------
-# Slingshot / parámetros
-# -----------------------
-SLINGSHOT_X = 180   # ajusta según tu escena
-SLINGSHOT_Y = 160
-
-# Parametros por tipo (puedes ajustarlos)
-DEFAULT_PARAMS = {
-    "red":   {"mass": 5, "radius": 12, "max_impulse": 200, "power_multiplier": 45},
-    "yellow":{"mass": 4, "radius": 12, "max_impulse": 240, "power_multiplier": 50, "boost_multiplier": 2.2},
-    "blue":  {"mass": 4, "radius": 10, "max_impulse": 180, "power_multiplier": 42, "split_angle_deg": 30.0},
-}
+# cámara: fracción del camino al objetivo que recorre por frame, y paso del
+# paneo con las flechas (niveles de más de una pantalla)
+CAMERA_LERP = 0.15
+PAN_STEP = WIDTH / 2
+# posición de la cámara con el slingshot en pantalla: desde ahí se apunta
+SLINGSHOT_VIEW = (WIDTH / 2, HEIGHT / 2)
 
 
 class App(arcade.View):
@@ -38,191 +33,147 @@ class App(arcade.View):
         super().__init__()
         self.background = arcade.load_texture("assets/img/background3.png")
 
-        # Pymunk space
-        self.space = pymunk.Space()
-        self.space.gravity = (0, GRAVITY)
-
-        # Piso
-        floor_body = pymunk.Body(body_type=pymunk.Body.STATIC)
-        floor_shape = pymunk.Segment(floor_body, [0, 15], [WIDTH, 15], 0.0)
-        floor_shape.friction = 10
-        self.space.add(floor_body, floor_shape)
-
-        # Sprite lists
-        self.sprites = arcade.SpriteList()   # todos
-        self.birds = arcade.SpriteList()     # solo birds
-        self.world = arcade.SpriteList()     # cerdos/columnas/objetos destructibles
+        # tiempos por fase de cada frame (P = overlay, O = exportar traza y CSV)
+        self.profiler = FrameProfiler()
 
-        # Crear mundo inicial
-        self.add_columns()
-        self.add_pigs()
+        # Simulación headless (space, entidades, score y niveles); se graba
+        # el input de la sesión para poder reproducirla (ver replay.py)
+        self.sim = Simulation(record=True, profiler=self.profiler)
 
         # Aiming
         self.start_point = Point2D()
         self.end_point = Point2D()
         self.draw_line = False
-        self.preview_points: List[tuple] = []
-
-        # Score & levels
-        self.score = 0
-        self.level_manager = LevelManager()
-        # add levels (threshold, setup_fn)
-        self.level_manager.add_level(0, self.setup_level_0)
-        self.level_manager.add_level(100, self.setup_level_1)
-        # puedes agregar más con level_manager.add_level(...)
-        self.level_manager.start(self)
-
-        # collision handler
-        self.handler = self.space.add_default_collision_handler()
-        self.handler.post_solve = self.collision_handler
+        self.preview_points: Sequence[tuple] = ()
+        # los eventos de drag solo marcan la preview; se recalcula una vez por frame
+        self.preview_dirty = False
+        # preview completa (F): simula el disparo sobre un snapshot en un worker
+        self.full_preview = False
+        self.preview_worker = PreviewWorker()
+
+        # pista de auto-aim (H): búsqueda en procesos aparte, ver solver.py
+        # (el pool se crea con el primer pedido y se reusa)
+        self.solver: Optional[AimSolver] = None
+        self.hint_future: Optional[Future] = None
+        self.hint: Optional[Solution] = None
+        self.hint_failed = False
+        self.hint_points: Sequence[tuple] = ()
 
         # selección manual de pájaro (None = automático por distancia)
         self.forced_bird_type = None  # "red","blue","yellow" o None
 
-    # ------------------------
-    # Level setup examples
-    # ------------------------
-    def setup_level_0(self, game, level_idx):
-        logger.debug(f"Setup level {level_idx}: nivel inicial (sin cambios).")
-        # ejemplo: limpiar y volver a añadir pigs/columns si lo deseas
-        # aquí no hacemos nada
-
-    def setup_level_1(self, game, level_idx):
-        logger.debug(f"Setup level {level_idx}: añadir 2 cerdos extra.")
-        # Añadir cerdos ejemplo
-        pig_a = Pig(WIDTH / 2 + 120, 100, self.space)
-        pig_b = Pig(WIDTH / 2 + 200, 100, self.space)
-        self.sprites.append(pig_a); self.sprites.append(pig_b)
-        self.world.append(pig_a); self.world.append(pig_b)
+        # capas de dibujo persistentes: la geometría de los puntos y el texto
+        # del HUD se rearman solo cuando cambia lo que muestran (ver hud.py)
+        self.preview_batch = PointBatch(arcade.color.ASH_GREY, radius=lambda i: max(2, 6 - (i // 10)))
+        self.full_preview_batch = PointBatch(arcade.color.ASH_GREY)
+        self.hint_batch = PointBatch(arcade.color.GREEN)
+        self.score_label = Label("Score: {}", 10, HEIGHT - 30, arcade.color.WHITE, 20)
+        self.level_label = Label("Level: {}", 10, HEIGHT - 60, arcade.color.WHITE, 16)
+        self.bird_label = Label("Bird select: {}", 10, HEIGHT - 90, arcade.color.WHITE, 14)
+        self.hint_label = Label("Hint: {}", 10, HEIGHT - 120, arcade.color.WHITE, 14)
+        # filas del overlay del profiler (se crean a medida que aparecen fases)
+        self.overlay_labels: List[Label] = []
+
+        # cámara del mundo: sigue al pájaro en vuelo o, si no hay, al centro
+        # paneado con las flechas; el HUD se dibuja con una cámara fija
+        self.camera = arcade.Camera2D(position=SLINGSHOT_VIEW)
+        self.hud_camera = arcade.Camera2D(position=(WIDTH / 2, HEIGHT / 2))
+        self.pan_x = WIDTH / 2
 
     # ------------------------
-    # Collision handling
+    # Update
     # ------------------------
-    def collision_handler(self, arbiter, space, data):
-        """
-        Post-solve: eliminar objetos si el impulso es suficiente.
-        Incrementa score si se destruye un Pig y pregunta al LevelManager si avanzar.
-        """
-        impulse_norm = arbiter.total_impulse.length
-        if impulse_norm < 100:
-            return True
-        logger.debug(f"Collision impulse: {impulse_norm}")
-        if impulse_norm > 1200:
-            removed_any = False
-            for obj in list(self.world):
-                try:
-                    if obj.shape in arbiter.shapes:
-                        if isinstance(obj, Pig):
-                            self.score += 100
-                            logger.debug(f"Pig destruido -> score = {self.score}")
-                            self.level_manager.update_score(self.score)
-                            self.level_manager.check_and_advance(self)
-
-                        try:
-                            obj.remove_from_sprite_lists()
-                        except Exception:
-                            pass
-                        try:
-                            self.space.remove(obj.shape, obj.body)
-                        except Exception:
-                            pass
-                        try:
-                            self.world.remove(obj)
-                        except Exception:
-                            pass
-                        removed_any = True
-                except Exception:
-                    pass
-            if removed_any:
-                logger.debug("Objetos removidos por colisión fuerte.")
-        return True
+    def on_update(self, delta_time: float):
+        alpha = self.sim.advance(delta_time)
+        self.sim.sync_sprites(alpha)
+        self.update_camera()
+        if self.hint_future is not None and self.hint_future.done():
+            future, self.hint_future = self.hint_future, None
+            try:
+                self.show_hint(future.result())
+            except Exception:
+                logger.exception("Hint search failed")
+                self.hint_failed = True
+                self.hint_label.set("no se pudo buscar el disparo")
 
     # ------------------------
-    # World construction
+    # Camera
     # ------------------------
-    def add_columns(self):
-        for x in range(WIDTH // 2, WIDTH, 400):
-            column = Column(x, 50, self.space)
-            self.sprites.append(column)
-            self.world.append(column)
+    def flying_bird(self):
+        """El último pájaro lanzado que sigue despierto (None si no hay)."""
+        return next((b for b in reversed(self.sim.birds) if not b.body.is_sleeping), None)
 
-    def add_pigs(self):
-        pig1 = Pig(WIDTH / 2, 100, self.space)
-        self.sprites.append(pig1)
-        self.world.append(pig1)
+    def update_camera(self):
+        """Acerca la cámara a su objetivo, sin salirse del mundo. Mientras se apunta no se mueve."""
+        if self.draw_line:
+            return
+        bird = self.flying_bird()
+        target = bird.center_x if bird is not None else self.pan_x
+        target = min(max(target, WIDTH / 2), max(WIDTH / 2, self.sim.world_width - WIDTH / 2))
+        x, y = self.camera.position
+        self.camera.position = (x + (target - x) * CAMERA_LERP, y)
+
+    def pan(self, x: float):
+        """Fija el centro paneado; la simulación mantiene vivos sus chunks (ver Simulation.look_at)."""
+        self.pan_x = min(max(x, WIDTH / 2), max(WIDTH / 2, self.sim.world_width - WIDTH / 2))
+        self.sim.look_at(self.pan_x)
 
     # ------------------------
-    # Update
+    # Auto-aim hint
     # ------------------------
-    def on_update(self, delta_time: float):
-        self.space.step(1 / 60.0)
-        self.update_collisions()
-        self.sprites.update(delta_time)
-        # sincronizar niveles
-        self.level_manager.update_score(self.score)
-        self.level_manager.check_and_advance(self)
-
-    def update_collisions(self):
-        """
-        Remover sprites que quedaron fuera de la escena y sus cuerpos del space.
-        """
-        offscreen = []
-        for spr in list(self.sprites):
-            if spr.center_y < -200 or spr.center_x < -500 or spr.center_x > WIDTH + 500:
-                offscreen.append(spr)
-
-        for spr in offscreen:
-            try:
-                if hasattr(spr, "shape") and hasattr(spr, "body"):
-                    try:
-                        self.space.remove(spr.shape, spr.body)
-                    except Exception:
-                        pass
-                spr.remove_from_sprite_lists()
-            except Exception:
-                pass
+    def request_hint(self):
+        """Busca (sin bloquear) el mejor disparo desde el estado actual; reemplaza la búsqueda anterior."""
+        birds = (self.forced_bird_type,) if self.forced_bird_type else BIRDS
+        self.clear_hint()
+        if self.solver is None:
+            self.solver = AimSolver(self.sim)
+        self.hint_future = self.solver.request(self.sim, birds)
+        self.hint_label.set("buscando...")
+        logger.debug(f"Hint requested for {birds}")
+
+    def show_hint(self, solution: Solution):
+        self.hint = solution
+        best = solution.best
+        if best is None or best.pigs == 0:
+            self.hint_points = ()
+            self.hint_label.set("ningún disparo destruye cerdos")
+            return
+        self.hint_label.set(f"{best.bird} {math.degrees(best.angle):.0f}° impulso {best.impulse:.0f}"
+                            + (f", habilidad a los {best.ability_tick} ticks" if best.ability_tick is not None else "")
+                            + f" ({best.pigs}/{solution.pigs_total} cerdos)")
+        start = Point2D(SLINGSHOT_X, SLINGSHOT_Y)
+        self.hint_points = self.compute_predicted_path(start, best.drag_end(), best.bird)
+
+    def clear_hint(self):
+        # lo que falta de una búsqueda en curso se descarta sin simular
+        if self.hint_future is not None:
+            self.solver.cancel()
+        self.hint_future = None
+        self.hint = None
+        self.hint_failed = False
+        self.hint_points = ()
 
     # ------------------------
     # Predict trajectory (preview)
     # ------------------------
-    def compute_predicted_path(self, start: Point2D, end: Point2D, bird_choice: str, steps: int = 80, dt: float = 0.04):
+    def compute_predicted_path(self, start: Point2D, end: Point2D, bird_choice: str,
+                               steps: int = PREVIEW_STEPS, dt: float = PREVIEW_DT):
         """
-        Calcula puntos previos usando la misma fórmula de impulso que crea el Bird:
-        applied_impulse = min(max_impulse, iv.impulse) * power_multiplier
-        v0 = applied_impulse / mass
-        y(t) = y0 + vy0 * t + 0.5 * gy * t^2
+        Puntos previstos de la trayectoria (ver preview.predict_path: vectorizado
+        con NumPy y cacheado por arrastre cuantizado y parámetros del pájaro).
         """
-        iv = get_impulse_vector(start, end)
-        # seleccionar parámetros
-        if bird_choice == "yellow":
-            p = DEFAULT_PARAMS["yellow"]
-        elif bird_choice == "blue":
-            p = DEFAULT_PARAMS["blue"]
-        else:
-            p = DEFAULT_PARAMS["red"]
-
-        applied_impulse = min(p["max_impulse"], iv.impulse) * p["power_multiplier"]
-        if p["mass"] == 0:
-            return []
-        v0 = applied_impulse / p["mass"]
-        angle = iv.angle
-        vx0 = math.cos(angle) * v0
-        vy0 = math.sin(angle) * v0
-
-        gx, gy = self.space.gravity
-
-        points = []
-        x0 = SLINGSHOT_X
-        y0 = SLINGSHOT_Y
-        t = 0.0
-        for i in range(steps):
-            x_t = x0 + vx0 * t
-            y_t = y0 + vy0 * t + 0.5 * gy * (t ** 2)
-            points.append((x_t, y_t))
-            if y_t < 20:
-                break
-            t += dt
-        return points
+        return predict_path(start, end, bird_choice, self.sim.space.gravity, steps, dt, self.sim.bird_params)
+
+    def refresh_preview(self):
+        """Recalcula la preview si hubo arrastre desde el último frame."""
+        if not self.preview_dirty:
+            return
+        self.preview_dirty = False
+        with self.profiler.section("preview"):
+            choice = self._choose_bird_by_distance()
+            self.preview_points = self.compute_predicted_path(self.start_point, self.end_point, choice)
+            if self.full_preview:
+                self.preview_worker.request(self.sim, self.start_point, self.end_point, choice)
 
     # ------------------------
     # Input: mouse (aim + abilities)
@@ -230,37 +181,31 @@ class App(arcade.View):
     def on_mouse_press(self, x, y, button, modifiers):
         # Si hay un pájaro en vuelo y NO estamos apuntando => activar habilidad
         if button == arcade.MOUSE_BUTTON_LEFT and not self.draw_line:
-            for b in self.birds:
-                if getattr(b, "launched", False) and not getattr(b, "used_ability", False):
-                    if isinstance(b, YellowBird):
-                        activated = b.on_click_ability()
-                        if activated:
-                            logger.debug("YellowBird ability activated.")
-                            return
-                    if isinstance(b, BlueBird):
-                        children = b.on_click_ability(self.sprites)
-                        if children:
-                            logger.debug(f"BlueBird split into {len(children)} birds.")
-                            for c in children:
-                                self.birds.append(c)
-                            return
+            if self.sim.activate_ability():
+                return
+
+        # se apunta desde la vista del slingshot: si la cámara está en otro
+        # lado (paneada, siguiendo un pájaro o volviendo) vuelve de golpe
+        if button == arcade.MOUSE_BUTTON_LEFT and tuple(self.camera.position) != SLINGSHOT_VIEW:
+            self.pan(WIDTH / 2)
+            self.camera.position = SLINGSHOT_VIEW
 
         # Inicio de apuntado: origen = slingshot fijo
         if button == arcade.MOUSE_BUTTON_LEFT:
+            x, y, _ = self.camera.unproject((x, y))
             self.start_point = Point2D(SLINGSHOT_X, SLINGSHOT_Y)
             self.end_point = Point2D(x, y)
             self.draw_line = True
-            # recalcular preview
-            choice = self._choose_bird_by_distance()
-            self.preview_points = self.compute_predicted_path(self.start_point, self.end_point, choice)
-            logger.debug(f"Aiming start at {self.start_point}, choice={choice}")
+            # recalcular preview en el próximo frame
+            self.preview_dirty = True
+            logger.debug(f"Aiming start at {self.start_point}, choice={self._choose_bird_by_distance()}")
 
     def on_mouse_drag(self, x: int, y: int, dx: int, dy: int, buttons: int, modifiers: int):
         if buttons == arcade.MOUSE_BUTTON_LEFT and self.draw_line:
+            x, y, _ = self.camera.unproject((x, y))
             self.end_point = Point2D(x, y)
-            # actualizar preview
-            choice = self._choose_bird_by_distance()
-            self.preview_points = self.compute_predicted_path(self.start_point, self.end_point, choice)
+            # actualizar preview (coalescido: a lo sumo una vez por frame)
+            self.preview_dirty = True
 
     def on_mouse_release(self, x: int, y: int, button: int, modifiers: int):
         if button == arcade.MOUSE_BUTTON_LEFT and self.draw_line:
@@ -274,35 +219,29 @@ class App(arcade.View):
             else:
                 choice = self._choose_bird_by_distance()
 
-            # crear según choice, siempre en SLINGSHOT coords
-            if choice == "yellow":
-                p = DEFAULT_PARAMS["yellow"]
-                bird = YellowBird("assets/img/yellow.png", impulse_vector,
-                                  SLINGSHOT_X, SLINGSHOT_Y, self.space,
-                                  mass=p["mass"], radius=p["radius"],
-                                  max_impulse=p["max_impulse"], power_multiplier=p["power_multiplier"])
-                bird.boost_multiplier = p.get("boost_multiplier", 2.0)
-                logger.debug("Created YellowBird")
-            elif choice == "blue":
-                p = DEFAULT_PARAMS["blue"]
-                bird = BlueBird("assets/img/blue.png", impulse_vector,
-                                SLINGSHOT_X, SLINGSHOT_Y, self.space,
-                                mass=p["mass"], radius=p["radius"],
-                                max_impulse=p["max_impulse"], power_multiplier=p["power_multiplier"],
-                                split_angle_deg=p.get("split_angle_deg", 30.0))
-                logger.debug("Created BlueBird")
-            else:
-                p = DEFAULT_PARAMS["red"]
-                bird = Bird("assets/img/red-bird3.png", impulse_vector,
-                            SLINGSHOT_X, SLINGSHOT_Y, self.space,
-                            mass=p["mass"], radius=p["radius"],
-                            max_impulse=p["max_impulse"], power_multiplier=p["power_multiplier"])
-                logger.debug("Created RedBird")
-
-            self.sprites.append(bird)
-            self.birds.append(bird)
+            self.sim.launch_bird(choice, impulse_vector)
             # limpiar preview cache
-            self.preview_points = []
+            self.preview_points = ()
+            self.preview_dirty = False
+            self.preview_worker.cancel()
+            self.clear_hint()
+
+    def save_replay(self):
+        """Guarda el input grabado de la sesión (si hubo alguno) en REPLAY_DIR."""
+        recorder = self.sim.recorder
+        if recorder is None or not len(recorder):
+            return None
+        path = default_replay_path()
+        save_replay(recorder.to_replay(self.sim), path)
+        logger.info(f"Replay guardado en {path}")
+        return path
+
+    def close(self):
+        """Libera los workers: preview, pool del auto-aim y precarga de niveles."""
+        self.preview_worker.shutdown()
+        if self.solver is not None:
+            self.solver.close()
+        self.sim.close()
 
     def _choose_bird_by_distance(self):
         """Elige bird por distancia (cuando forced_bird_type es None)."""
@@ -341,64 +280,116 @@ class App(arcade.View):
         elif symbol == arcade.key.KEY_3:
             self.forced_bird_type = "yellow"
             logger.debug("Forced bird type -> yellow (3)")
+        elif symbol == arcade.key.F:
+            self.full_preview = not self.full_preview
+            self.preview_worker.cancel()
+            self.preview_dirty = self.draw_line
+            logger.debug(f"Full preview -> {self.full_preview}")
+        # P = overlay de tiempos por fase, O = exportarlos (traza + CSV)
+        elif symbol == arcade.key.P:
+            self.profiler.set_enabled(not self.profiler.enabled)
+            logger.debug(f"Profiler -> {self.profiler.enabled}")
+        elif symbol == arcade.key.O:
+            if self.profiler.frames:
+                trace, table = self.profiler.export()
+                logger.info(f"Perfil exportado: {trace}, {table}")
+        # H = pedir / ocultar la pista de auto-aim
+        elif symbol == arcade.key.H:
+            if self.hint_future is not None or self.hint is not None or self.hint_failed:
+                self.clear_hint()
+            else:
+                self.request_hint()
+        # flechas = panear el nivel, HOME = volver al slingshot
+        elif symbol == arcade.key.LEFT:
+            self.pan(self.pan_x - PAN_STEP)
+        elif symbol == arcade.key.RIGHT:
+            self.pan(self.pan_x + PAN_STEP)
+        elif symbol == arcade.key.HOME:
+            self.pan(WIDTH / 2)
+        # Z = deshacer el último disparo, BACKSPACE = reintentar el nivel
+        elif symbol == arcade.key.Z:
+            if self.sim.undo_shot():
+                self.preview_worker.cancel()
+                self.clear_hint()
+                logger.debug("Undo last shot")
+        elif symbol == arcade.key.BACKSPACE:
+            if self.sim.retry_level():
+                self.preview_worker.cancel()
+                self.clear_hint()
+                logger.debug(f"Retry level {self.sim.level_manager.current_level}")
 
     # ------------------------
     # Draw
     # ------------------------
     def on_draw(self):
+        profiler = self.profiler
         self.clear()
-        # textura de fondo
-        try:
-            arcade.draw_texture_rect(self.background, arcade.LRBT(0, WIDTH, 0, HEIGHT))
-        except Exception:
-            # fallback si la función de textura no está disponible en la versión
-            arcade.draw_lrwh_rectangle_textured(0, 0, WIDTH, HEIGHT, self.background)
+        self.camera.use()
+        with profiler.section("draw.background"):
+            # textura de fondo, una copia por pantalla visible
+            left = self.camera.position[0] - WIDTH / 2
+            for i in range(int(left // WIDTH), int((left + WIDTH) // WIDTH) + 1):
+                try:
+                    arcade.draw_texture_rect(self.background, arcade.LRBT(i * WIDTH, (i + 1) * WIDTH, 0, HEIGHT))
+                except Exception:
+                    # fallback si la función de textura no está disponible en la versión
+                    arcade.draw_lrwh_rectangle_textured(i * WIDTH, 0, WIDTH, HEIGHT, self.background)
 
-        self.sprites.draw()
+        with profiler.section("draw.sprites"):
+            self.sim.sprites.draw()
 
         # dibujar línea de apuntado + preview (puntos)
         if self.draw_line:
-            arcade.draw_line(self.start_point.x, self.start_point.y, self.end_point.x, self.end_point.y,
-                             arcade.color.BLACK, 3)
-            # si no hay preview calculada, calcularla ahora
-            if not self.preview_points:
-                choice = self._choose_bird_by_distance()
-                self.preview_points = self.compute_predicted_path(self.start_point, self.end_point, choice)
-            for i, (px, py) in enumerate(self.preview_points):
-                radius = max(2, 6 - (i // 10))
-                arcade.draw_circle_filled(px, py, radius, arcade.color.ASH_GREY)
+            with profiler.section("draw.preview"):
+                arcade.draw_line(self.start_point.x, self.start_point.y, self.end_point.x, self.end_point.y,
+                                 arcade.color.BLACK, 3)
+                self.refresh_preview()
+                full = self.preview_worker.latest() if self.full_preview else None
+                if full is not None:
+                    # un resultado del worker no cambia: se rearma al llegar otro
+                    contact = () if full.contact is None else ((*full.contact, 8, arcade.color.RED, 2),)
+                    self.full_preview_batch.update(full, [p for path in full.paths for p in path], contact)
+                    self.full_preview_batch.draw()
+                else:
+                    self.preview_batch.update(self.preview_points, self.preview_points)
+                    self.preview_batch.draw()
+
+        # pista de auto-aim
+        with profiler.section("draw.hint"):
+            self.hint_batch.update(self.hint_points, self.hint_points)
+            self.hint_batch.draw()
+            self.hud_camera.use()
+            if self.hint_future is not None or self.hint is not None or self.hint_failed:
+                self.hint_label.draw()
 
         # HUD
-        arcade.draw_text(f"Score: {self.score}", 10, HEIGHT - 30, arcade.color.WHITE, 20)
-        cur_level = self.level_manager.current_level
-        arcade.draw_text(f"Level: {cur_level}", 10, HEIGHT - 60, arcade.color.WHITE, 16)
-        forced = self.forced_bird_type or "auto"
-        arcade.draw_text(f"Bird select: {forced}", 10, HEIGHT - 90, arcade.color.WHITE, 14)
-
-    # ------------------------
-    # Level loading helper
-    # ------------------------
-    def load_level(self, level_idx):
-        """Limpiar el mundo actual y ejecutar setup del nivel indicado."""
-        # remover world (shapes/bodies y sprites)
-        for obj in list(self.world):
-            try:
-                if hasattr(obj, "shape") and hasattr(obj, "body"):
-                    try:
-                        self.space.remove(obj.shape, obj.body)
-                    except Exception:
-                        pass
-                obj.remove_from_sprite_lists()
-            except Exception:
-                pass
-        self.world = arcade.SpriteList()
+        with profiler.section("draw.hud"):
+            self.score_label.set(self.sim.score)
+            self.level_label.set(self.sim.level_manager.current_level)
+            self.bird_label.set(self.forced_bird_type or "auto")
+            self.score_label.draw()
+            self.level_label.draw()
+            self.bird_label.draw()
+
+        if profiler.enabled:
+            with profiler.section("draw.overlay"):
+                self.draw_profiler_overlay()
+        profiler.end_frame()
+
+    def draw_profiler_overlay(self):
+        """Percentiles por fase de los últimos frames (P para mostrar/ocultar)."""
+        rows = self.profiler.summary()
+        x, y = WIDTH - 420, HEIGHT - 30
+        while len(self.overlay_labels) <= len(rows):
+            y_row = y - 18 * len(self.overlay_labels)
+            self.overlay_labels.append(Label("{}", x, y_row, arcade.color.YELLOW, 12,
+                                             font_name=("Courier New", "monospace")))
+        self.overlay_labels[0].set("fase               p50     p95     p99 ms   llamadas")
+        for label, (name, (p50, p95, p99), calls) in zip(self.overlay_labels[1:], rows):
+            label.set(f"{name:<16}{p50:7.2f} {p95:7.2f} {p99:7.2f} {calls:9.1f}")
+        for label in self.overlay_labels[:len(rows) + 1]:
+            label.draw()
 
-        # ejecutar setup
-        if 0 <= level_idx < len(self.level_manager.levels):
-            _, setup = self.level_manager.levels[level_idx]
-            if setup:
-                setup(self, level_idx)
-            self.level_manager.current_level = level_idx
 
 # ------------------------
 # main
@@ -408,6 +399,8 @@ def main():
     game = App()
     window.show_view(game)
     arcade.run()
+    game.save_replay()
+    game.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,372 @@
+import functools
+import math
+import threading
+import time
+import numpy as np
+import pymunk
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from game_logic import Point2D, get_impulse_vector
+from game_object import get_registry
+from simulation import DEFAULT_PARAMS, SLINGSHOT_X, SLINGSHOT_Y
+
+PREVIEW_STEPS = 80
+PREVIEW_DT = 0.04
+GROUND_Y = 20
+# resolución (px) con la que se cuantiza el arrastre para la caché
+DRAG_QUANTUM = 2.0
+CACHE_SIZE = 512
+
+Path = Tuple[Tuple[float, float], ...]
+# parámetros por tipo de pájaro (como Simulation.bird_params)
+BirdParams = Dict[str, Dict[str, float]]
+
+
+def bird_params_for(bird_choice: str, params: Optional[BirdParams] = None) -> Dict[str, float]:
+    """Parámetros de bird_choice en params (DEFAULT_PARAMS si no se pasa; rojo si no está)."""
+    params = DEFAULT_PARAMS if params is None else params
+    return params.get(bird_choice, params["red"])
+
+
+def predict_path(
+    start: Point2D,
+    end: Point2D,
+    bird_choice: str,
+    gravity: Tuple[float, float],
+    steps: int = PREVIEW_STEPS,
+    dt: float = PREVIEW_DT,
+    params: Optional[BirdParams] = None,
+) -> Path:
+    """
+    Trayectoria prevista para un arrastre start -> end. El vector de arrastre
+    se cuantiza a DRAG_QUANTUM px y el resultado se guarda en una caché LRU,
+    de modo que mover el mouse dentro de la misma celda no recalcula nada.
+    params: parámetros por tipo de pájaro de la simulación (sim.bird_params);
+    los que usa la fórmula son parte de la clave de la caché.
+    """
+    p = bird_params_for(bird_choice, params)
+    qx = round((start.x - end.x) / DRAG_QUANTUM)
+    qy = round((start.y - end.y) / DRAG_QUANTUM)
+    return _cached_path(qx, qy, float(p["mass"]), float(p["max_impulse"]), float(p["power_multiplier"]),
+                        float(gravity[0]), float(gravity[1]), steps, dt)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _cached_path(qx: int, qy: int, mass: float, max_impulse: float, power_multiplier: float,
+                 gx: float, gy: float, steps: int, dt: float) -> Path:
+    """
+    Evalúa todos los tiempos de muestreo a la vez usando la misma fórmula de
+    impulso que crea el Bird:
+    applied_impulse = min(max_impulse, iv.impulse) * power_multiplier
+    v0 = applied_impulse / mass
+    y(t) = y0 + vy0 * t + 0.5 * gy * t^2
+    La trayectoria se corta en el primer punto bajo GROUND_Y (incluido).
+    """
+    if mass == 0:
+        return ()
+    dx = qx * DRAG_QUANTUM
+    dy = qy * DRAG_QUANTUM
+    applied_impulse = min(max_impulse, math.hypot(dx, dy)) * power_multiplier
+    v0 = applied_impulse / mass
+    angle = math.atan2(dy, dx)
+    vx0 = math.cos(angle) * v0
+    vy0 = math.sin(angle) * v0
+
+    t = np.arange(steps, dtype=np.float64) * dt
+    xs = SLINGSHOT_X + vx0 * t + 0.5 * gx * t * t
+    ys = SLINGSHOT_Y + vy0 * t + 0.5 * gy * t * t
+
+    below = np.flatnonzero(ys < GROUND_Y)
+    if below.size:
+        n = below[0] + 1
+        xs, ys = xs[:n], ys[:n]
+    return tuple(zip(xs.tolist(), ys.tolist()))
+
+
+# -------------------------
+# Preview completa (con colisiones) en un worker
+# -------------------------
+FULL_PREVIEW_TICKS = 240
+# presupuesto de tiempo (s) por preview; al agotarse se devuelve lo simulado
+FULL_PREVIEW_BUDGET = 0.012
+PREVIEW_BIRD_TYPE = 0xB1D
+SAMPLE_EVERY = 3
+# velocidad (px/s) bajo la cual un pájaro que ya chocó se considera detenido
+REST_SPEED = 15.0
+# mientras el mundo se mueve, el snapshot se vuelve a tomar a lo sumo cada
+# SNAPSHOT_REFRESH s (más espaciado si tomarlo cuesta más que el presupuesto)
+SNAPSHOT_REFRESH = 0.25
+
+
+@dataclass
+class PreviewResult:
+    generation: int
+    paths: List[Path]
+    contact: Optional[Tuple[float, float]]
+    truncated: bool = False
+
+
+def snapshot_space(space: pymunk.Space) -> pymunk.Space:
+    """
+    Copia liviana del space: solo bodies y geometría, sin handlers ni
+    referencias a sprites, para simularla fuera del hilo principal. Los
+    bodies dormidos quedan dormidos (una torre asentada no se re-simula).
+    Los sensores (bordes del mundo) no se copian: no empujan nada y el
+    handler de la preview los contaría como primer contacto.
+    """
+    snap = pymunk.Space()
+    snap.gravity = space.gravity
+    snap.iterations = space.iterations
+    snap.sleep_time_threshold = space.sleep_time_threshold
+    snap.idle_speed_threshold = space.idle_speed_threshold
+    bodies = {}
+    sleeping = []
+    for shape in space.shapes:
+        if shape.sensor:
+            continue
+        src = shape.body
+        body = bodies.get(src)
+        if body is None:
+            if src.body_type == pymunk.Body.DYNAMIC:
+                body = pymunk.Body(src.mass, src.moment)
+                if src.is_sleeping:
+                    sleeping.append(body)
+            else:
+                body = pymunk.Body(body_type=src.body_type)
+            body.position = src.position
+            body.angle = src.angle
+            body.velocity = src.velocity
+            body.angular_velocity = src.angular_velocity
+            bodies[src] = body
+            snap.add(body)
+        if isinstance(shape, pymunk.Circle):
+            copy = pymunk.Circle(body, shape.radius, shape.offset)
+        elif isinstance(shape, pymunk.Segment):
+            copy = pymunk.Segment(body, shape.a, shape.b, shape.radius)
+        else:
+            copy = pymunk.Poly(body, shape.get_vertices(), radius=shape.radius)
+        copy.elasticity = shape.elasticity
+        copy.friction = shape.friction
+        snap.add(copy)
+    for body in sleeping:
+        body.sleep()
+    return snap
+
+
+class PreviewScene:
+    """
+    Snapshot del space que se reusa entre previews (de un mismo gesto de
+    apuntado, mientras el mundo no cambie). Guarda el estado inicial de los
+    bodies dinámicos; reset() vuelve a él los que se movieron en la última
+    simulación, así que el snapshot se toma una vez y no en cada arrastre.
+    Solo el hilo del worker lo toca después de construirlo.
+    """
+    def __init__(self, space: pymunk.Space, key: tuple):
+        start = time.perf_counter()
+        self.space = snapshot_space(space)
+        self.bodies = [b for b in self.space.bodies if b.body_type == pymunk.Body.DYNAMIC]
+        self.states = [(b.position, b.angle, b.velocity, b.angular_velocity, b.is_sleeping) for b in self.bodies]
+        # se simuló sobre el snapshot desde el último reset
+        self.used = False
+        # clave del mundo de origen (ver PreviewWorker.request) y cuándo se tomó
+        self.key = key
+        self.taken = time.perf_counter()
+        # tiempo (s) que costó tomarlo, en el hilo principal
+        self.cost = self.taken - start
+
+    def reset(self):
+        """
+        Vuelve al estado del snapshot los bodies que se movieron: salen y
+        vuelven a entrar al space (como en Simulation.restore), lo que
+        descarta los contactos cacheados de la simulación anterior.
+        """
+        if not self.used:
+            return
+        self.used = False
+        space = self.space
+        # uno dormido pudo despertarse, moverse y volver a dormirse
+        moved = [(body, state) for body, state in zip(self.bodies, self.states)
+                 if not (state[4] and body.is_sleeping and body.position == state[0] and body.angle == state[1])]
+        if not moved:
+            return
+        items = [item for body, _ in moved for item in (body, *body.shapes)]
+        space.remove(*items)
+        for body, (position, angle, velocity, angular_velocity, _) in moved:
+            body.position = position
+            body.angle = angle
+            body.velocity = velocity
+            body.angular_velocity = angular_velocity
+            body.force = (0, 0)
+            body.torque = 0
+        space.add(*items)
+        for body, state in moved:
+            if state[4]:
+                body.sleep()
+
+
+def simulate_shot(
+    space: pymunk.Space,
+    start: Point2D,
+    end: Point2D,
+    bird_choice: str,
+    time_step: float,
+    substeps: int,
+    is_current: Callable[[], bool],
+    ticks: int = FULL_PREVIEW_TICKS,
+    budget: float = FULL_PREVIEW_BUDGET,
+    params: Optional[BirdParams] = None,
+) -> Optional[Tuple[List[Path], Optional[Tuple[float, float]], bool]]:
+    """
+    Simula el disparo sobre un snapshot del space (incluye rebotes, columnas,
+    cerdos y el split del BlueBird en el ápice) con los parámetros de params
+    (sim.bird_params). Devuelve None si la petición quedó obsoleta
+    (is_current() == False) antes de terminar. Los pájaros de la preview se
+    sacan del space al salir; lo que movieron queda movido (ver
+    PreviewScene.reset).
+    """
+    p = bird_params_for(bird_choice, params)
+    iv = get_impulse_vector(start, end)
+    speed = min(p["max_impulse"], iv.impulse) * p["power_multiplier"] / p["mass"]
+
+    contact: List[Tuple[float, float]] = []
+
+    def on_begin(arbiter, space, data):
+        # los hijos del split se tocan entre sí al nacer: no cuenta como contacto
+        if all(s.collision_type == PREVIEW_BIRD_TYPE for s in arbiter.shapes):
+            return True
+        if not contact and arbiter.contact_point_set.points:
+            point = arbiter.contact_point_set.points[0].point_a
+            contact.append((point.x, point.y))
+        return True
+
+    handler = space.add_wildcard_collision_handler(PREVIEW_BIRD_TYPE)
+    handler.begin = on_begin
+
+    def add_bird(x, y, vx, vy):
+        body = pymunk.Body(p["mass"], pymunk.moment_for_circle(p["mass"], 0, p["radius"]))
+        body.position = (x, y)
+        body.velocity = (vx, vy)
+        shape = pymunk.Circle(body, p["radius"])
+        shape.elasticity = 0.8
+        shape.friction = 1
+        shape.collision_type = PREVIEW_BIRD_TYPE
+        space.add(body, shape)
+        return body
+
+    birds = [add_bird(SLINGSHOT_X, SLINGSHOT_Y, math.cos(iv.angle) * speed, math.sin(iv.angle) * speed)]
+    paths: List[List[Tuple[float, float]]] = [[(SLINGSHOT_X, SLINGSHOT_Y)]]
+    split_pending = bird_choice == "blue"
+    deadline = time.perf_counter() + budget
+    sub_dt = time_step / substeps
+
+    try:
+        for tick in range(ticks):
+            if not is_current():
+                return None
+            if time.perf_counter() > deadline:
+                return [tuple(path) for path in paths], (contact[0] if contact else None), True
+            for _ in range(substeps):
+                space.step(sub_dt)
+            if split_pending and birds[0].velocity.y <= 0:
+                # split en el ápice: mismas reglas que BlueBird.split
+                split_pending = False
+                body = birds[0]
+                base = math.atan2(body.velocity.y, body.velocity.x)
+                v = body.velocity.length
+                delta = math.radians(p.get("split_angle_deg", 30.0))
+                x, y = body.position
+                for ang in (base + delta, base - delta):
+                    birds.append(add_bird(x, y, math.cos(ang) * v, math.sin(ang) * v))
+                    paths.append([(x, y)])
+            if tick % SAMPLE_EVERY == 0:
+                for body, path in zip(birds, paths):
+                    path.append((body.position.x, body.position.y))
+            if contact and all(body.velocity.length < REST_SPEED for body in birds):
+                break
+        return [tuple(path) for path in paths], (contact[0] if contact else None), False
+    finally:
+        # el snapshot se reusa (ver PreviewScene): los pájaros no quedan en él
+        space.remove(*birds, *(shape for bird in birds for shape in bird.shapes))
+
+
+class PreviewWorker:
+    """
+    Calcula previews completas en un hilo aparte. Cada request invalida las
+    anteriores (las pendientes se cancelan y la que corre se aborta en el
+    próximo tick), y App consulta el último resultado sin bloquear.
+    """
+    def __init__(self, budget: float = FULL_PREVIEW_BUDGET):
+        self.budget = budget
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pending: Optional[Future] = None
+        self._result: Optional[PreviewResult] = None
+        # snapshot del gesto en curso y cuántos se tomaron
+        self._scene: Optional[PreviewScene] = None
+        self.snapshots = 0
+
+    def request(self, sim, start: Point2D, end: Point2D, bird_choice: str) -> int:
+        """
+        Encola una preview para el estado actual de sim. El snapshot (en este
+        hilo) se toma al empezar el gesto y se reusa mientras no se agreguen
+        ni saquen entidades; si hay bodies despiertos se renueva a lo sumo
+        cada SNAPSHOT_REFRESH s. Lo que cuesta tomarlo se descuenta del
+        presupuesto de esa preview.
+        """
+        scene = self._scene
+        key = (id(sim.space), len(get_registry(sim.space)), sim.level_manager.current_level)
+        spent = 0.0
+        if (scene is None or scene.key != key
+                or (sim.world_moving() and time.perf_counter() - scene.taken
+                    >= SNAPSHOT_REFRESH * max(1.0, scene.cost / self.budget))):
+            scene = self._scene = PreviewScene(sim.space, key)
+            spent = scene.cost
+            self.snapshots += 1
+        with self._lock:
+            self._generation += 1
+            gen = self._generation
+            if self._pending is not None:
+                self._pending.cancel()
+            self._pending = self._executor.submit(
+                self._run, gen, scene, spent, Point2D(start.x, start.y), Point2D(end.x, end.y),
+                bird_choice, sim.time_step, sim.substeps, sim.bird_params,
+            )
+        return gen
+
+    def cancel(self):
+        """Invalida la preview en curso y suelta el snapshot (fin del gesto)."""
+        with self._lock:
+            self._generation += 1
+            if self._pending is not None:
+                self._pending.cancel()
+                self._pending = None
+            self._result = None
+        self._scene = None
+
+    def latest(self) -> Optional[PreviewResult]:
+        """Último resultado vigente, o None si todavía no hay uno."""
+        with self._lock:
+            return self._result
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, gen, scene, spent, start, end, bird_choice, time_step, substeps, params):
+        if self._generation != gen:
+            return
+        started = time.perf_counter()
+        scene.reset()
+        scene.used = True
+        budget = self.budget - spent - (time.perf_counter() - started)
+        out = simulate_shot(scene.space, start, end, bird_choice, time_step, substeps,
+                            is_current=lambda: self._generation == gen, budget=budget, params=params)
+        if out is None:
+            return
+        paths, contact, truncated = out
+        with self._lock:
+            if self._generation == gen:
+                self._result = PreviewResult(gen, paths, contact, truncated)
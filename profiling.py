@@ -0,0 +1,157 @@
+import csv
+import json
+import os
+import time
+import numpy as np
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+PROFILE_DIR = "profiles"
+# frames que se guardan para percentiles y CSV (10 s a 60 fps)
+FRAME_HISTORY = 600
+# tope de eventos de la traza (los más viejos se descartan)
+TRACE_EVENTS = 200_000
+PERCENTILES = (50, 95, 99)
+
+perf_counter_ns = time.perf_counter_ns
+
+
+class _Section:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "FrameProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, perf_counter_ns() - self.start, self.start)
+        return False
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class FrameProfiler:
+    """
+    Contadores por fase y por frame. Cada fase acumula nanosegundos y
+    llamadas dentro del frame; end_frame() los guarda en una historia corta
+    (para percentiles y CSV). Las secciones con `with profiler.section(name)`
+    además quedan como eventos de una traza para chrome://tracing / Perfetto;
+    las de alta frecuencia (callbacks de colisión) solo se suman con add().
+    Las fases se anidan: "callbacks" y "destroy" ocurren dentro de "physics"
+    (y "destroy" también dentro de "damage").
+    Deshabilitado, section() devuelve un no-op compartido.
+    """
+    def __init__(self, enabled: bool = False, history: int = FRAME_HISTORY, trace_events: int = TRACE_EVENTS):
+        self.enabled = enabled
+        # fases en orden de aparición ("frame" = tiempo entre end_frame)
+        self.phases: List[str] = ["frame"]
+        self.frames: Deque[Dict[str, Tuple[float, int]]] = deque(maxlen=history)
+        self.trace: Deque[Tuple[str, int, int]] = deque(maxlen=trace_events)
+        self.frame_index = 0
+        self._current: Dict[str, List[int]] = {}
+        self._frame_start = perf_counter_ns()
+        self._epoch = self._frame_start
+
+    def set_enabled(self, enabled: bool):
+        self.enabled = enabled
+        self._current = {}
+        self._frame_start = perf_counter_ns()
+
+    def section(self, name: str):
+        if not self.enabled:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def add(self, name: str, ns: int, start: Optional[int] = None):
+        """Suma ns a la fase en el frame actual (y a la traza si viene start)."""
+        acc = self._current.get(name)
+        if acc is None:
+            acc = self._current[name] = [0, 0]
+            if name not in self.phases:
+                self.phases.append(name)
+        acc[0] += ns
+        acc[1] += 1
+        if start is not None:
+            self.trace.append((name, start, ns))
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        self.add("frame", now - self._frame_start, self._frame_start)
+        self.frames.append({name: (ns / 1e6, calls) for name, (ns, calls) in self._current.items()})
+        self._current = {}
+        self._frame_start = now
+        self.frame_index += 1
+
+    # ------------------------
+    # Lectura
+    # ------------------------
+    def series(self, name: str) -> np.ndarray:
+        """ms por frame de la fase (0 en los frames donde no corrió)."""
+        return np.array([frame.get(name, (0.0, 0))[0] for frame in self.frames])
+
+    def summary(self, percentiles=PERCENTILES) -> List[Tuple[str, List[float], float]]:
+        """(fase, percentiles en ms, llamadas medias por frame) de la historia."""
+        if not self.frames:
+            return []
+        out = []
+        for name in self.phases:
+            ms = self.series(name)
+            calls = np.mean([frame.get(name, (0.0, 0))[1] for frame in self.frames])
+            out.append((name, np.percentile(ms, percentiles).tolist(), float(calls)))
+        return out
+
+    # ------------------------
+    # Exportación
+    # ------------------------
+    def export_chrome_trace(self, path: str):
+        """Traza en formato Trace Event (chrome://tracing, ui.perfetto.dev)."""
+        events = [
+            {"name": name, "ph": "X", "ts": (start - self._epoch) / 1000, "dur": ns / 1000, "pid": 1, "tid": 1}
+            for name, start, ns in self.trace
+        ]
+        _makedirs_for(path)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export_csv(self, path: str):
+        """Una fila por frame de la historia: ms y llamadas de cada fase."""
+        _makedirs_for(path)
+        first = self.frame_index - len(self.frames)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{name}_{col}" for name in self.phases for col in ("ms", "calls")])
+            for i, frame in enumerate(self.frames):
+                row = [first + i]
+                for name in self.phases:
+                    ms, calls = frame.get(name, (0.0, 0))
+                    row += [f"{ms:.4f}", calls]
+                writer.writerow(row)
+
+    def export(self, directory: str = PROFILE_DIR) -> Tuple[str, str]:
+        """Escribe traza y CSV con un nombre por fecha. Devuelve ambos paths."""
+        base = os.path.join(directory, time.strftime("frames-%Y%m%d-%H%M%S"))
+        self.export_chrome_trace(base + ".json")
+        self.export_csv(base + ".csv")
+        return base + ".json", base + ".csv"
+
+
+def _makedirs_for(path: str):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+import os
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from game_logic import ImpulseVector
+
+logger = logging.getLogger(__name__)
+
+REPLAY_DIR = "replays"
+# versión del formato; load_replay rechaza las que no coinciden
+REPLAY_VERSION = 2
+
+# tipos de evento (el índice es el código en el array)
+EVENT_KINDS: Tuple[str, ...] = ("shot", "ability", "undo", "retry", "view")
+BIRD_KINDS: Tuple[str, ...] = ("red", "yellow", "blue")
+
+# un evento por fila, en el orden en que ocurrieron; tick = sim.ticks al
+# momento del evento (entre dos pasos). angle/impulse solo valen para "shot";
+# en "view", angle es la x de la vista (ver Simulation.look_at).
+EVENT_DTYPE = np.dtype([
+    ("tick", "i8"),
+    ("kind", "u1"),
+    ("bird", "u1"),
+    ("angle", "f8"),
+    ("impulse", "f8"),
+])
+
+
+@dataclass
+class Replay:
+    """
+    Sesión grabada: los eventos de input, la configuración de la simulación
+    con la que se grabaron (paso fijo, gravedad y parámetros de pájaros y de
+    daño), el tick final y el resultado (ver outcome) para comparar al
+    reproducirla.
+    """
+    events: np.ndarray
+    time_step: float
+    substeps: int
+    gravity: float
+    end_tick: int
+    outcome: Dict
+    bird_params: Dict[str, Dict[str, float]]
+    damage_params: Dict[str, Dict[str, float]]
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+
+class ReplayRecorder:
+    """Junta los eventos de input de una Simulation (ver Simulation(record=True))."""
+    def __init__(self):
+        self._events: List[Tuple[int, int, int, float, float]] = []
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def record(self, tick: int, kind: str, bird: str = "red", angle: float = 0.0, impulse: float = 0.0):
+        self._events.append((tick, EVENT_KINDS.index(kind), BIRD_KINDS.index(bird), angle, impulse))
+
+    def to_replay(self, sim) -> Replay:
+        return Replay(
+            events=np.array(self._events, dtype=EVENT_DTYPE),
+            time_step=sim.time_step,
+            substeps=sim.substeps,
+            gravity=sim.space.gravity[1],
+            end_tick=sim.ticks,
+            outcome=outcome(sim),
+            bird_params=sim.bird_params,
+            damage_params=sim.damage_params,
+        )
+
+
+def state_hash(sim) -> str:
+    """Hash del tipo y la pose de todas las entidades (no depende de los uid)."""
+    entities = sim.snapshot().entities
+    digest = hashlib.sha1(entities["kind"].tobytes())
+    digest.update(np.stack([entities["x"], entities["y"], entities["angle"]]).tobytes())
+    return digest.hexdigest()
+
+
+def outcome(sim) -> Dict:
+    return {
+        "ticks": sim.ticks,
+        "score": sim.score,
+        "level": sim.level_manager.current_level,
+        "entities": len(sim.sprites),
+        "state_hash": state_hash(sim),
+    }
+
+
+def save_replay(replay: Replay, path: str):
+    meta = {
+        "version": REPLAY_VERSION,
+        "time_step": replay.time_step,
+        "substeps": replay.substeps,
+        "gravity": replay.gravity,
+        "end_tick": replay.end_tick,
+        "outcome": replay.outcome,
+        "bird_params": replay.bird_params,
+        "damage_params": replay.damage_params,
+    }
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez_compressed(f, events=replay.events, meta=np.array(json.dumps(meta)))
+
+
+def load_replay(path: str) -> Replay:
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        events = data["events"]
+    if meta["version"] != REPLAY_VERSION:
+        raise ValueError(f"{path}: versión de replay {meta['version']}, se esperaba {REPLAY_VERSION}")
+    return Replay(events, meta["time_step"], meta["substeps"], meta["gravity"], meta["end_tick"], meta["outcome"],
+                  meta["bird_params"], meta["damage_params"])
+
+
+def default_replay_path() -> str:
+    return os.path.join(REPLAY_DIR, time.strftime("session-%Y%m%d-%H%M%S.npz"))
+
+
+# ------------------------
+# Reproducción
+# ------------------------
+def play(replay: Replay, sim) -> Dict:
+    """
+    Reproduce los eventos sobre sim (recién creada con la configuración del
+    replay, ver simulation_for) tan rápido como se pueda: avanza con step()
+    hasta el tick de cada evento y lo aplica. Devuelve el outcome final.
+    """
+    if (sim.time_step, sim.substeps) != (replay.time_step, replay.substeps):
+        raise ValueError(
+            f"El replay se grabó con time_step={replay.time_step}, substeps={replay.substeps}; "
+            f"la simulación usa time_step={sim.time_step}, substeps={sim.substeps}"
+        )
+    if sim.space.gravity[1] != replay.gravity:
+        raise ValueError(f"El replay se grabó con gravedad {replay.gravity}; la simulación usa {sim.space.gravity[1]}")
+    for name in ("bird_params", "damage_params"):
+        if getattr(sim, name) != getattr(replay, name):
+            raise ValueError(f"El replay se grabó con otros {name}: {getattr(replay, name)}")
+
+    for tick, kind, bird, angle, impulse in replay.events.tolist():
+        _run_until(sim, tick)
+        kind = EVENT_KINDS[kind]
+        if kind == "shot":
+            sim.launch_bird(BIRD_KINDS[bird], ImpulseVector(angle, impulse))
+        elif kind == "ability":
+            sim.activate_ability()
+        elif kind == "undo":
+            sim.undo_shot()
+        elif kind == "retry":
+            sim.retry_level()
+        elif kind == "view":
+            sim.look_at(angle)
+    _run_until(sim, replay.end_tick)
+    return outcome(sim)
+
+
+def _run_until(sim, tick: int):
+    if sim.ticks > tick:
+        raise ValueError(f"Replay desincronizado: la simulación va en el tick {sim.ticks}, el evento es del {tick}")
+    while sim.ticks < tick:
+        sim.step()
+
+
+def compare(expected: Dict, actual: Dict) -> List[str]:
+    """Diferencias entre dos outcomes, una línea por campo."""
+    return [f"{key}: grabado {expected.get(key)!r}, reproducido {actual.get(key)!r}"
+            for key in sorted(set(expected) | set(actual)) if expected.get(key) != actual.get(key)]
+
+
+def simulation_for(replay: Replay, **kwargs):
+    """Simulation con la configuración con la que se grabó replay (kwargs: el resto de las opciones)."""
+    from simulation import Simulation
+
+    return Simulation(time_step=replay.time_step, substeps=replay.substeps, gravity=replay.gravity,
+                      bird_params=replay.bird_params, damage_params=replay.damage_params, **kwargs)
+
+
+# ------------------------
+# main: reproducción headless
+# ------------------------
+def main(argv: Optional[list] = None) -> int:
+    import argparse
+    import cProfile
+    import pstats
+
+    parser = argparse.ArgumentParser(description="Reproduce un replay sin ventana, a máxima velocidad.")
+    parser.add_argument("path")
+    parser.add_argument("--check", action="store_true",
+                        help="compara con el resultado grabado (código de salida 1 si difiere)")
+    parser.add_argument("--profile", action="store_true", help="perfila la reproducción con cProfile")
+    args = parser.parse_args(argv)
+
+    replay = load_replay(args.path)
+    sim = simulation_for(replay, track_poses=False)
+    profiler = cProfile.Profile() if args.profile else None
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    result = play(replay, sim)
+    if profiler is not None:
+        profiler.disable()
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(replay)} eventos, {result['ticks']} ticks en {elapsed:.3f}s "
+          f"({result['ticks'] / max(elapsed, 1e-9):.0f} ticks/s), score={result['score']}, nivel={result['level']}")
+    if profiler is not None:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+    if args.check:
+        diffs = compare(replay.outcome, result)
+        for line in diffs:
+            print(line)
+        if diffs:
+            return 1
+        print("OK: el resultado coincide con el grabado")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
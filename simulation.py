@@ -0,0 +1,1243 @@
+import functools
+import logging
+import time
+import arcade
+import numpy as np
+import pymunk
+import pymunk.batch
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from assets import ASSETS
+from chunks import CHUNK_WIDTH, ChunkMap, merge_rows, structure_labels
+from game_object import (
+    Bird, Column, Pig, PassiveObject, StaticObject, YellowBird, BlueBird, LevelManager, PhysicsSprite, PoseBuffer, get_registry,
+    COLLISION_KILL, reserve_uids,
+)
+from game_logic import ImpulseVector
+from level_format import DEFAULT_IMAGES, LEVELS_DIR, PreparedLevel, discover_levels, load_level_file, prepare_level
+from entity_store import ENTITIES, ENTITY_FLAGS, ENTITY_KINDS, KIND_CODES, LAUNCHED, USED_ABILITY, slots_of
+from lifecycle import BirdLifecycle, MAX_LIVE_BIRDS
+from pool import EntityPool
+from profiling import FrameProfiler
+from replay import ReplayRecorder
+from snapshot import BIRD_DTYPE, ENTITY_DTYPE, FROZEN, IN_BIRDS, IN_WORLD, POOLED, SLEEPING, WorldSnapshot
+
+logger = logging.getLogger(__name__)
+
+WIDTH = 1800
+HEIGHT = 800
+GRAVITY = -900  # coincide con space.gravity
+TIME_STEP = 1 / 60.0
+# substeps de física por tick: evita que pájaros rápidos atraviesen columnas
+SUBSTEPS = 3
+# máximo de ticks que se recuperan por frame (evita la espiral de la muerte)
+MAX_CATCH_UP_TICKS = 5
+# sleeping: segundos en reposo antes de dormir un body, y velocidad (px/s)
+# bajo la cual se lo considera en reposo (None = la que calcula pymunk)
+SLEEP_TIME_THRESHOLD = 0.5
+IDLE_SPEED_THRESHOLD: Optional[float] = None
+
+# -----------------------
+# Slingshot / parámetros
+# -----------------------
+SLINGSHOT_X = 180   # ajusta según tu escena
+SLINGSHOT_Y = 160
+
+# Parametros por tipo (puedes ajustarlos)
+DEFAULT_PARAMS = {
+    "red":   {"mass": 5, "radius": 12, "max_impulse": 200, "power_multiplier": 45},
+    "yellow":{"mass": 4, "radius": 12, "max_impulse": 240, "power_multiplier": 50, "boost_multiplier": 2.2},
+    "blue":  {"mass": 4, "radius": 10, "max_impulse": 180, "power_multiplier": 42, "split_angle_deg": 30.0},
+}
+
+# impulsos de colisión: bajo IMPACT_THRESHOLD no dañan; DESTROY_THRESHOLD
+# es el impulso acumulado que destruye un objeto del mundo
+IMPACT_THRESHOLD = 100
+DESTROY_THRESHOLD = 1200
+
+# Daño por tipo destructible (tipos de ENTITY_KINDS): cada impacto (primer
+# contacto de un par) con impulso >= armor resta impulso / health a la vida
+# de la entidad (1.0 = intacta) y al llegar a 0 se destruye. Un golpe sobre
+# health destruye de una vez; los menores se acumulan. Los contactos
+# sostenidos (una columna apoyada en otra) solo cuentan si superan health,
+# así una pila alta no se aplasta sola. Un nivel puede pisarlos ("damage").
+DAMAGE_PARAMS = {
+    "pig":     {"armor": IMPACT_THRESHOLD, "health": DESTROY_THRESHOLD},
+    "passive": {"armor": IMPACT_THRESHOLD, "health": DESTROY_THRESHOLD},
+}
+
+# límites de la escena: lo que los cruza se remueve (ver set_world_width)
+KILL_BOTTOM = -200
+KILL_MARGIN_X = 500
+KILL_ZONE_THICKNESS = 2000
+
+# lo que se lee de cada arbiter tras un substep (ver Simulation.collect_contacts);
+# en el buffer de enteros quedan (body a, body b, primer contacto) por arbiter
+CONTACT_FIELDS = (pymunk.batch.ArbiterFields.BODY_A_ID | pymunk.batch.ArbiterFields.BODY_B_ID
+                  | pymunk.batch.ArbiterFields.TOTAL_IMPULSE | pymunk.batch.ArbiterFields.IS_FIRST_CONTACT)
+
+# streaming por chunks (ver chunks.py): se descongela cuando cambia el chunk
+# de algún foco, y cada STREAM_INTERVAL ticks se congela lo que se alejó
+STREAM_INTERVAL = 30
+# dos entidades cuyas cajas quedan a menos de esto (px) son la misma
+# estructura y se congelan juntas (ver Simulation._structures)
+STRUCTURE_MARGIN = 2.0
+# entidades que stream_chunks descongela o congela como mucho por tick (al
+# menos una estructura entera): un pájaro rápido no paga un chunk de golpe
+STREAM_BUDGET = 8
+# entidades (por tipo, imagen y parámetros) que _freeze guarda para reusar
+# en vez de reconstruirlas al descongelar
+SPARE_ENTITIES = 16
+
+# entidades que el pool crea por adelantado, por tipo
+POOL_WARMUP = {"red": 4, "yellow": 4, "blue": 4, "blue_child": 12, "pig": 8}
+
+# snapshots previos a cada disparo que se guardan para deshacer
+UNDO_DEPTH = 8
+
+BIRD_IMAGES = {
+    "red": "assets/img/red-bird3.png",
+    "yellow": "assets/img/yellow.png",
+    "blue": "assets/img/blue.png",
+}
+
+
+@dataclass
+class BuiltLevel:
+    """
+    Nivel armado por el worker de precarga (ver Simulation.prepare_level):
+    las entidades que arrancan en el space, con body, shape y sprite ya
+    construidos pero fuera de todo space, y sus filas de snapshot en el
+    estado inicial (uid en 0 hasta el commit). Con streaming, las
+    estructuras lejanas no se construyen: frozen trae sus filas, con
+    "group" numerado desde 0 (groups estructuras). build_level solo las
+    agrega. rows y frozen comparten la tabla images.
+    """
+    prepared: PreparedLevel
+    entities: List[PhysicsSprite]
+    rows: np.ndarray
+    frozen: np.ndarray
+    groups: int
+    images: Tuple[str, ...]
+
+
+class Simulation:
+    """
+    Núcleo headless del juego: space de pymunk, entidades, puntaje y niveles.
+    No abre ventana ni usa la GPU; App solo lo dibuja y le pasa el input.
+    """
+    def __init__(
+        self,
+        gravity: float = GRAVITY,
+        time_step: float = TIME_STEP,
+        substeps: int = SUBSTEPS,
+        max_catch_up: int = MAX_CATCH_UP_TICKS,
+        track_poses: bool = True,
+        pool_warmup: Optional[Dict[str, int]] = None,
+        pooling: bool = True,
+        max_live_birds: int = MAX_LIVE_BIRDS,
+        levels_dir: str = LEVELS_DIR,
+        sleep_time_threshold: float = SLEEP_TIME_THRESHOLD,
+        idle_speed_threshold: Optional[float] = IDLE_SPEED_THRESHOLD,
+        record: bool = False,
+        bird_params: Optional[Dict[str, Dict[str, float]]] = None,
+        damage_params: Optional[Dict[str, Dict[str, float]]] = None,
+        profiler: Optional[FrameProfiler] = None,
+        streaming: bool = True,
+        chunk_width: float = CHUNK_WIDTH,
+    ):
+        # Scheduler de paso fijo
+        self.time_step = time_step
+        self.substeps = max(1, substeps)
+        self.max_catch_up = max_catch_up
+        self.accumulator = 0.0
+        self.ticks = 0
+        # poses de bodies dinámicos para sincronizar sprites en bloque
+        # (una corrida sin ventana puede desactivarlo)
+        self.poses: Optional[PoseBuffer] = PoseBuffer() if track_poses else None
+
+        # parámetros por tipo de pájaro y de daño (los DEFAULT_PARAMS / DAMAGE_PARAMS con lo que se pise)
+        self.bird_params = {kind: {**p, **(bird_params or {}).get(kind, {})} for kind, p in DEFAULT_PARAMS.items()}
+        self.damage_params = {kind: {**p, **(damage_params or {}).get(kind, {})} for kind, p in DAMAGE_PARAMS.items()}
+        # tablas por código de tipo (las arma set_damage_params) y contactos
+        # del paso en curso, un array por substep: ids de los dos bodies, el
+        # impulso y si es primer contacto
+        self._armor = np.full(len(ENTITY_KINDS), np.inf)
+        self._toughness = np.full(len(ENTITY_KINDS), np.inf)
+        self._min_armor = np.inf
+        self._contacts = pymunk.batch.Buffer()
+        self._hit_bodies: List[np.ndarray] = []
+        self._hit_impulses: List[np.ndarray] = []
+        self._hit_first: List[np.ndarray] = []
+        # daño por nivel, desde el campo "damage" de cada archivo
+        self.level_damage: List[Dict[str, Dict[str, float]]] = []
+        # arbiters leídos por collect_contacts, y callbacks de
+        # colisión que llegan a Python (solo los sensores de borde)
+        self.contact_events = 0
+        self.callback_events = 0
+        # versión del registro del space con la que quedó todo dormido: sin
+        # altas ni bajas desde entonces no hay arbiters activos que leer
+        self._quiet: Optional[int] = None
+
+        # tiempos por fase (deshabilitado salvo que se pase uno habilitado)
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+
+        # texturas y hit boxes se resuelven una vez, antes de crear entidades
+        ASSETS.preload()
+
+        # Pymunk space
+        self.space = pymunk.Space()
+        self.space.gravity = (0, gravity)
+        # estructuras asentadas se duermen: ni el solver ni los callbacks las tocan
+        self.space.sleep_time_threshold = sleep_time_threshold
+        if idle_speed_threshold is not None:
+            self.space.idle_speed_threshold = idle_speed_threshold
+
+        # niveles: uno por archivo de levels_dir (ver level_format.py); el
+        # mundo de cada uno es tan ancho como él (al menos una pantalla), o
+        # como el anterior si no lo limpia y sus entidades siguen ahí
+        levels = [(path, load_level_file(path)) for path in discover_levels(levels_dir)]
+        self.level_widths: List[float] = []
+        for _, level in levels:
+            width = max(WIDTH, level.width)
+            if not level.clear and self.level_widths:
+                width = max(width, self.level_widths[-1])
+            self.level_widths.append(width)
+
+        # streaming: solo los chunks cerca de los focos (slingshot, vista y
+        # pájaros en juego) están en el space; el resto queda congelado
+        self.streaming = streaming
+        self.chunks = ChunkMap(chunk_width)
+        self.view_x = float(SLINGSHOT_X)
+        self._stream_key: Optional[frozenset] = None
+        # quedó trabajo de streaming por el tope de STREAM_BUDGET
+        self._thaw_pending = False
+        self._freeze_pending = False
+        # entidades congeladas que se reusan al descongelar otras iguales,
+        # por (tipo, imagen, masa, elasticidad, fricción); ver _freeze
+        self._spares: Dict[tuple, List[PhysicsSprite]] = {}
+        # space auxiliar donde se construyen los pájaros que se restauran sin pool
+        self._scratch = pymunk.Space()
+
+        # piso y sensores de borde, a la medida del nivel en curso (una
+        # pantalla hasta que setup_level arme el primero)
+        self._floor_body = pymunk.Body(body_type=pymunk.Body.STATIC)
+        self.space.add(self._floor_body)
+        self._bounds: List[pymunk.Shape] = []
+        self.world_width = 0.0
+        self.set_world_width(WIDTH)
+
+        # cola de destrucción: entidad -> suma puntaje al destruirse
+        self._doomed: Dict[PhysicsSprite, bool] = {}
+
+        # retiro de pájaros quietos/viejos, tope de vivos y pájaro activo
+        self.lifecycle = BirdLifecycle(time_step, max_live=max_live_birds)
+
+        # pool de pájaros (y sus hijos) y cerdos reciclables
+        self.pool = EntityPool(
+            {kind: functools.partial(self.make_bird, kind) for kind in ("red", "yellow", "blue", "blue_child")}
+            | {"pig": lambda space: Pig(0, 0, space)},
+            POOL_WARMUP if pool_warmup is None else pool_warmup,
+            enabled=pooling,
+        )
+
+        # Sprite lists
+        self.sprites = arcade.SpriteList()   # todos
+        self.birds = arcade.SpriteList()     # solo birds
+        self.world = arcade.SpriteList()     # cerdos/columnas/objetos destructibles
+
+        # input grabado para reproducir la sesión (ver replay.py)
+        self.recorder: Optional[ReplayRecorder] = ReplayRecorder() if record else None
+
+        # checkpoints: inicio de cada nivel (reintentar) y antes de cada disparo (deshacer)
+        self.level_starts: Dict[int, WorldSnapshot] = {}
+        self.shot_history: Deque[WorldSnapshot] = deque(maxlen=UNDO_DEPTH)
+
+        # Score & levels: el nivel 0 construye el mundo inicial
+        self.score = 0
+        self.level_manager = LevelManager()
+        for path, level in levels:
+            self.level_damage.append(level.damage)
+            self.level_manager.add_level(level.threshold, self.setup_level,
+                                         functools.partial(self.prepare_level, path))
+        # puedes agregar más con level_manager.add_level(...)
+        self.level_manager.start(self)
+
+        # handler de los sensores de borde (el daño no usa handlers)
+        self.install_collision_handlers()
+
+    # ------------------------
+    # Levels
+    # ------------------------
+    def prepare_level(self, path: str, level_idx: int) -> BuiltLevel:
+        """
+        Preparación del LevelManager (corre en su worker): decodifica el
+        nivel y construye sus entidades sin tocar el space ni las sprite
+        lists, junto con sus filas para el snapshot de inicio del nivel. Con
+        streaming, las estructuras sin nada en el rango vivo del slingshot
+        quedan solo como filas congeladas: las filas salen de un prototipo
+        por descriptor distinto (tipo, imagen y parámetros) movido a su x, y.
+        """
+        prepared = prepare_level(path)
+        specs = prepared.specs
+        prototypes: Dict[tuple, int] = {}
+        which = [prototypes.setdefault((kind, image_path, tuple(sorted(kwargs.items()))), len(prototypes))
+                 for kind, image_path, _, _, kwargs in specs]
+        built = [self._build(kind, image_path, 0.0, 0.0, dict(kwargs)) for kind, image_path, kwargs in prototypes]
+        images: Dict[str, int] = {}
+        rows = self._entity_rows(built, images)[which] if specs else np.empty(0, dtype=ENTITY_DTYPE)
+        rows["x"] = [spec[2] for spec in specs]
+        rows["y"] = [spec[3] for spec in specs]
+        rows["flags"][rows["kind"] != KIND_CODES["static"]] |= IN_WORLD
+        near = np.ones(len(specs), dtype=bool)
+        groups = 0
+        if self.streaming and len(specs):
+            # caja de cada entidad: la de su prototipo desplazada a su pose
+            extents = []
+            for entity in built:
+                bb = entity.shape.cache_bb()
+                extents.append((bb.left, bb.bottom, bb.right, bb.top))
+            boxes = np.array(extents)[which] + np.stack([rows["x"], rows["y"]] * 2, axis=1)
+            labels = structure_labels(boxes, STRUCTURE_MARGIN)
+            keep = np.fromiter(self.chunks.keep_live([SLINGSHOT_X]), dtype=np.int64)
+            live = np.zeros(labels.max() + 1, dtype=bool)
+            live[labels[np.isin(np.floor(rows["x"] / self.chunks.chunk_width).astype(np.int64), keep)]] = True
+            near = live[labels]
+            # nunca se simularon: al descongelarse vuelven dormidas en su pose
+            # del nivel, como una torre ya asentada (sin re-resolverla)
+            _, far_groups = np.unique(labels[~near], return_inverse=True)
+            groups = int(far_groups.max()) + 1 if len(far_groups) else 0
+        frozen = rows[~near]
+        frozen["flags"][frozen["kind"] != KIND_CODES["static"]] |= SLEEPING
+        if groups:
+            frozen["group"] = far_groups
+        entities = [self._build(*spec) for spec, live in zip(specs, near.tolist()) if live]
+        return BuiltLevel(prepared, entities, rows[near], frozen, groups, tuple(images))
+
+    def setup_level(self, game, level_idx):
+        """Callback del LevelManager: commit del nivel ya preparado."""
+        built = self.level_manager.prepared(level_idx)
+        level = built.prepared.level
+        logger.debug(f"Setup level {level_idx}: {level.name} ({len(level)} entidades).")
+        if level.clear:
+            self.clear_world()
+        self.set_damage_params(level_idx)
+        self.set_world_width(self.level_width(level_idx))
+        created = self.build_level(built)
+        # las filas de las entidades nuevas (las últimas de sprites) ya las
+        # armó el worker: el snapshot solo recorre lo que había antes
+        rows = built.rows.copy()
+        rows["uid"] = [entity.uid for entity in created]
+        self.level_starts[level_idx] = self.snapshot((rows, built.images))
+
+    def level_width(self, level_idx: int) -> float:
+        """Ancho del mundo (px) durante el nivel level_idx."""
+        return self.level_widths[level_idx] if 0 <= level_idx < len(self.level_widths) else WIDTH
+
+    def set_damage_params(self, level_idx: int):
+        """
+        Arma las tablas de daño por código de tipo con damage_params y lo que
+        pise el nivel level_idx. Los tipos sin parámetros no reciben daño.
+        """
+        overrides = self.level_damage[level_idx] if 0 <= level_idx < len(self.level_damage) else {}
+        self._armor[:] = np.inf
+        self._toughness[:] = np.inf
+        for kind, params in self.damage_params.items():
+            params = {**params, **overrides.get(kind, {})}
+            code = KIND_CODES[kind]
+            self._armor[code] = params["armor"]
+            self._toughness[code] = params["health"]
+        self._min_armor = float(self._armor.min())
+
+    def build_level(self, built: BuiltLevel) -> List[PhysicsSprite]:
+        """
+        Commit de un nivel armado por prepare_level: sus entidades entran al
+        space con un solo space.add y a las sprite lists con un extend, y sus
+        filas congeladas a los chunks con uids nuevos. Devuelve las que
+        entraron al space.
+        """
+        created = built.entities
+        self._commit(created, self.space)
+        self.sprites.extend(created)
+        self.world.extend(e for e in created if not isinstance(e, StaticObject))
+        if len(built.frozen):
+            rows = built.frozen.copy()
+            rows["uid"] = np.arange(len(rows)) + reserve_uids(len(rows))
+            rows["group"] += self.chunks.new_groups(built.groups)
+            self.chunks.freeze(rows, built.images)
+            # la vista o un pájaro pueden tener en rango chunks que el slingshot no
+            self._stream_key = None
+        return created
+
+    def _build(self, kind: str, image_path: Optional[str], x: float, y: float,
+               kwargs: Dict[str, float]) -> PhysicsSprite:
+        """Construye, fuera de todo space, la entidad de un descriptor de nivel."""
+        if kind == "pig":
+            return Pig(x, y, None, **kwargs)
+        if kind == "static":
+            return StaticObject(image_path, x, y, None, **kwargs)
+        if kind == "column" and not kwargs and image_path == DEFAULT_IMAGES["column"]:
+            return Column(x, y, None)
+        return PassiveObject(image_path, x, y, None, **kwargs)
+
+    def _commit(self, entities: Sequence[PhysicsSprite], space: pymunk.Space):
+        """Agrega a space, con un solo space.add, entidades construidas fuera de él."""
+        items = []
+        for entity in entities:
+            # pymunk numera los shapes al crearlos con un contador sin lock:
+            # uno hecho en el worker puede repetir el id de otro creado a la
+            # vez en este hilo, así que se renumeran acá
+            entity.shape._set_id()
+            items.append(entity.body)
+            items.append(entity.shape)
+        if items:
+            space.add(*items)
+        for entity in entities:
+            entity.added_to(space)
+
+    def clear_world(self):
+        """Remueve (sin puntaje) todos los objetos del mundo, vivos y congelados."""
+        for obj in self.world:
+            self.destroy(obj, scored=False)
+        for obj in self.sprites:
+            if isinstance(obj, StaticObject):
+                self.destroy(obj, scored=False)
+        self.flush_destroyed()
+        self.chunks.clear()
+        self._spares.clear()
+
+    # ------------------------
+    # Collision handling
+    # ------------------------
+    def install_collision_handlers(self):
+        """
+        Solo los sensores de borde tienen handler. El daño no pasa por
+        callbacks: collect_contacts lee los impulsos de todos los arbiters
+        en bloque después de cada substep.
+        """
+        handler = self.space.add_wildcard_collision_handler(COLLISION_KILL)
+        handler.begin = self._timed_callback(self.kill_zone_handler)
+
+    def _timed_callback(self, callback):
+        """
+        Envuelve un callback de colisión para sumar su tiempo a la fase
+        "callbacks" del profiler (sin evento de traza).
+        """
+        profiler = self.profiler
+
+        def timed(arbiter, space, data):
+            self.callback_events += 1
+            if not profiler.enabled:
+                return callback(arbiter, space, data)
+            start = time.perf_counter_ns()
+            result = callback(arbiter, space, data)
+            profiler.add("callbacks", time.perf_counter_ns() - start)
+            return result
+
+        return timed
+
+    def collect_contacts(self):
+        """
+        Tras un substep lee de una vez (pymunk.batch, sin un callback por
+        contacto) los arbiters activos del space y anota los que pueden
+        dañar: impulso >= el menor armor. Los arbiters de bodies dormidos no
+        están activos; los que ya se separaron quedan con impulso 0.
+        """
+        buffer = self._contacts
+        buffer.clear()
+        pymunk.batch.get_space_arbiters(self.space, CONTACT_FIELDS, buffer)
+        floats = buffer.float_buf()
+        if not len(floats):
+            return
+        impulses = np.frombuffer(floats, dtype=np.float64)
+        self.contact_events += len(impulses) // 2
+        # si la suma de todos los cuadrados no llega a armor², ningún
+        # contacto llega: el caso común (nada golpea) cuesta un solo dot
+        if np.dot(impulses, impulses) < self._min_armor * self._min_armor:
+            return
+        impulses = impulses.reshape(-1, 2)
+        impulses = np.hypot(impulses[:, 0], impulses[:, 1])
+        hit = np.flatnonzero(impulses >= self._min_armor)
+        if len(hit):
+            ints = np.frombuffer(buffer.int_buf(), dtype=np.uintp).reshape(-1, 3)
+            self._hit_bodies.append(ints[hit, :2])
+            self._hit_impulses.append(impulses[hit])
+            self._hit_first.append(ints[hit, 2] != 0)
+
+    def kill_zone_handler(self, arbiter, space, data):
+        """Begin con un sensor de borde: la entidad salió de la escena."""
+        registry = get_registry(space)
+        for shape in arbiter.shapes:
+            obj = registry.get(shape)
+            if obj is not None:
+                self.destroy(obj, scored=False)
+        return False
+
+    def apply_damage(self):
+        """
+        Aplica en bloque el daño de los contactos que anotó collect_contacts:
+        por cada objeto del mundo suma impulso / health de los impactos con
+        impulso >= armor de su tipo (y de los contactos sostenidos >= health),
+        lo resta de su vida en ENTITIES.health y destruye (en orden de primer
+        contacto) los que quedan en 0 o menos.
+        """
+        if not self._hit_impulses:
+            return
+        bodies = np.concatenate(self._hit_bodies).ravel()
+        impulses = np.repeat(np.concatenate(self._hit_impulses), 2)
+        first = np.repeat(np.concatenate(self._hit_first), 2)
+        self._hit_bodies = []
+        self._hit_impulses = []
+        self._hit_first = []
+        registry = get_registry(self.space)
+        entities = [registry.by_body(body_id) for body_id in bodies.tolist()]
+        slots = np.fromiter((-1 if e is None else e.slot for e in entities), dtype=np.intp, count=len(entities))
+        hit = np.flatnonzero(slots >= 0)
+        kinds = ENTITIES.kind[slots[hit]]
+        toughness = self._toughness[kinds]
+        counted = (impulses[hit] >= toughness) | (first[hit] & (impulses[hit] >= self._armor[kinds]))
+        hit = hit[counted]
+        if not len(hit):
+            return
+        slots = slots[hit]
+        damage = impulses[hit] / toughness[counted]
+        hit_slots, first, inverse = np.unique(slots, return_index=True, return_inverse=True)
+        health = ENTITIES.health[hit_slots] - np.bincount(inverse, weights=damage)
+        ENTITIES.health[hit_slots] = health
+        dead = np.flatnonzero(health <= 0)
+        for i in dead[np.argsort(first[dead])]:
+            obj = entities[hit[first[i]]]
+            if self.world in obj.sprite_lists:
+                self.destroy(obj)
+        self.flush_destroyed()
+
+    # ------------------------
+    # Destruction queue
+    # ------------------------
+    def destroy(self, entity: PhysicsSprite, scored: bool = True):
+        """
+        Encola una entidad para removerla una sola vez al terminar el paso
+        actual. Si se llama fuera de un paso, flush_destroyed() la aplica.
+        scored=False remueve sin sumar puntaje (fuera de escena, cambio de nivel).
+        """
+        if entity.space is None or entity in self._doomed:
+            return
+        self._doomed[entity] = scored
+        self.space.add_post_step_callback(self._flush_post_step, "destroy")
+
+    def _flush_post_step(self, space, key):
+        self.flush_destroyed()
+
+    def flush_destroyed(self):
+        """
+        Remueve en bloque las entidades encoladas: registro, space y sprite
+        lists. Suma 100 por cada Pig destruido y consulta al LevelManager una
+        vez por flush.
+        """
+        if not self._doomed:
+            return
+        doomed = self._doomed
+        self._doomed = {}
+        with self.profiler.section("destroy"):
+            pigs = self._remove_doomed(doomed)
+
+        if pigs:
+            self.score += 100 * pigs
+            logger.debug(f"{pigs} pig(s) destruido(s) -> score = {self.score}")
+            with self.profiler.section("levels"):
+                self.level_manager.update_score(self.score)
+                self.level_manager.check_and_advance(self)
+
+    def _remove_doomed(self, doomed: Dict[PhysicsSprite, bool]) -> int:
+        """Saca las entidades del registro, el space y las listas. Devuelve los cerdos puntuables."""
+        registry = get_registry(self.space)
+        items = []
+        for entity in doomed:
+            registry.discard(entity)
+            entity.wake_neighbours()
+            items.append(entity.body)
+            items.append(entity.shape)
+        self.space.remove(*items)
+
+        pigs = 0
+        for entity, scored in doomed.items():
+            entity.space = None
+            if scored and isinstance(entity, Pig) and self.world in entity.sprite_lists:
+                pigs += 1
+            entity.remove_from_sprite_lists()
+            if isinstance(entity, Bird):
+                self.lifecycle.forget(entity)
+            if entity.pool_kind is not None:
+                self.pool.release(entity)
+        logger.debug(f"{len(doomed)} objetos removidos.")
+        return pigs
+
+    # ------------------------
+    # World construction
+    # ------------------------
+    def set_world_width(self, width: float):
+        """
+        Arma el piso y los sensores de borde para un mundo de width px: lo que
+        sale por abajo, por la izquierda o más allá de width se remueve (el
+        motor avisa solo cuando algo entra en un sensor, así que no hay que
+        revisar las posiciones de todas las entidades). La vista queda dentro.
+        """
+        self.view_x = min(self.view_x, width)
+        if width == self.world_width:
+            return
+        self.world_width = width
+        if self._bounds:
+            self.space.remove(*self._bounds)
+        floor = pymunk.Segment(self._floor_body, [0, 15], [width, 15], 0.0)
+        floor.friction = 10
+        self._bounds = [floor]
+
+        body = self.space.static_body
+        t = KILL_ZONE_THICKNESS
+        left, right, bottom = -KILL_MARGIN_X, width + KILL_MARGIN_X, KILL_BOTTOM
+        top = HEIGHT * 10
+        zones = [
+            [(left - t, bottom - t), (right + t, bottom - t), (right + t, bottom), (left - t, bottom)],
+            [(left - t, bottom), (left, bottom), (left, top), (left - t, top)],
+            [(right, bottom), (right + t, bottom), (right + t, top), (right, top)],
+        ]
+        for verts in zones:
+            shape = pymunk.Poly(body, verts)
+            shape.sensor = True
+            shape.collision_type = COLLISION_KILL
+            self._bounds.append(shape)
+        self.space.add(*self._bounds)
+
+    # ------------------------
+    # Update
+    # ------------------------
+    def advance(self, delta_time: float) -> float:
+        """
+        Consume delta_time de tiempo real en ticks fijos de time_step.
+        Devuelve el alpha (0..1) para interpolar los sprites entre el tick
+        anterior y el actual.
+        """
+        self.accumulator += delta_time
+        steps = 0
+        while self.accumulator >= self.time_step:
+            if steps >= self.max_catch_up:
+                # demasiado atraso: descartarlo en vez de intentar alcanzarlo
+                logger.debug(f"Catch-up limit reached, dropping {self.accumulator:.3f}s")
+                self.accumulator %= self.time_step
+                break
+            self.step()
+            self.accumulator -= self.time_step
+            steps += 1
+        return self.accumulator / self.time_step
+
+    def step(self):
+        """Avanza la física un tick fijo (sin tocar los sprites)."""
+        profiler = self.profiler
+        registry = get_registry(self.space)
+        if self.poses is not None:
+            with profiler.section("poses"):
+                self.poses.begin_tick(registry)
+        sub_dt = self.time_step / self.substeps
+        quiet = self._quiet == registry.version
+        contacts = self.contact_events
+        # incluye la lectura de contactos, los callbacks de colisión y los flush post-step
+        with profiler.section("physics"):
+            for _ in range(self.substeps):
+                self.space.step(sub_dt)
+                if not quiet:
+                    self.collect_contacts()
+        with profiler.section("damage"):
+            self.apply_damage()
+        self.ticks += 1
+        if self.poses is not None:
+            with profiler.section("poses"):
+                self.poses.end_tick(registry)
+        # un tick sin arbiters activos puede ser un mundo dormido: si no queda
+        # nada despierto, los próximos no leen contactos hasta que algo entre
+        # o salga del space (lanzar, destruir, descongelar, restaurar...)
+        if not quiet and self.contact_events == contacts and not self.world_moving():
+            self._quiet = registry.version
+        with profiler.section("lifecycle"):
+            self.retire(self.lifecycle.expired(self.ticks))
+        # sincronizar niveles
+        with profiler.section("levels"):
+            self.level_manager.update_score(self.score)
+            self.level_manager.check_and_advance(self)
+        with profiler.section("streaming"):
+            self.stream_chunks()
+
+    # ------------------------
+    # Chunk streaming
+    # ------------------------
+    def world_moving(self) -> bool:
+        """Si hay bodies dinámicos despiertos (con PoseBuffer, los del último tick)."""
+        if self.poses is not None:
+            return bool(self.poses.entities)
+        return any(not e.body.is_sleeping for e in get_registry(self.space).dynamic_entities())
+
+    def focus_points(self) -> List[float]:
+        """x de los focos del streaming: slingshot, vista y pájaros en juego."""
+        return [SLINGSHOT_X, self.view_x] + [bird.body.position.x for bird in self.birds]
+
+    def look_at(self, x: float):
+        """
+        Mueve la vista (p. ej. la cámara de App paneando el nivel): sus chunks
+        se mantienen vivos. Es input, así que se graba, pero solo cuando cambia
+        de chunk.
+        """
+        x = min(max(x, 0.0), self.world_width)
+        if self.chunks.chunk_of(x) == self.chunks.chunk_of(self.view_x):
+            return
+        self._record("view", "red", x)
+        self.view_x = x
+
+    def stream_chunks(self, force: bool = False):
+        """
+        Descongela los chunks que entraron en rango de algún foco (los más
+        cercanos primero) cuando cambia el chunk de alguno, y cada
+        STREAM_INTERVAL ticks congela las estructuras (sin pájaros) que
+        quedaron fuera. Cada tick hace a lo sumo STREAM_BUDGET entidades de
+        una de las dos cosas: lo que no entra queda pendiente para los
+        siguientes. force descongela y congela sin esperar.
+        """
+        if not self.streaming:
+            return
+        foci = self.focus_points()
+        key = frozenset(self.chunks.chunk_of(x) for x in foci)
+        budget = STREAM_BUDGET
+        if force or self._thaw_pending or key != self._stream_key:
+            self._stream_key = key
+            for index in self.chunks.to_thaw(foci):
+                if budget <= 0:
+                    break
+                budget -= self._thaw_chunk(index, budget)
+            self._thaw_pending = budget <= 0
+        freeze = force or self._freeze_pending or not self.ticks % STREAM_INTERVAL
+        # congelar no apura (ver FREEZE_DISTANCE): un tick que descongeló lo deja para el siguiente
+        self._freeze_pending = freeze and budget < STREAM_BUDGET
+        if not freeze or self._freeze_pending or not len(self.sprites):
+            return
+        slots = slots_of(self.sprites)
+        # cerdos, pasivos y estáticos (en ENTITY_KINDS los pájaros van primero)
+        candidates = np.flatnonzero(ENTITIES.kind[slots] >= KIND_CODES["pig"])
+        xs = np.fromiter((self.sprites[i].body.position.x for i in candidates.tolist()), dtype=np.float64,
+                         count=len(candidates))
+        keep = np.fromiter(self.chunks.keep_live(foci), dtype=np.int64)
+        far = candidates[~np.isin(np.floor(xs / self.chunks.chunk_width).astype(np.int64), keep)]
+        if not len(far):
+            return
+        structures = self._structures([self.sprites[i] for i in far.tolist()], (self.space,))
+        frozen = []
+        for members, anchored in structures:
+            if anchored:
+                continue
+            if frozen and len(members) > budget:
+                self._freeze_pending = True
+                break
+            frozen.append(members)
+            budget -= len(members)
+        if frozen:
+            self._freeze(frozen)
+
+    def _structures(self, entities: Sequence[PhysicsSprite],
+                    spaces: Sequence[pymunk.Space]) -> List[Tuple[List[PhysicsSprite], bool]]:
+        """
+        Agrupa entities en estructuras: componentes conexas de entidades cuyas
+        cajas se tocan (a menos de STRUCTURE_MARGIN), buscando vecinas en
+        spaces. anchored indica que la estructura toca alguna entidad fuera de
+        entities, así que no se puede congelar sin partirla. Cada estructura
+        conserva el orden de entities.
+        """
+        index = {entity: i for i, entity in enumerate(entities)}
+        registries = [(space, get_registry(space)) for space in spaces]
+        seen = [False] * len(entities)
+        margin = STRUCTURE_MARGIN
+        structures = []
+        for start in range(len(entities)):
+            if seen[start]:
+                continue
+            seen[start] = True
+            pending = [start]
+            members = []
+            anchored = False
+            while pending:
+                i = pending.pop()
+                members.append(i)
+                bb = entities[i].shape.bb
+                query = pymunk.BB(bb.left - margin, bb.bottom - margin, bb.right + margin, bb.top + margin)
+                for space, registry in registries:
+                    for shape in space.bb_query(query, pymunk.ShapeFilter()):
+                        other = registry.get(shape)
+                        if other is None:
+                            continue  # piso, bordes
+                        j = index.get(other)
+                        if j is None:
+                            anchored = True
+                        elif not seen[j]:
+                            seen[j] = True
+                            pending.append(j)
+            structures.append(([entities[i] for i in sorted(members)], anchored))
+        return structures
+
+    def _freeze(self, structures: List[List[PhysicsSprite]]):
+        """Saca del space las entidades de structures y las guarda, cada estructura entera, en los chunks."""
+        entities = [entity for members in structures for entity in members]
+        images: Dict[str, int] = {}
+        rows = self._entity_rows(entities, images)
+        rows["group"] = self.chunks.new_groups(len(structures)) + np.repeat(
+            np.arange(len(structures)), [len(members) for members in structures])
+        self._remove_doomed(dict.fromkeys(entities, False))
+        table = tuple(images)
+        # hasta SPARE_ENTITIES por clase de entidad quedan para reusar al descongelar
+        for entity, row in zip(entities, rows.tolist()):
+            if entity.pool_kind is None:
+                key = (ENTITY_KINDS[row[1]], table[row[2]] if row[2] >= 0 else None, *row[10:13])
+                spares = self._spares.setdefault(key, [])
+                if len(spares) < SPARE_ENTITIES:
+                    spares.append(entity)
+        touched = self.chunks.freeze(rows, table)
+        logger.debug(f"Frozen {len(structures)} structures ({len(entities)} entities) into chunks {sorted(touched)}")
+
+    def _thaw_chunk(self, index: int, limit: Optional[int] = None) -> int:
+        """
+        Vuelve al space (y a las sprite lists) las entidades de un chunk
+        congelado, o con limit solo estructuras enteras hasta limit entidades
+        (ver ChunkMap.thaw). Devuelve cuántas volvieron.
+        """
+        chunk = self.chunks.thaw(index, limit)
+        rows = chunk.entities.tolist()
+        entities = [self._revive(row, chunk.images) for row in rows]
+        self._place(list(zip(entities, rows)))
+        self._load_entity_state(entities, chunk.entities)
+        self.sprites.extend(entities)
+        self.world.extend(e for e, row in zip(entities, rows) if row[3] & IN_WORLD)
+        logger.debug(f"Thawed chunk {index}: {len(entities)} entities")
+        return len(entities)
+
+    def sync_sprites(self, alpha: float = 1.0):
+        """Copia las poses de pymunk a los sprites (solo hace falta para dibujar)."""
+        if self.poses is not None:
+            with self.profiler.section("sync"):
+                self.poses.apply(alpha)
+
+    # ------------------------
+    # Shots & abilities
+    # ------------------------
+    def make_bird(self, kind: str, space: pymunk.Space) -> Bird:
+        """Fábrica del pool: pájaro de tipo kind en reposo en el slingshot."""
+        iv = ImpulseVector(angle=0.0, impulse=0.0)
+        if kind == "yellow":
+            p = self.bird_params["yellow"]
+            bird = YellowBird(BIRD_IMAGES["yellow"], iv,
+                              SLINGSHOT_X, SLINGSHOT_Y, space,
+                              mass=p["mass"], radius=p["radius"],
+                              max_impulse=p["max_impulse"], power_multiplier=p["power_multiplier"])
+            bird.boost_multiplier = p.get("boost_multiplier", 2.0)
+        elif kind == "blue":
+            p = self.bird_params["blue"]
+            bird = BlueBird(BIRD_IMAGES["blue"], iv,
+                            SLINGSHOT_X, SLINGSHOT_Y, space,
+                            mass=p["mass"], radius=p["radius"],
+                            max_impulse=p["max_impulse"], power_multiplier=p["power_multiplier"],
+                            split_angle_deg=p.get("split_angle_deg", 30.0))
+            bird.child_factory = lambda: self.pool.acquire("blue_child")
+        elif kind == "blue_child":
+            p = self.bird_params["blue"]
+            bird = Bird(BIRD_IMAGES["blue"], iv, SLINGSHOT_X, SLINGSHOT_Y, space,
+                        mass=p["mass"], radius=p["radius"], scale=0.3)
+        else:
+            p = self.bird_params["red"]
+            bird = Bird(BIRD_IMAGES["red"], iv,
+                        SLINGSHOT_X, SLINGSHOT_Y, space,
+                        mass=p["mass"], radius=p["radius"],
+                        max_impulse=p["max_impulse"], power_multiplier=p["power_multiplier"])
+        return bird
+
+    def launch_bird(self, choice: str, impulse_vector: ImpulseVector) -> Bird:
+        """Toma del pool el pájaro elegido y lo lanza desde el slingshot."""
+        kind = choice if choice in ("yellow", "blue") else "red"
+        self._record("shot", kind, impulse_vector.angle, impulse_vector.impulse)
+        self.shot_history.append(self.snapshot())
+        # siempre en SLINGSHOT coords
+        bird = self.pool.acquire(kind)
+        bird.spawn(impulse_vector, SLINGSHOT_X, SLINGSHOT_Y, self.space)
+        logger.debug(f"Launched {kind} bird")
+
+        self.sprites.append(bird)
+        self.birds.append(bird)
+        self.retire(self.lifecycle.track(bird, self.ticks))
+        return bird
+
+    def spawn_pig(self, x: float, y: float) -> Pig:
+        """Toma un Pig del pool y lo agrega al mundo en (x, y)."""
+        pig = self.pool.acquire("pig")
+        pig.spawn(x, y, self.space)
+        self.sprites.append(pig)
+        self.world.append(pig)
+        return pig
+
+    def activate_ability(self) -> bool:
+        """Activa la habilidad del pájaro activo (el último lanzado), si tiene."""
+        b = self.lifecycle.active
+        if b is None or not b.launched or b.used_ability:
+            return False
+        # la habilidad despierta al pájaro aunque ya estuviera dormido
+        self._quiet = None
+        if isinstance(b, YellowBird):
+            activated = b.on_click_ability()
+            if activated:
+                logger.debug("YellowBird ability activated.")
+                self.lifecycle.active = None
+                self._record("ability")
+                return True
+        if isinstance(b, BlueBird):
+            children = b.on_click_ability(self.sprites)
+            if children:
+                logger.debug(f"BlueBird split into {len(children)} birds.")
+                self.lifecycle.forget(b)
+                self.pool.release(b)
+                for c in children:
+                    self.birds.append(c)
+                    self.retire(self.lifecycle.track(c, self.ticks, active=False))
+                self._record("ability")
+                return True
+        return False
+
+    def _record(self, kind: str, *args):
+        """Graba un evento de input en el tick actual (si se está grabando)."""
+        if self.recorder is not None:
+            self.recorder.record(self.ticks, kind, *args)
+
+    def retire(self, birds):
+        """Remueve (sin puntaje) los pájaros que indicó el ciclo de vida."""
+        if not birds:
+            return
+        for bird in birds:
+            self.destroy(bird, scored=False)
+        self.flush_destroyed()
+
+    # ------------------------
+    # Snapshots
+    # ------------------------
+    def _entity_rows(self, entities: Sequence[PhysicsSprite], images: Dict[str, int]) -> np.ndarray:
+        """Filas de ENTITY_DTYPE de entities; sus imágenes se indexan (y agregan) en images."""
+        rows = []
+        for entity in entities:
+            body, shape = entity.body, entity.shape
+            lists = entity.sprite_lists
+            flags = 0
+            if self.world in lists:
+                flags |= IN_WORLD
+            if self.birds in lists:
+                flags |= IN_BIRDS
+            if body.body_type == pymunk.Body.DYNAMIC and body.is_sleeping:
+                flags |= SLEEPING
+            if entity.pool_kind is not None:
+                flags |= POOLED
+            image_path = getattr(entity, "image_path", None)
+            image = -1 if image_path is None else images.setdefault(image_path, len(images))
+            x, y = body.position
+            vx, vy = body.velocity
+            rows.append((entity.uid, 0, image, flags,
+                         x, y, body.angle, vx, vy, body.angular_velocity,
+                         body.mass if body.body_type == pymunk.Body.DYNAMIC else 0.0,
+                         shape.elasticity, shape.friction, 0.0, -1))
+        rows = np.array(rows, dtype=ENTITY_DTYPE)
+        # tipo, flags y vida de la entidad salen de sus columnas en ENTITIES
+        slots = slots_of(entities)
+        rows["kind"] = ENTITIES.kind[slots]
+        rows["flags"] |= ENTITIES.flags[slots] & ENTITY_FLAGS
+        rows["health"] = ENTITIES.health[slots]
+        return rows
+
+    def _load_entity_state(self, entities: Sequence[PhysicsSprite], rows: np.ndarray):
+        """Vuelve a las entidades los flags y la vida de rows (en el orden de entities)."""
+        for entity, flags in zip(entities, rows["flags"].tolist()):
+            entity.launched = bool(flags & LAUNCHED)
+            entity.used_ability = bool(flags & USED_ABILITY)
+        ENTITIES.health[slots_of(entities)] = rows["health"]
+
+    def _revive(self, row: tuple, images: Tuple[str, ...]) -> PhysicsSprite:
+        """Entidad (fuera del space) para una fila sin entidad viva: del pool o reconstruida."""
+        uid, code, image, flags, x, y, angle, vx, vy, w, mass, elasticity, friction, *_ = row
+        kind = ENTITY_KINDS[code]
+        if flags & POOLED:
+            entity = self.pool.acquire(kind)
+        else:
+            image_path = images[image] if image >= 0 else None
+            entity = self._rebuild(kind, image_path, mass, elasticity, friction)
+        entity.uid = uid
+        return entity
+
+    def _place(self, dirty: List[Tuple[PhysicsSprite, tuple]]):
+        """
+        Escribe en cada entidad (fuera del space) la pose y velocidades de su
+        fila y las agrega al space en bloque; las que estaban dormidas vuelven
+        dormidas (no se re-resuelven las torres asentadas).
+        """
+        space = self.space
+        registry = get_registry(space)
+        items = []
+        sleeping = []
+        for entity, (uid, code, image, flags, x, y, angle, vx, vy, w, *_) in dirty:
+            body = entity.body
+            body.position = (x, y)
+            body.angle = angle
+            if body.body_type == pymunk.Body.DYNAMIC:
+                body.velocity = (vx, vy)
+                body.angular_velocity = w
+                body.force = (0, 0)
+                body.torque = 0
+            if flags & SLEEPING:
+                sleeping.append(body)
+            items.append(body)
+            items.append(entity.shape)
+        if items:
+            space.add(*items)
+        for entity, _ in dirty:
+            entity.space = space
+            registry.add(entity)
+            entity.update(0)
+        for body in sleeping:
+            body.sleep()
+
+    def snapshot(self, tail: Optional[Tuple[np.ndarray, Tuple[str, ...]]] = None) -> WorldSnapshot:
+        """
+        Captura el estado completo de la simulación (ver WorldSnapshot). Las
+        entidades de los chunks congelados van al final, con el flag FROZEN.
+        tail son las filas (con su tabla de imágenes) ya armadas de las
+        últimas entidades de sprites, que así no se recorren.
+        """
+        images: Dict[str, int] = {}
+        sprites = self.sprites if tail is None else self.sprites[:len(self.sprites) - len(tail[0])]
+        entities = self._entity_rows(sprites, images)
+        parts = [(entities, tuple(images))]
+        if tail is not None:
+            parts.append(tail)
+        if len(parts) > 1 or self.chunks.frozen:
+            live = len(sprites) + (0 if tail is None else len(tail[0]))
+            entities, table = merge_rows(parts + [(chunk.entities, chunk.images) for _, chunk in self.chunks.items()])
+            entities["flags"][live:] |= FROZEN
+        else:
+            table = tuple(images)
+        birds = [(bird.uid, spawned, -1 if since is None else since)
+                 for bird, spawned, since in self.lifecycle.entries()]
+        active = self.lifecycle.active
+        return WorldSnapshot(
+            ticks=self.ticks,
+            accumulator=self.accumulator,
+            score=self.score,
+            level=self.level_manager.current_level,
+            entities=entities,
+            images=table,
+            birds=np.array(birds, dtype=BIRD_DTYPE),
+            active_uid=-1 if active is None else active.uid,
+        )
+
+    def restore(self, snap: WorldSnapshot):
+        """
+        Vuelve al estado de snap en el space vivo, tocando solo lo que cambió:
+        las entidades que siguen vivas y en la misma pose (p. ej. una torre
+        dormida que el disparo no alcanzó) no se tocan; las que se movieron
+        salen y vuelven a entrar al space con su estado de snap (lo que
+        descarta sus contactos cacheados); las que ya no están se piden al
+        pool o se reconstruyen, y las que no existían en snap (o estaban en
+        un chunk congelado) se descartan. Los chunks congelados se reemplazan
+        por los de snap.
+        No llamar durante un paso.
+        """
+        self._doomed = {}
+        self._quiet = None
+        self._hit_bodies = []
+        self._hit_impulses = []
+        self._hit_first = []
+        space = self.space
+        registry = get_registry(space)
+
+        frozen = (snap.entities["flags"] & FROZEN) != 0
+        self.chunks.clear()
+        self._stream_key = None
+        self._thaw_pending = False
+        self._freeze_pending = False
+        snap_rows = snap.entities
+        if frozen.any():
+            thawed = snap_rows[frozen]
+            thawed["flags"] &= ~np.uint8(FROZEN)
+            self.chunks.freeze(thawed, snap.images)
+            snap_rows = snap_rows[~frozen]
+
+        live = {entity.uid: entity for entity in self.sprites}
+        rows = snap_rows.tolist()
+        keep = {row[0] for row in rows}
+
+        dropped = [entity for uid, entity in live.items() if uid not in keep]
+        # (entidad, fila) a reescribir, y las que hay que sacar del space antes
+        dirty = []
+        detach = list(dropped)
+        entities: List[PhysicsSprite] = []
+        for row in rows:
+            uid, code, image, flags, x, y, angle, vx, vy, w, *_ = row
+            entity = live.get(uid)
+            if entity is None:
+                entity = self._revive(row, snap.images)
+                dirty.append((entity, row))
+            else:
+                body = entity.body
+                if body.body_type == pymunk.Body.DYNAMIC:
+                    unchanged = (
+                        body.is_sleeping == bool(flags & SLEEPING)
+                        and (*body.position, body.angle, *body.velocity, body.angular_velocity) == (x, y, angle, vx, vy, w)
+                    )
+                else:
+                    unchanged = tuple(body.position) == (x, y)
+                if not unchanged:
+                    dirty.append((entity, row))
+                    detach.append(entity)
+            entities.append(entity)
+
+        items = []
+        for entity in detach:
+            registry.discard(entity)
+            items.append(entity.body)
+            items.append(entity.shape)
+        if items:
+            space.remove(*items)
+        for entity in detach:
+            entity.space = None
+        for entity in dropped:
+            entity.remove_from_sprite_lists()
+            if entity.pool_kind is not None:
+                self.pool.release(entity)
+
+        self.set_world_width(self.level_width(snap.level))
+        self._place(dirty)
+        self._load_entity_state(entities, snap_rows)
+
+        # las sprite lists solo se rearman si cambió su contenido u orden
+        flags = [row[3] for row in rows]
+        world = [e for e, f in zip(entities, flags) if f & IN_WORLD]
+        birds = [e for e, f in zip(entities, flags) if f & IN_BIRDS]
+        for sprite_list, content in ((self.sprites, entities), (self.world, world), (self.birds, birds)):
+            if len(sprite_list) != len(content) or any(a is not b for a, b in zip(sprite_list, content)):
+                sprite_list.clear()
+                sprite_list.extend(content)
+
+        by_uid = {entity.uid: entity for entity in entities}
+        self.lifecycle.load(
+            [(by_uid[uid], spawned, None if since < 0 else since) for uid, spawned, since in snap.birds.tolist()],
+            by_uid.get(snap.active_uid),
+        )
+        self.ticks = snap.ticks
+        self.accumulator = snap.accumulator
+        self.score = snap.score
+        self.level_manager.current_level = snap.level
+        self.set_damage_params(snap.level)
+        self.level_manager.update_score(snap.score)
+        self.level_manager.prefetch(snap.level + 1)
+        if self.poses is not None:
+            self.poses.reset()
+        logger.debug(f"Restored snapshot: {len(dirty)}/{len(rows)} entities rewritten, {len(dropped)} dropped, "
+                      f"{frozen.sum()} frozen")
+
+    def _rebuild(self, kind: str, image_path: Optional[str], mass: float, elasticity: float,
+                 friction: float) -> PhysicsSprite:
+        """
+        Reconstruye (fuera del space) una entidad que no venía del pool, o
+        reusa una igual que _freeze guardó.
+        """
+        spares = self._spares.get((kind, image_path, mass, elasticity, friction))
+        if spares:
+            return spares.pop()
+        if kind == "pig":
+            return Pig(0, 0, None, mass=mass, elasticity=elasticity, friction=friction)
+        if kind == "static":
+            return StaticObject(image_path, 0, 0, None, elasticity=elasticity, friction=friction)
+        if kind == "passive":
+            return PassiveObject(image_path, 0, 0, None, mass=mass, elasticity=elasticity, friction=friction)
+        entity = self.make_bird(kind, self._scratch)
+        entity.kind = kind
+        entity.remove_from_space_and_lists()
+        return entity
+
+    def retry_level(self) -> bool:
+        """Vuelve al inicio del nivel actual."""
+        snap = self.level_starts.get(self.level_manager.current_level)
+        if snap is None:
+            return False
+        self._record("retry")
+        self.restore(snap)
+        self.shot_history.clear()
+        return True
+
+    def undo_shot(self) -> bool:
+        """Vuelve al estado previo al último disparo (hasta UNDO_DEPTH)."""
+        if not self.shot_history:
+            return False
+        self._record("undo")
+        self.restore(self.shot_history.pop())
+        return True
+
+    def close(self):
+        """Libera los hilos auxiliares (precarga de niveles)."""
+        self.level_manager.close()
+
+    # ------------------------
+    # Level loading helper
+    # ------------------------
+    def load_level(self, level_idx):
+        """Limpiar el mundo actual (y los pájaros) y ejecutar setup del nivel indicado."""
+        self.retire(list(self.birds))
+        self.clear_world()
+
+        # ejecutar setup (con el nivel ya fijado, como LevelManager._enter:
+        # el snapshot de inicio del nivel lo registra)
+        if 0 <= level_idx < len(self.level_manager.levels):
+            _, setup = self.level_manager.levels[level_idx]
+            self.level_manager.current_level = level_idx
+            if setup:
+                setup(self, level_idx)
+
+
+# ------------------------
+# main (headless)
+# ------------------------
+def main(argv: Optional[list] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Corre la simulación sin ventana y mide su velocidad.")
+    parser.add_argument("--frames", type=int, default=10000)
+    parser.add_argument("--shot", type=float, nargs=2, metavar=("ANGLE", "IMPULSE"),
+                        help="disparo inicial (radianes, impulso) con un pájaro rojo")
+    parser.add_argument("--trace", metavar="PATH", help="exporta una traza de fases (chrome://tracing)")
+    parser.add_argument("--csv", metavar="PATH", help="exporta los tiempos por fase y por frame en CSV")
+    args = parser.parse_args(argv)
+
+    profiler = None
+    if args.trace or args.csv:
+        profiler = FrameProfiler(enabled=True, history=args.frames)
+    sim = Simulation(track_poses=False, profiler=profiler)
+    if args.shot:
+        sim.launch_bird("red", ImpulseVector(*args.shot))
+    if profiler is not None:
+        # que el primer frame no cuente la construcción
+        profiler.set_enabled(True)
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        sim.step()
+        if profiler is not None:
+            profiler.end_frame()
+    elapsed = time.perf_counter() - start
+    print(f"{args.frames} frames en {elapsed:.3f}s ({args.frames / elapsed:.0f} fps), score={sim.score}")
+    if profiler is not None:
+        for name, (p50, p95, p99), calls in profiler.summary():
+            print(f"{name:>10}: p50 {p50:.3f}  p95 {p95:.3f}  p99 {p99:.3f} ms  ({calls:.1f} llamadas/frame)")
+        if args.trace:
+            profiler.export_chrome_trace(args.trace)
+        if args.csv:
+            profiler.export_csv(args.csv)
+
+
+if __name__ == "__main__":
+    main()
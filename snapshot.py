@@ -0,0 +1,61 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Tuple
+
+# flags por entidad (los bits 3 y 4 son LAUNCHED y USED_ABILITY, ver entity_store)
+IN_WORLD = 1 << 0
+IN_BIRDS = 1 << 1
+SLEEPING = 1 << 2
+# vino del EntityPool: se reconstruye pidiéndola al pool
+POOLED = 1 << 5
+# está en un chunk congelado, fuera del space (ver chunks.py)
+FROZEN = 1 << 6
+
+# una fila por entidad viva (~79 bytes), en el orden de dibujo de sim.sprites
+ENTITY_DTYPE = np.dtype([
+    ("uid", "i8"),
+    ("kind", "u1"),
+    ("image", "i2"),
+    ("flags", "u1"),
+    ("x", "f8"),
+    ("y", "f8"),
+    ("angle", "f8"),
+    ("vx", "f8"),
+    ("vy", "f8"),
+    ("w", "f8"),
+    ("mass", "f4"),
+    ("elasticity", "f4"),
+    ("friction", "f4"),
+    ("health", "f4"),    # vida restante (1.0 = intacta, ver Simulation.apply_damage)
+    ("group", "i4"),     # estructura con la que se congeló (ver ChunkMap.freeze), -1 si está viva
+])
+
+# pájaros seguidos por el BirdLifecycle, en orden de lanzamiento
+# (resting = -1: no está en reposo)
+BIRD_DTYPE = np.dtype([("uid", "i8"), ("spawned", "i8"), ("resting", "i8")])
+
+
+@dataclass(frozen=True)
+class WorldSnapshot:
+    """
+    Estado completo de una Simulation en arrays planos: entidades (pose,
+    velocidades, flags y lo necesario para reconstruirlas), pájaros del
+    ciclo de vida, puntaje, nivel y reloj. No guarda referencias a bodies ni
+    sprites, así que sigue siendo válido aunque el pool recicle entidades.
+    """
+    ticks: int
+    accumulator: float
+    score: int
+    level: int
+    entities: np.ndarray
+    images: Tuple[str, ...]
+    birds: np.ndarray
+    active_uid: int = -1
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    @property
+    def nbytes(self) -> int:
+        return self.entities.nbytes + self.birds.nbytes
+
@@ -0,0 +1,354 @@
+import functools
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from entity_store import KIND_CODES
+from game_logic import ImpulseVector, Point2D
+from game_object import Pig, get_registry, reseed_uids
+from simulation import DEFAULT_PARAMS, SLINGSHOT_X, SLINGSHOT_Y, Simulation
+from snapshot import WorldSnapshot
+
+logger = logging.getLogger(__name__)
+
+BIRDS: Tuple[str, ...] = ("red", "yellow", "blue")
+# rango de ángulos (radianes); el de impulso va de MIN_IMPULSE al max_impulse del pájaro
+ANGLE_RANGE = (math.radians(-15), math.radians(80))
+MIN_IMPULSE = 20.0
+# grilla gruesa de la primera ronda
+COARSE_ANGLES = 10
+COARSE_IMPULSES = 5
+# ticks tras el lanzamiento en que se activa la habilidad (None = no usarla)
+ABILITY_TICKS: Tuple[Optional[int], ...] = (None, 20, 40)
+ABILITY_STEP = 10
+# candidatos que se refinan por ronda y máximo de rondas de refinamiento
+REFINE_TOP = 4
+REFINE_ROUNDS = 3
+# tope de ticks por candidato; antes se corta si todo se asentó
+SHOT_TICKS = 600
+SETTLE_SPEED = 20.0
+SETTLE_CHECK_EVERY = 15
+
+# (pájaro, ángulo, impulso, tick de la habilidad o None)
+Candidate = Tuple[str, float, float, Optional[int]]
+
+
+@dataclass
+class ShotResult:
+    bird: str
+    angle: float
+    impulse: float
+    ability_tick: Optional[int]
+    pigs: int
+    ticks: int
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        """Orden de preferencia: más cerdos, y a igualdad, resuelto antes."""
+        return self.pigs, -self.ticks
+
+    def impulse_vector(self) -> ImpulseVector:
+        return ImpulseVector(self.angle, self.impulse)
+
+    def drag_end(self) -> Point2D:
+        """Punto donde soltar un arrastre desde el slingshot para este disparo."""
+        return Point2D(SLINGSHOT_X - math.cos(self.angle) * self.impulse,
+                       SLINGSHOT_Y - math.sin(self.angle) * self.impulse)
+
+
+@dataclass
+class Solution:
+    best: Optional[ShotResult]
+    pigs_total: int
+    evaluated: int
+    rounds: int
+    elapsed: float
+    # 1 - fracción de la grilla gruesa que logra el mejor resultado
+    difficulty: float
+
+    @property
+    def solved(self) -> bool:
+        return self.best is not None and self.best.pigs >= self.pigs_total
+
+
+# ------------------------
+# Evaluación (corre en los procesos del pool)
+# ------------------------
+def evaluate(sim: Simulation, base: WorldSnapshot, candidate: Candidate) -> ShotResult:
+    """
+    Vuelve sim a base, dispara el candidato y simula hasta que se asiente o
+    se pase de nivel (los cerdos del nivel siguiente no cuentan).
+    """
+    sim.restore(base)
+    bird, angle, impulse, ability = candidate
+    sim.launch_bird(bird, ImpulseVector(angle, impulse))
+    tick = 0
+    while tick < SHOT_TICKS:
+        if tick == ability:
+            sim.activate_ability()
+        sim.step()
+        tick += 1
+        if sim.level_manager.current_level != base.level:
+            break
+        if tick % SETTLE_CHECK_EVERY == 0 and (ability is None or tick > ability) and settled(sim):
+            break
+    return ShotResult(bird, angle, impulse, ability, (sim.score - base.score) // 100, tick)
+
+
+def settled(sim: Simulation) -> bool:
+    """Sin cerdos (vivos ni congelados), o ningún body despierto más rápido que SETTLE_SPEED."""
+    if not any(isinstance(e, Pig) for e in sim.world) and not sim.chunks.count(KIND_CODES["pig"]):
+        return True
+    for entity in get_registry(sim.space).dynamic_entities():
+        body = entity.body
+        if not body.is_sleeping and body.velocity.length > SETTLE_SPEED:
+            return False
+    return True
+
+
+# simulación que heredan los procesos hijos al hacer fork (ver AimSolver)
+_inherited: Optional[Simulation] = None
+_worker: Optional[Simulation] = None
+# generación vigente, compartida con el proceso padre: las tareas de una
+# búsqueda cancelada se descartan sin simular
+_current = None
+
+# parámetros por tipo de pájaro (como Simulation.bird_params)
+BirdParams = Dict[str, Dict[str, float]]
+# cada proceso del pool numera sus entidades desde pid * UID_BLOCK
+UID_BLOCK = 1 << 32
+
+
+def _init_worker(current, config: Dict):
+    global _worker, _current
+    logging.getLogger().setLevel(logging.WARNING)
+    # el padre sigue creando entidades después del fork (y sus snapshots
+    # llegan con cada tarea): los uids de este proceso no deben pisarse
+    reseed_uids(os.getpid() * UID_BLOCK)
+    sim = _inherited
+    if sim is None:
+        # sin fork: se construye una simulación con la misma configuración
+        # (restore lleva el mundo al snapshot de cada tarea)
+        sim = Simulation(track_poses=False, **config)
+    sim.poses = None
+    sim.recorder = None
+    sim.level_manager.discard_workers()
+    _worker = sim
+    _current = current
+
+
+def _evaluate(generation: int, base: WorldSnapshot, candidate: Candidate) -> Optional[ShotResult]:
+    if _current.value != generation:
+        return None
+    return evaluate(_worker, base, candidate)
+
+
+# ------------------------
+# Búsqueda
+# ------------------------
+def _linspace(lo: float, hi: float, n: int) -> List[float]:
+    if n <= 1:
+        return [(lo + hi) / 2]
+    return [lo + (hi - lo) * i / (n - 1) for i in range(n)]
+
+
+def _impulse_range(bird: str, params: BirdParams) -> Tuple[float, float]:
+    return MIN_IMPULSE, float(params[bird]["max_impulse"])
+
+
+def coarse_candidates(birds: Iterable[str], params: BirdParams = DEFAULT_PARAMS) -> List[Candidate]:
+    out = []
+    for bird in birds:
+        abilities = ABILITY_TICKS if bird != "red" else (None,)
+        for angle in _linspace(*ANGLE_RANGE, COARSE_ANGLES):
+            for impulse in _linspace(*_impulse_range(bird, params), COARSE_IMPULSES):
+                for ability in abilities:
+                    out.append((bird, angle, impulse, ability))
+    return out
+
+
+def refine_candidates(results: Sequence[ShotResult], level: int,
+                      params: BirdParams = DEFAULT_PARAMS) -> List[Candidate]:
+    """Vecinos de los mejores resultados, con paso 2**-level del de la grilla gruesa."""
+    da = (ANGLE_RANGE[1] - ANGLE_RANGE[0]) / (COARSE_ANGLES - 1) / 2 ** level
+    out = []
+    for r in results:
+        lo, hi = _impulse_range(r.bird, params)
+        di = (hi - lo) / (COARSE_IMPULSES - 1) / 2 ** level
+        abilities = [r.ability_tick]
+        if r.ability_tick is not None:
+            step = max(1, ABILITY_STEP >> (level - 1))
+            abilities += [max(1, r.ability_tick - step), r.ability_tick + step]
+        for sa in (-1, 0, 1):
+            for si in (-1, 0, 1):
+                for ability in abilities:
+                    if sa == si == 0 and ability == r.ability_tick:
+                        continue
+                    angle = min(max(r.angle + sa * da, ANGLE_RANGE[0]), ANGLE_RANGE[1])
+                    impulse = min(max(r.impulse + si * di, lo), hi)
+                    out.append((r.bird, angle, impulse, ability))
+    return out
+
+
+class AimSolver:
+    """
+    Busca el disparo que más cerdos destruye desde un snapshot de una
+    Simulation. Los candidatos (pájaro, ángulo, impulso, momento de la
+    habilidad) se simulan en un pool de procesos creados por fork, que
+    heredan una copia de la simulación y la llevan al snapshot antes de
+    cada disparo. Primero una grilla gruesa y luego rondas de refinamiento
+    alrededor de los mejores; se corta al destruir todos los cerdos o cuando
+    una ronda no mejora.
+    El pool se crea (fork) una vez, en el constructor, así que hay que
+    construirlo en el hilo que maneja la simulación y entre pasos; después
+    sirve para cualquier snapshot de esa simulación (solve o request).
+    """
+    def __init__(self, sim: Simulation, processes: Optional[int] = None):
+        global _inherited
+        self.base = sim.snapshot()
+        self.bird_params = sim.bird_params
+        self.processes = processes or os.cpu_count() or 1
+        if "fork" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("fork")
+            _inherited = sim
+        else:
+            ctx = multiprocessing.get_context("spawn")
+        self._current = ctx.Value("q", 0, lock=False)
+        config = {"gravity": sim.space.gravity[1], "time_step": sim.time_step, "substeps": sim.substeps,
+                  "bird_params": sim.bird_params, "damage_params": sim.damage_params}
+        try:
+            self._pool = ctx.Pool(self.processes, initializer=_init_worker, initargs=(self._current, config))
+        finally:
+            _inherited = None
+        # búsquedas sin bloquear (ver request): de a una, en un hilo aparte
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self) -> "AimSolver":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def pigs_total(self) -> int:
+        return count_pigs(self.base)
+
+    def close(self):
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._pool.terminate()
+        self._pool.join()
+
+    def cancel(self):
+        """Descarta la búsqueda en curso: lo que queda de ella no se simula."""
+        self._current.value += 1
+
+    def run(self, candidates: List[Candidate], base: Optional[WorldSnapshot] = None,
+            generation: Optional[int] = None) -> List[ShotResult]:
+        """Evalúa candidates desde base; CancelledError si la búsqueda se canceló mientras tanto."""
+        base = self.base if base is None else base
+        generation = self._current.value if generation is None else generation
+        chunksize = max(1, len(candidates) // (self.processes * 4))
+        results = self._pool.map(functools.partial(_evaluate, generation, base), candidates, chunksize)
+        if self._current.value != generation:
+            raise CancelledError()
+        return results
+
+    def solve(self, birds: Iterable[str] = BIRDS, rounds: int = REFINE_ROUNDS,
+              base: Optional[WorldSnapshot] = None, generation: Optional[int] = None) -> Solution:
+        start = time.perf_counter()
+        base = self.base if base is None else base
+        generation = self._current.value if generation is None else generation
+        pigs_total = count_pigs(base)
+        results = self.run(coarse_candidates(birds, self.bird_params), base, generation)
+        evaluated = len(results)
+        best = max(results, key=lambda r: r.key, default=None)
+        difficulty = 1.0
+        if best is not None and best.pigs > 0:
+            difficulty = 1.0 - sum(r.pigs >= best.pigs for r in results) / len(results)
+
+        top = sorted(results, key=lambda r: r.key, reverse=True)[:REFINE_TOP]
+        done = 0
+        seen = {(r.bird, r.angle, r.impulse, r.ability_tick) for r in results}
+        for level in range(1, rounds + 1):
+            if best is None or best.pigs >= pigs_total:
+                break
+            candidates = [c for c in dict.fromkeys(refine_candidates(top, level, self.bird_params)) if c not in seen]
+            if not candidates:
+                break
+            seen.update(candidates)
+            round_results = self.run(candidates, base, generation)
+            evaluated += len(round_results)
+            done = level
+            top = sorted(top + round_results, key=lambda r: r.key, reverse=True)[:REFINE_TOP]
+            if top[0].key <= best.key:
+                break
+            best = top[0]
+        elapsed = time.perf_counter() - start
+        logger.debug(f"Aim solver: {evaluated} shots in {elapsed:.2f}s, best={best}")
+        return Solution(best, pigs_total, evaluated, done, elapsed, difficulty)
+
+    def request(self, sim: Simulation, birds: Iterable[str] = BIRDS) -> "Future[Solution]":
+        """
+        Busca sin bloquear desde el estado actual de sim (el snapshot se toma
+        acá, entre pasos) y cancela la búsqueda anterior: sus tareas
+        pendientes se descartan sin simular, así que la nueva no espera
+        detrás de ella. Devuelve un Future.
+        """
+        base = sim.snapshot()
+        birds = tuple(birds)
+        self.cancel()
+        generation = self._current.value
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aim-solver")
+        return self._executor.submit(self.solve, birds, REFINE_ROUNDS, base, generation)
+
+
+def count_pigs(snap: WorldSnapshot) -> int:
+    """Cerdos de snap, también los de chunks congelados (el snapshot los incluye)."""
+    return int(np.count_nonzero(snap.entities["kind"] == KIND_CODES["pig"]))
+
+
+# ------------------------
+# main: resolver cada nivel
+# ------------------------
+def report(idx: int, sol: Solution):
+    best = sol.best
+    shot = "sin disparo" if best is None else (
+        f"{best.bird} {math.degrees(best.angle):.1f}° impulso {best.impulse:.1f}"
+        + (f" habilidad en tick {best.ability_tick}" if best.ability_tick is not None else "")
+    )
+    print(f"nivel {idx}: {best.pigs if best else 0}/{sol.pigs_total} cerdos "
+          f"({'resuelto' if sol.solved else 'sin resolver'}), {shot}; dificultad {sol.difficulty:.2f}, "
+          f"{sol.evaluated} disparos en {sol.elapsed:.1f}s")
+
+
+def main(argv: Optional[list] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Busca el mejor disparo de cada nivel (sin ventana).")
+    parser.add_argument("--level", type=int, action="append", help="nivel a resolver (repetible; por defecto todos)")
+    parser.add_argument("--birds", nargs="+", choices=BIRDS, default=list(BIRDS))
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=REFINE_ROUNDS)
+    args = parser.parse_args(argv)
+
+    sim = Simulation(track_poses=False)
+    levels = args.level if args.level else range(len(sim.level_manager.levels))
+    with AimSolver(sim, args.processes) as solver:
+        for idx in levels:
+            sim.load_level(idx)
+            sol = solver.solve(args.birds, args.rounds, base=sim.snapshot())
+            report(idx, sol)
+
+
+if __name__ == "__main__":
+    main()
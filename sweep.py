@@ -0,0 +1,265 @@
+import glob
+import itertools
+import json
+import logging
+import math
+import multiprocessing
+import os
+import time
+import numpy as np
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from game_logic import ImpulseVector
+from simulation import DAMAGE_PARAMS, DEFAULT_PARAMS, GRAVITY, SLINGSHOT_X, Simulation
+from solver import settled
+
+logger = logging.getLogger(__name__)
+
+# parámetros barribles: "<tipo>.<campo>" de DEFAULT_PARAMS y DAMAGE_PARAMS, y la gravedad
+PARAM_NAMES: Tuple[str, ...] = tuple(
+    f"{kind}.{field}" for table in (DEFAULT_PARAMS, DAMAGE_PARAMS) for kind, params in table.items() for field in params
+) + ("gravity",)
+
+# disparos de referencia que se repiten con cada configuración: (pájaro, grados, impulso, tick de habilidad o -1).
+# Con los parámetros por defecto los tres destruyen el cerdo del nivel 0, cerca del límite: con un cerdo más
+# duro, un pájaro más liviano o menos gravedad alguno deja de hacerlo (ver tests/test_sweep.py)
+DEFAULT_SHOTS: Tuple[Tuple[str, float, float, int], ...] = (
+    ("red", 10.0, 120.0, -1),
+    ("yellow", 0.0, 160.0, 20),
+    ("blue", 10.0, 120.0, 20),
+)
+SHOT_TICKS = 600
+# filas por archivo de resultados
+CHUNK_ROWS = 4096
+# configuraciones por tarea enviada a un worker
+BATCH_SIZE = 16
+
+# columnas de métricas (además de config, shot y una por parámetro)
+METRIC_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("pigs", "i2"),        # cerdos destruidos
+    ("range", "f4"),       # x máxima alcanzada por los pájaros del disparo, desde el slingshot
+    ("contacts", "i4"),    # arbiters leídos (ver Simulation.collect_contacts)
+    ("ticks", "i4"),       # ticks simulados hasta asentarse
+    ("step_ms", "f4"),     # tiempo medio por tick
+)
+
+
+# ------------------------
+# Diseños
+# ------------------------
+def _check(names: Iterable[str]):
+    unknown = [n for n in names if n not in PARAM_NAMES]
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos: {unknown}; válidos: {', '.join(PARAM_NAMES)}")
+
+
+def grid_design(axes: Dict[str, Sequence[float]]) -> List[Dict[str, float]]:
+    """Producto cartesiano de los valores de cada parámetro."""
+    _check(axes)
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[n] for n in names))]
+
+
+def random_design(ranges: Dict[str, Tuple[float, float]], n: int, seed: int = 0) -> List[Dict[str, float]]:
+    """n configuraciones con cada parámetro uniforme en su rango."""
+    _check(ranges)
+    rng = np.random.default_rng(seed)
+    columns = {name: rng.uniform(lo, hi, n).tolist() for name, (lo, hi) in ranges.items()}
+    return [{name: columns[name][i] for name in ranges} for i in range(n)]
+
+
+def simulation_kwargs(config: Dict[str, float]) -> Dict:
+    """Argumentos de Simulation para una configuración del diseño."""
+    bird_params: Dict[str, Dict[str, float]] = {}
+    damage_params: Dict[str, Dict[str, float]] = {}
+    for name, value in config.items():
+        if "." in name:
+            kind, field = name.split(".", 1)
+            params = bird_params if kind in DEFAULT_PARAMS else damage_params
+            params.setdefault(kind, {})[field] = value
+    return {
+        "gravity": config.get("gravity", GRAVITY),
+        "bird_params": bird_params,
+        "damage_params": damage_params,
+    }
+
+
+# ------------------------
+# Corrida de una configuración (en los workers)
+# ------------------------
+def run_config(config: Dict[str, float], shots: Sequence[Tuple[str, float, float, int]] = DEFAULT_SHOTS,
+               max_ticks: int = SHOT_TICKS) -> List[Tuple]:
+    """Una fila de métricas por disparo: (shot, pigs, range, contacts, ticks, step_ms)."""
+    sim = Simulation(track_poses=False, pool_warmup={}, **simulation_kwargs(config))
+    base = sim.snapshot()
+    rows = []
+    for index, (bird, degrees, impulse, ability) in enumerate(shots):
+        sim.restore(base)
+        contacts = sim.contact_events
+        sim.launch_bird(bird, ImpulseVector(math.radians(degrees), impulse))
+        reach = SLINGSHOT_X
+        tick = 0
+        start = time.perf_counter()
+        while tick < max_ticks:
+            if tick == ability:
+                sim.activate_ability()
+            sim.step()
+            tick += 1
+            for b in sim.birds:
+                reach = max(reach, b.body.position.x)
+            if sim.level_manager.current_level != base.level:
+                break
+            if tick % 15 == 0 and tick > ability and settled(sim):
+                break
+        elapsed = time.perf_counter() - start
+        rows.append((index, (sim.score - base.score) // 100, reach - SLINGSHOT_X,
+                     sim.contact_events - contacts, tick, elapsed * 1000 / tick))
+    sim.close()
+    return rows
+
+
+def _run_batch(task: Tuple[List[Tuple[int, Dict[str, float]]], Sequence, int]) -> List[Tuple]:
+    batch, shots, max_ticks = task
+    out = []
+    for config_id, config in batch:
+        for row in run_config(config, shots, max_ticks):
+            out.append((config_id, config, *row))
+    return out
+
+
+def _init_worker():
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+# ------------------------
+# Resultados columnares
+# ------------------------
+class ResultsWriter:
+    """
+    Acumula filas y las escribe por bloques de CHUNK_ROWS en out_dir como
+    chunk-NNNNN.npz, un array por columna (ver load_results).
+    """
+    def __init__(self, out_dir: str, params: Sequence[str], chunk_rows: int = CHUNK_ROWS):
+        self.out_dir = out_dir
+        self.params = list(params)
+        self.chunk_rows = chunk_rows
+        self.dtype = np.dtype([("config", "i8"), ("shot", "u1")] + [(p, "f8") for p in self.params]
+                              + list(METRIC_COLUMNS))
+        self.rows: List[Tuple] = []
+        self.chunks = 0
+        self.total = 0
+        os.makedirs(out_dir, exist_ok=True)
+
+    def extend(self, rows: Iterable[Tuple]):
+        for config_id, config, shot, *metrics in rows:
+            self.rows.append((config_id, shot, *(config.get(p, np.nan) for p in self.params), *metrics))
+        if len(self.rows) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        table = np.array(self.rows, dtype=self.dtype)
+        path = os.path.join(self.out_dir, f"chunk-{self.chunks:05d}.npz")
+        with open(path, "wb") as f:
+            np.savez(f, **{name: table[name] for name in self.dtype.names})
+        self.chunks += 1
+        self.total += len(self.rows)
+        self.rows = []
+
+
+def load_results(out_dir: str) -> Dict[str, np.ndarray]:
+    """Concatena los chunks de una corrida: columna -> array."""
+    columns: Dict[str, List[np.ndarray]] = {}
+    for path in sorted(glob.glob(os.path.join(out_dir, "chunk-*.npz"))):
+        with np.load(path, allow_pickle=False) as data:
+            for name in data.files:
+                columns.setdefault(name, []).append(data[name])
+    return {name: np.concatenate(parts) for name, parts in columns.items()}
+
+
+def _batches(design: List[Dict[str, float]], size: int) -> Iterator[List[Tuple[int, Dict[str, float]]]]:
+    for i in range(0, len(design), size):
+        yield list(enumerate(design[i:i + size], start=i))
+
+
+def run_sweep(design: List[Dict[str, float]], out_dir: str,
+              shots: Sequence[Tuple[str, float, float, int]] = DEFAULT_SHOTS,
+              processes: Optional[int] = None, max_ticks: int = SHOT_TICKS) -> int:
+    """
+    Corre el diseño en un pool de procesos y va escribiendo los resultados a
+    medida que llegan. Devuelve la cantidad de filas escritas.
+    """
+    params = sorted({name for config in design for name in config}, key=PARAM_NAMES.index)
+    writer = ResultsWriter(out_dir, params)
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump({"params": params, "shots": [list(s) for s in shots], "configs": len(design),
+                   "max_ticks": max_ticks}, f, indent=2)
+
+    tasks = ((batch, shots, max_ticks) for batch in _batches(design, BATCH_SIZE))
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes, initializer=_init_worker) as pool:
+        for done, rows in enumerate(pool.imap_unordered(_run_batch, tasks), start=1):
+            writer.extend(rows)
+            if done % 50 == 0:
+                configs = min(done * BATCH_SIZE, len(design))
+                logger.info(f"{configs}/{len(design)} configuraciones ({configs / (time.perf_counter() - start):.0f}/s)")
+    writer.flush()
+    return writer.total
+
+
+# ------------------------
+# main
+# ------------------------
+def _parse_values(spec: str) -> Tuple[str, List[float]]:
+    name, _, values = spec.partition("=")
+    return name, [float(v) for v in values.split(",")]
+
+
+def _parse_range(spec: str) -> Tuple[str, Tuple[float, float]]:
+    name, _, values = spec.partition("=")
+    lo, hi = (float(v) for v in values.split(":"))
+    return name, (lo, hi)
+
+
+def _parse_shot(spec: str) -> Tuple[str, float, float, int]:
+    bird, degrees, impulse, *ability = spec.split(":")
+    return bird, float(degrees), float(impulse), int(ability[0]) if ability else -1
+
+
+def main(argv: Optional[list] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Barrido de parámetros con disparos headless en paralelo.",
+        epilog=f"Parámetros: {', '.join(PARAM_NAMES)}",
+    )
+    parser.add_argument("out_dir")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="eje de una grilla (repetible)")
+    parser.add_argument("--random", type=int, default=0, metavar="N",
+                        help="N configuraciones aleatorias sobre los --range")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=LO:HI")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shot", action="append", default=[], metavar="BIRD:DEG:IMPULSE[:ABILITY_TICK]",
+                        help="disparo de referencia (repetible; por defecto DEFAULT_SHOTS)")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--max-ticks", type=int, default=SHOT_TICKS)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.random:
+        design = random_design(dict(map(_parse_range, args.range)), args.random, args.seed)
+    else:
+        design = grid_design(dict(map(_parse_values, args.grid)))
+    shots = [_parse_shot(s) for s in args.shot] or DEFAULT_SHOTS
+
+    start = time.perf_counter()
+    rows = run_sweep(design, args.out_dir, shots, args.processes, args.max_ticks)
+    elapsed = time.perf_counter() - start
+    print(f"{len(design)} configuraciones x {len(shots)} disparos = {rows} filas en {elapsed:.1f}s "
+          f"({len(design) / elapsed:.0f} config/s) -> {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
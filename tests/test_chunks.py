@@ -0,0 +1,152 @@
+"""
+Streaming por chunks: una estructura que cruza el borde de un chunk se
+congela y descongela entera, lo lejano de un nivel nace congelado y vuelve
+de a STREAM_BUDGET entidades por tick, y el piso y los bordes del mundo
+siguen el ancho del nivel en curso.
+
+    python -m pytest tests
+"""
+import json
+import math
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("ARCADE_HEADLESS", "1")
+
+import pytest  # noqa: E402
+
+from game_logic import ImpulseVector  # noqa: E402
+from simulation import STREAM_BUDGET, STREAM_INTERVAL, WIDTH, Simulation  # noqa: E402
+
+
+def tower(x):
+    """Dos columnas, una viga y un cerdo centrados en x."""
+    return [
+        {"type": "column", "x": x - 30, "y": 60},
+        {"type": "column", "x": x + 30, "y": 60},
+        {"type": "beam", "x": x - 1, "y": 115.5},
+        {"type": "pig", "x": x - 1, "y": 142.4},
+    ]
+
+
+# CHUNK_WIDTH = 600: la primera cruza el borde de los chunks 4 y 5 (el 4
+# queda vivo por el slingshot); la segunda el de los chunks 6 y 7, lejos
+BORDER_TOWER = tower(3000)
+FAR_TOWER = tower(4200)
+
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    # las imágenes de los niveles son rutas relativas al repo
+    monkeypatch.chdir(ROOT)
+
+
+def write_levels(levels_dir, *levels):
+    for index, (width, entities) in enumerate(levels):
+        level = {"name": f"nivel {index}", "threshold": index * 100, "clear": True, "width": width,
+                 "entities": entities}
+        with open(os.path.join(levels_dir, f"level_{index}.json"), "w") as f:
+            json.dump(level, f)
+
+
+def run(sim, ticks):
+    for _ in range(ticks):
+        sim.step()
+
+
+def world_kinds(sim):
+    return sorted(entity.kind for entity in sim.world)
+
+
+def test_structure_across_chunk_border_freezes_whole(tmp_path):
+    write_levels(tmp_path, (7200, BORDER_TOWER))
+    sim = Simulation(track_poses=False, pool_warmup={}, levels_dir=str(tmp_path))
+    run(sim, 120)
+    assert world_kinds(sim) == ["passive", "passive", "passive", "pig"]
+
+    for x in (4000, 6500, 4000):
+        sim.look_at(x)
+        run(sim, 2 * STREAM_INTERVAL)
+
+    assert sim.score == 0
+    assert not sim.chunks.frozen
+    assert world_kinds(sim) == ["passive", "passive", "passive", "pig"]
+    beam = min((e for e in sim.world if e.kind == "passive"), key=lambda e: abs(e.body.position.x - 2999))
+    assert beam.body.position.y == pytest.approx(115.5, abs=2)
+
+
+def test_structure_frozen_whole_survives_snapshot(tmp_path):
+    write_levels(tmp_path, (7200, FAR_TOWER))
+    sim = Simulation(track_poses=False, pool_warmup={}, levels_dir=str(tmp_path))
+    # lejos del slingshot: la torre entera nace congelada
+    assert len(sim.chunks) == len(FAR_TOWER)
+
+    sim.look_at(4000)
+    run(sim, 2 * STREAM_INTERVAL)
+    assert not sim.chunks.frozen
+    # el chunk 7 sigue vivo y el 6 no: la torre no se parte
+    sim.look_at(6600)
+    run(sim, 2 * STREAM_INTERVAL)
+    assert not sim.chunks.frozen
+    sim.look_at(7200)
+    run(sim, 2 * STREAM_INTERVAL)
+    assert len(sim.chunks) == len(FAR_TOWER)
+    assert not sim.world
+
+    snap = sim.snapshot()
+    sim.look_at(4000)
+    run(sim, 2 * STREAM_INTERVAL)
+    sim.restore(snap)
+    assert len(sim.chunks) == len(FAR_TOWER)
+
+    sim.look_at(4000)
+    run(sim, 120)
+    assert sim.score == 0
+    assert world_kinds(sim) == ["passive", "passive", "passive", "pig"]
+
+
+def test_far_towers_thaw_within_budget(tmp_path):
+    towers = [4500, 5100, 5700]
+    write_levels(tmp_path, (7200, [entity for x in towers for entity in tower(x)]))
+    sim = Simulation(track_poses=False, pool_warmup={}, levels_dir=str(tmp_path))
+    # nada del nivel está cerca del slingshot: no se construyó ninguna entidad
+    assert not sim.sprites
+    assert len(sim.chunks) == 4 * len(towers)
+    assert len(set(sim.level_starts[0].entities["uid"].tolist())) == 4 * len(towers)
+
+    sim.look_at(5100)
+    sim.step()
+    # estructuras enteras, sin pasar el tope por tick
+    assert 0 < len(sim.world) <= STREAM_BUDGET
+    assert len(sim.world) % 4 == 0
+    run(sim, len(towers))
+    assert not sim.chunks.frozen
+    run(sim, 60)
+    assert sim.score == 0
+    assert sorted(round(e.body.position.y) for e in sim.world if e.kind == "pig") == [142] * len(towers)
+
+
+def test_world_bounds_follow_level_width(tmp_path):
+    write_levels(tmp_path, (WIDTH, [{"type": "pig", "x": 60, "y": 30}]), (7200, BORDER_TOWER))
+    sim = Simulation(track_poses=False, pool_warmup={}, levels_dir=str(tmp_path))
+    assert sim.world_width == WIDTH
+    sim.look_at(5000)
+    assert sim.view_x == WIDTH
+
+    # un tiro rasante sale del mundo de una pantalla en vez de rodar por el de 7200
+    bird = sim.launch_bird("red", ImpulseVector(math.radians(5), 200))
+    reach = 0.0
+    for _ in range(600):
+        sim.step()
+        reach = max(reach, bird.body.position.x)
+        if bird.space is None:
+            break
+    assert bird.space is None
+    assert reach < 2 * WIDTH
+
+    sim.load_level(1)
+    assert sim.world_width == 7200
+    sim.restore(sim.level_starts[0])
+    assert sim.world_width == WIDTH
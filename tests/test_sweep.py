@@ -0,0 +1,37 @@
+"""
+Barrido de parámetros: los disparos de referencia por defecto destruyen el
+cerdo del nivel 0, y al barrer un parámetro la columna de cerdos varía.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("ARCADE_HEADLESS", "1")
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from simulation import DAMAGE_PARAMS  # noqa: E402
+from sweep import DEFAULT_SHOTS, grid_design, load_results, run_sweep  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    # las imágenes de los niveles son rutas relativas al repo
+    monkeypatch.chdir(ROOT)
+
+
+def test_default_shots_give_varying_pigs(tmp_path):
+    health = DAMAGE_PARAMS["pig"]["health"]
+    design = grid_design({"pig.health": [health, 2 * health]})
+    rows = run_sweep(design, str(tmp_path), processes=1)
+    assert rows == len(design) * len(DEFAULT_SHOTS)
+
+    results = load_results(str(tmp_path))
+    pigs = results["pigs"][np.lexsort((results["shot"], results["config"]))].reshape(len(design), -1)
+    # con los parámetros por defecto todos los disparos destruyen el cerdo
+    assert (pigs[0] > 0).all()
+    assert len(np.unique(pigs)) > 1